@@ -0,0 +1,78 @@
+"""
+Процедурная генерация: рельеф --size × --size × --height клеток
+в одном процессе (области по очереди, без пула) против ProceduralGenerator
+с 1 и --workers процессами. Для пула замеряется и самая долгая вставка
+за кадр на главном потоке (tick) — то, на сколько генерация может
+задержать кадр. Результаты при любом числе процессов сравниваются
+с однопроцессными. OpenGL не нужен.
+
+Запуск из каталога src:
+    python -m benchmarks.generators --size 512 --height 128
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from core.generators import ProceduralGenerator, Terrain
+from core.scene import Scene
+
+
+def scene_columns(scene: Scene) -> tuple[np.ndarray, np.ndarray]:
+    store = scene.voxels
+    return store.positions.copy(), store.colors_of(np.arange(len(store)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=512)
+    parser.add_argument("--height", type=int, default=128)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    terrain = Terrain(size=(args.size, args.size), height=args.height, seed=args.seed)
+
+    # ---------------- Один процесс ----------------
+    scene = Scene()
+    start = time.perf_counter()
+    for lo, hi in terrain.regions():
+        cells, materials = terrain.generate(lo, hi)
+        scene.add_cubes(cells.astype(np.float32), terrain.palette[materials])
+    serial = time.perf_counter() - start
+    reference = scene_columns(scene)
+
+    print(f"terrain {args.size}x{args.size}x{args.height}: {len(scene.voxels):,} cubes, "
+          f"{len(terrain.regions())} regions, {os.cpu_count()} cores")
+    print(f"{'':<16} {'seconds':>8} {'worst tick ms':>14} {'same':>6}")
+    print(f"{'in-process':<16} {serial:>8.2f} {serial * 1000:>14.1f} {'':>6}")
+
+    # ---------------- Пул процессов ----------------
+    for workers in sorted({1, args.workers}):
+        generator = ProceduralGenerator(workers)
+        scene = Scene()
+
+        # запуск процессов пула — один раз на приложение, в замер не входит
+        generator.generate(Scene(), Terrain(size=(1, 1), height=1))
+        while generator.busy:
+            generator.tick()
+
+        start = time.perf_counter()
+        generator.generate(scene, terrain)
+        worst = 0.0
+        while generator.busy:
+            tick = time.perf_counter()
+            generator.tick()
+            worst = max(worst, time.perf_counter() - tick)
+            time.sleep(0.001)
+        seconds = time.perf_counter() - start
+        generator.close()
+
+        same = all(np.array_equal(a, b) for a, b in zip(reference, scene_columns(scene)))
+        print(f"{f'pool x{workers}':<16} {seconds:>8.2f} {worst * 1000:>14.1f} {str(same):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Меширование чанков: сколько вершин уходит в GPU до и после отсечения
+скрытых граней и жадного слияния, и сколько это стоит по времени.
+OpenGL не нужен.
+
+Запуск из каталога src:
+    python -m benchmarks.meshing --size 64 --colors 1
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from core.mesher import mesh_scene_chunk
+from core.scene import Scene
+
+
+def build_block(size: int, colors: int) -> Scene:
+    """Сплошной куб size³ вокселей, раскрашенный полосами в colors цветов по оси X."""
+    scene = Scene()
+    cells = np.stack(np.meshgrid(*[np.arange(size)] * 3, indexing="ij"), axis=-1).reshape(-1, 3)
+    palette = np.random.default_rng(0).random((colors, 4)).astype(np.float32)
+    palette[:, 3] = 1.0
+    scene.add_cubes(cells.astype(np.float32), palette[cells[:, 0] % colors])
+    return scene
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=64)
+    parser.add_argument("--colors", type=int, default=1)
+    args = parser.parse_args()
+
+    scene = build_block(args.size, args.colors)
+
+    start = time.perf_counter()
+    total = {}
+    for key in list(scene.grid.chunks):
+        _, _, stats = mesh_scene_chunk(scene, key)
+        for name, value in stats.items():
+            total[name] = total.get(name, 0) + value
+    elapsed = time.perf_counter() - start
+
+    print(f"voxels:                 {total['voxels']}")
+    print(f"chunks:                 {len(scene.grid.chunks)}")
+    print(f"vertices, no culling:   {total['naive_vertices']}")
+    print(f"vertices, face culling: {total['culled_vertices']}  ({total['visible_faces']} faces)")
+    print(f"vertices, greedy:       {total['vertices']}  ({total['quads']} quads, {total['indices']} indices)")
+    print(f"reduction:              x{total['naive_vertices'] / max(total['vertices'], 1):.0f}")
+    print(f"meshing time:           {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
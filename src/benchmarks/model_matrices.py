@@ -0,0 +1,81 @@
+"""
+Стоимость модельных матриц за кадр: построение каждой матрицы через pyrr
+(model_transform, как раньше в отрисовке по одному), пересчёт всех матриц
+пачкой (batch_model_transforms, как раньше в instanced-отрисовке) и кэш
+VoxelStore.model_matrices(), когда за кадр не двигалось ничего или
+двигалась доля moved объектов. OpenGL не нужен.
+
+Запуск из каталога src:
+    python -m benchmarks.model_matrices --counts 10000 100000 --moved 0.01
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from core.cube import batch_model_transforms, model_transform
+from core.scene import Scene
+
+
+def build_scene(count: int) -> Scene:
+    """count кубов в разных клетках со случайным поворотом вокруг Y."""
+    rng = np.random.default_rng(0)
+    side = int(np.ceil(count ** (1 / 3)))
+    cells = np.stack(np.unravel_index(np.arange(count), (side,) * 3), axis=1).astype(np.float32)
+    eulers = np.zeros((count, 3), dtype=np.float32)
+    eulers[:, 1] = rng.random(count) * 360
+
+    scene = Scene()
+    scene.add_cubes(cells, (0.5, 0.5, 0.5, 1.0), eulers)
+    return scene
+
+
+def per_frame_ms(frame, frames: int) -> float:
+    """Среднее время одного вызова frame() в миллисекундах."""
+    frame()
+    start = time.perf_counter()
+    for _ in range(frames):
+        frame()
+    return (time.perf_counter() - start) / frames * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--moved", type=float, default=0.01, help="доля объектов, сдвигаемых за кадр")
+    parser.add_argument("--frames", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'objects':>9}{'pyrr, ms':>12}{'batch, ms':>12}{'cached, ms':>12}{'moved, ms':>12}")
+    for count in args.counts:
+        scene = build_scene(count)
+        store = scene.voxels
+        rng = np.random.default_rng(1)
+        moved = max(1, int(count * args.moved))
+
+        def pyrr_frame():
+            for slot in range(len(store)):
+                model_transform(store.positions[slot], store.eulers[slot])
+
+        def batch_frame():
+            batch_model_transforms(store.positions, store.eulers)
+
+        def moved_frame():
+            slots = rng.choice(count, moved, replace=False)
+            store.eulers[slots, 1] += 1.0
+            store.invalidate_models(slots)
+            store.model_matrices()
+
+        # pyrr по одному объекту медленный — на больших сценах меньше кадров
+        pyrr_ms = per_frame_ms(pyrr_frame, max(1, args.frames * 1000 // count))
+        batch_ms = per_frame_ms(batch_frame, args.frames)
+        cached_ms = per_frame_ms(store.model_matrices, args.frames)
+        moved_ms = per_frame_ms(moved_frame, args.frames)
+
+        assert np.allclose(store.model_matrices(), batch_model_transforms(store.positions, store.eulers), atol=1e-5)
+        print(f"{count:>9}{pyrr_ms:>12.2f}{batch_ms:>12.2f}{cached_ms:>12.3f}{moved_ms:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
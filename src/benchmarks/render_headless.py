@@ -0,0 +1,246 @@
+"""
+Бенчмарк отрисовки без окна: контекст OpenGL через EGL или OSMesa (Mesa
+llvmpipe работает без GPU), кадры рисуются в FBO тем же
+Graphics_Engine.render, что и в редакторе. Камера облетает сцену по
+заданному пути; для каждого режима рендеринга печатается JSON с
+перцентилями времени кадра (render + glFinish), draw calls, вершинами
+и сменами состояния за кадр.
+
+Сцена загружается из файла (--scene) или генерируется (--generator,
+--voxels, --colors). Перед замером кадры рисуются, пока не будут
+построены все меши чанков, — замеряется установившийся режим.
+
+Запуск из каталога src:
+    python -m benchmarks.render_headless --voxels 100000 --modes chunked instanced
+    python -m benchmarks.render_headless --scene scenes/scene.txt --path flythrough --output result.json
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from core.offscreen import BACKENDS, BACKEND_EGL, select_platform
+
+GENERATORS = ("terrain", "block")
+CAMERA_PATHS = ("orbit", "flythrough")
+
+# Перцентили времени кадра в отчёте
+PERCENTILES = (50, 90, 95, 99)
+
+# Средняя высота столбца сгенерированного рельефа, в вокселях
+TERRAIN_MEAN_HEIGHT = 8
+
+# Камера облёта не дальше этого от центра сцены: дальняя плоскость
+# отсечения Graphics_Engine — 100, большие сцены облетаются изнутри
+MAX_ORBIT_RADIUS = 60.0
+
+
+# ----------------------------------------------------------------------
+# Scenes
+# ----------------------------------------------------------------------
+
+def generate_cells(generator: str, voxels: int, rng: np.random.Generator) -> np.ndarray:
+    """Клетки (N, 3) примерно voxels вокселей: рельеф из синусоид или сплошной куб."""
+    if generator == "block":
+        side = max(1, round(voxels ** (1 / 3)))
+        return np.stack(np.unravel_index(np.arange(side ** 3), (side,) * 3), axis=1)
+
+    side = max(2, round(np.sqrt(voxels / TERRAIN_MEAN_HEIGHT)))
+    x, y = np.meshgrid(np.arange(side), np.arange(side), indexing="ij")
+    phases = rng.random(4) * 2 * np.pi
+    wave = (np.sin(x / side * 6 + phases[0]) + np.sin(y / side * 5 + phases[1])
+            + 0.5 * np.sin((x + y) / side * 13 + phases[2]) + 0.5 * np.sin((x - y) / side * 11 + phases[3]))
+    heights = np.maximum(1, np.round(TERRAIN_MEAN_HEIGHT * (1 + wave / 3))).astype(np.int64).reshape(-1)
+
+    # столбец (x, y) заполнен по z от 0 до высоты
+    columns = np.repeat(np.arange(side * side), heights)
+    z = np.arange(len(columns)) - np.repeat(np.cumsum(heights) - heights, heights)
+    return np.stack([x.reshape(-1)[columns], y.reshape(-1)[columns], z], axis=1)
+
+
+def build_scene(args):
+    """Сцена из файла args.scene или сгенерированная."""
+    from core.scene import Scene
+
+    scene = Scene()
+    if args.scene:
+        if not scene.import_scene(args.scene):
+            raise SystemExit(f"Cannot load scene {args.scene}")
+        return scene, {"source": args.scene}
+
+    rng = np.random.default_rng(args.seed)
+    cells = generate_cells(args.generator, args.voxels, rng)
+    palette = rng.random((args.colors, 4)).astype(np.float32)
+    palette[:, 3] = 1.0
+
+    # слои по высоте (z) — у рельефа цвет меняется полосами
+    bands = cells[:, 2] * args.colors // (cells[:, 2].max() + 1)
+    scene.add_cubes(cells.astype(np.float32), palette[bands])
+    return scene, {"source": args.generator, "seed": args.seed}
+
+
+# ----------------------------------------------------------------------
+# Camera path
+# ----------------------------------------------------------------------
+
+def camera_path(kind: str, lo: np.ndarray, hi: np.ndarray, frames: int) -> list:
+    """
+    Позиции и точки взгляда камеры на каждый кадр:
+    orbit — круг вокруг центра сцены над ней, взгляд в центр
+            (радиус не больше MAX_ORBIT_RADIUS);
+    flythrough — пролёт вдоль оси X над сценой с покачиванием взгляда.
+    """
+    center = (lo + hi) / 2
+    extent = max(float(np.linalg.norm(hi - lo)) / 2, 1.0)
+    t = np.arange(frames) / max(frames, 1)
+
+    if kind == "orbit":
+        angle = 2 * np.pi * t
+        radius = min(1.5 * extent, MAX_ORBIT_RADIUS)
+        eyes = center + np.stack([radius * np.cos(angle), radius * np.sin(angle),
+                                  np.full(frames, 0.4 * radius)], axis=1)
+        targets = np.broadcast_to(center, eyes.shape)
+    else:
+        x = lo[0] - 0.5 * extent + (hi[0] - lo[0]) * t
+        eyes = np.stack([x, np.full(frames, center[1]), np.full(frames, hi[2] + 0.25 * extent)], axis=1)
+        sway = 0.5 * extent * np.sin(4 * np.pi * t)
+        targets = eyes + np.stack([np.full(frames, extent), sway, np.full(frames, -0.5 * extent)], axis=1)
+
+    return list(zip(eyes, targets))
+
+
+def aim_camera(camera, eye: np.ndarray, target: np.ndarray) -> None:
+    """Ставит камеру в eye и поворачивает её на target (мировой верх — ось Z)."""
+    direction = target - eye
+    direction = direction / (np.linalg.norm(direction) + 1e-8)
+    camera.position = np.asarray(eye, dtype=np.float32)
+    camera.theta = float(np.degrees(np.arctan2(direction[1], direction[0])))
+    camera.phi = float(np.clip(np.degrees(np.arcsin(direction[2])), -89, 89))
+    camera.update_vectors()
+
+
+# ----------------------------------------------------------------------
+# Measurement
+# ----------------------------------------------------------------------
+
+def summary(values) -> dict:
+    """Среднее, перцентили и максимум ряда."""
+    values = np.asarray(values, dtype=np.float64)
+    result = {"mean": round(float(values.mean()), 3)}
+    for q in PERCENTILES:
+        result[f"p{q}"] = round(float(np.percentile(values, q)), 3)
+    result["max"] = round(float(values.max()), 3)
+    return result
+
+
+def benchmark_mode(scene, mode: str, path: list, args) -> dict:
+    """Рисует путь камеры в режиме mode и собирает статистику кадров."""
+    from OpenGL.GL import glFinish
+    from core.graphics_engine import Graphics_Engine
+
+    engine = Graphics_Engine(scene, scene_file=None, render_mode=mode)
+
+    # меши чанков строятся с бюджетом на кадр — дожидаемся, пока построятся все
+    scene.grid.dirty_chunks.update(scene.grid.chunks)
+    aim_camera(scene.camera, *path[0])
+    start = time.perf_counter()
+    warmup = 0
+    while warmup < args.warmup or engine.pending_chunks:
+        engine.render(scene)
+        warmup += 1
+    glFinish()
+    settle_ms = (time.perf_counter() - start) * 1000.0
+
+    frame_ms, draw_calls, vertices, state_changes, drawn = [], [], [], [], []
+    for eye, target in path:
+        aim_camera(scene.camera, eye, target)
+
+        start = time.perf_counter()
+        engine.render(scene)
+        glFinish()
+        frame_ms.append((time.perf_counter() - start) * 1000.0)
+
+        stats = engine.gl.frame_stats
+        draw_calls.append(stats["draw_calls"])
+        vertices.append(stats["vertices"])
+        state_changes.append(stats["program_binds"] + stats["vertex_array_binds"] + stats["uniform_uploads"])
+        drawn.append(engine.cull_stats["drawn"])
+
+    result = {
+        "warmup_frames": warmup,
+        "settle_ms": round(settle_ms, 3),
+        "frame_ms": summary(frame_ms),
+        "fps": round(1000.0 / float(np.mean(frame_ms)), 2),
+        "draw_calls": summary(draw_calls),
+        "vertices": summary(vertices),
+        "state_changes": summary(state_changes),
+        "drawn_boxes": summary(drawn),
+    }
+    if mode == "chunked":
+        result["mesh"] = engine.mesh_stats()
+
+    engine.quit()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=BACKENDS, default=BACKEND_EGL)
+    parser.add_argument("--scene", help="файл сцены (любой формат Scene.import_scene) вместо генерации")
+    parser.add_argument("--generator", choices=GENERATORS, default="terrain")
+    parser.add_argument("--voxels", type=int, default=100_000, help="примерное число вокселей сгенерированной сцены")
+    parser.add_argument("--colors", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--modes", nargs="+", default=["chunked", "instanced"],
+                        help="режимы рендеринга: chunked, instanced, entity")
+    parser.add_argument("--path", choices=CAMERA_PATHS, default="orbit")
+    parser.add_argument("--frames", type=int, default=120)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--output", help="записать JSON в файл (по умолчанию — в stdout)")
+    args = parser.parse_args()
+
+    # платформа PyOpenGL выбирается до первого импорта OpenGL.GL
+    backend = select_platform(args.backend)
+
+    from core.graphics_engine import SCREEN_WIDTH, SCREEN_HEIGHT, set_up_opengl
+    from core.offscreen import OffscreenContext
+
+    context = OffscreenContext(SCREEN_WIDTH, SCREEN_HEIGHT, backend)
+    set_up_opengl(SCREEN_WIDTH, SCREEN_HEIGHT)
+
+    scene, source = build_scene(args)
+    if len(scene.voxels) == 0:
+        raise SystemExit("Scene is empty")
+    cubes = scene.voxels.positions
+    path = camera_path(args.path, cubes.min(axis=0), cubes.max(axis=0), args.frames)
+
+    report = {
+        "context": context.info(),
+        "scene": {
+            **source,
+            "voxels": len(scene.voxels),
+            "materials": len(scene.palette),
+            "chunks": len(scene.grid.chunks),
+        },
+        "camera": {"path": args.path, "frames": args.frames},
+        "modes": {},
+    }
+    try:
+        for mode in args.modes:
+            report["modes"][mode] = benchmark_mode(scene, mode, path, args)
+    finally:
+        context.destroy()
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        sys.stdout.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
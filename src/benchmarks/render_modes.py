@@ -0,0 +1,87 @@
+"""
+Сравнение FPS двух режимов рендеринга Graphics_Engine:
+отдельный draw call на каждый куб против одного instanced draw call.
+Для каждого режима печатается и число вызовов OpenGL за кадр
+(draw calls и смены состояния по счётчикам GLState).
+
+Запуск из каталога src:
+    python -m benchmarks.render_modes --counts 1000 10000 100000
+"""
+
+import argparse
+import time
+
+import glfw
+import numpy as np
+
+from core.graphics_engine import (
+    initialize_glfw, Graphics_Engine, RENDER_MODE_ENTITY, RENDER_MODE_INSTANCED
+)
+from core.scene import Scene
+
+
+def build_scene(count: int) -> Scene:
+    """Создаёт сцену из count кубов, уложенных в куб перед камерой."""
+    scene = Scene()
+    side = int(np.ceil(count ** (1 / 3)))
+
+    i, j, k = np.unravel_index(np.arange(count), (side,) * 3)
+    positions = np.stack([5.0 + i, j - side / 2, k - side / 2], axis=1).astype(np.float32)
+    colors = np.stack([i / side, j / side, k / side, np.ones(count)], axis=1).astype(np.float32)
+    scene.add_cubes(positions, colors, selected=True)
+    return scene
+
+
+def measure_fps(engine: Graphics_Engine, scene: Scene, frames: int, present=None) -> float:
+    """Рисует frames кадров и возвращает средний FPS (после одного прогревочного кадра)."""
+    engine.render(scene)
+    if present:
+        present()
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        engine.render(scene)
+        if present:
+            present()
+    elapsed = time.perf_counter() - start
+    return frames / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--frames", type=int, default=100)
+    args = parser.parse_args()
+
+    window = initialize_glfw(visible=False)
+    glfw.swap_interval(0)
+
+    def present():
+        glfw.swap_buffers(window)
+        glfw.poll_events()
+
+    print(f"{'cubes':>8} | {RENDER_MODE_ENTITY + ' fps':>12} | {RENDER_MODE_INSTANCED + ' fps':>14} | speedup"
+          f" | {'draws / state changes per frame':>34}")
+    try:
+        for count in args.counts:
+            scene = build_scene(count)
+            engine = Graphics_Engine(scene, scene_file=None)
+
+            results, calls = {}, {}
+            for mode in (RENDER_MODE_ENTITY, RENDER_MODE_INSTANCED):
+                engine.render_mode = mode
+                results[mode] = measure_fps(engine, scene, args.frames, present)
+                calls[mode] = f"{engine.gl.last_frame_stats['draw_calls']}/{engine.gl.state_changes}"
+
+            speedup = results[RENDER_MODE_INSTANCED] / results[RENDER_MODE_ENTITY]
+            print(f"{count:>8} | {results[RENDER_MODE_ENTITY]:>12.1f} | "
+                  f"{results[RENDER_MODE_INSTANCED]:>14.1f} | x{speedup:>6.1f}"
+                  f" | {calls[RENDER_MODE_ENTITY]:>16} vs {calls[RENDER_MODE_INSTANCED]:<13}")
+
+            engine.quit()
+    finally:
+        glfw.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Массовое добавление и удаление кубов: по одному (Scene.add_cube,
+Scene.remove_entity) против пачки (Scene.add_cubes, Scene.remove_where).
+Поштучный путь замеряется на --per-call кубах и пересчитывается
+в кубы в секунду. OpenGL не нужен.
+
+Запуск из каталога src:
+    python -m benchmarks.scene_bulk --count 1000000 --per-call 5000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from core.scene import Scene
+
+
+def cube_cells(count: int) -> np.ndarray:
+    """count различных клеток, уложенных в куб."""
+    side = int(np.ceil(count ** (1 / 3)))
+    return np.stack(np.unravel_index(np.arange(count), (side,) * 3), axis=1).astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--per-call", type=int, default=5000, help="кубов для поштучного замера")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    colors = rng.random((args.count, 4)).astype(np.float32)
+    colors[:, 3] = 1.0
+    cells = cube_cells(args.count)
+
+    # ---------------- По одному ----------------
+    scene = Scene()
+    sample = cells[:args.per_call]
+    start = time.perf_counter()
+    for position, color in zip(sample, colors):
+        scene.add_cube(position, [0, 0, 0], color)
+    add_single = args.per_call / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for entity in list(scene.voxels):
+        scene.remove_entity(entity)
+    remove_single = args.per_call / (time.perf_counter() - start)
+
+    # ---------------- Пачкой ----------------
+    scene = Scene()
+    start = time.perf_counter()
+    ids = scene.add_cubes(cells, colors)
+    add_bulk = len(ids) / (time.perf_counter() - start)
+
+    duplicates = len(scene.add_cubes(cells[:1000], colors[:1000]))
+
+    start = time.perf_counter()
+    removed = scene.remove_where(scene.voxels.positions[:, 2] < cells[:, 2].max() / 2)
+    remove_half = removed / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    removed = scene.remove_where(scene.voxels.ids)
+    remove_rest = removed / (time.perf_counter() - start)
+
+    print(f"{'':<20} {'cubes/s':>12}")
+    print(f"{'add_cube':<20} {add_single:>12,.0f}")
+    print(f"{'add_cubes':<20} {add_bulk:>12,.0f}   x{add_bulk / add_single:,.0f}")
+    print(f"{'remove_entity':<20} {remove_single:>12,.0f}")
+    print(f"{'remove_where mask':<20} {remove_half:>12,.0f}   x{remove_half / remove_single:,.0f}")
+    print(f"{'remove_where ids':<20} {remove_rest:>12,.0f}   x{remove_rest / remove_single:,.0f}")
+    print(f"{len(ids)} added, {duplicates} of 1000 re-added (occupied cells are skipped)")
+
+
+if __name__ == "__main__":
+    main()
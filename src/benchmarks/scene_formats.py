@@ -0,0 +1,87 @@
+"""
+Размер и скорость форматов сцены на «ландшафте» из крупных одноцветных
+слоёв: текстовый v1, двоичный .voxb и чанковый .voxc (палитра + RLE,
+сжатие zlib и lzma). OpenGL не нужен.
+
+Запуск из каталога src:
+    python -m benchmarks.scene_formats --side 256
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from core.scene import Scene
+from core.scene_formats import (
+    RAW_BYTES_PER_VOXEL, read_binary, read_chunked, read_text,
+    write_binary, write_chunked, write_text,
+)
+
+
+def build_terrain(side: int) -> Scene:
+    """Холмы side × side: камень, под поверхностью земля, сверху трава."""
+    x, y = np.meshgrid(np.arange(side), np.arange(side), indexing="ij")
+    height = (12 + 6 * np.sin(x / 17) + 5 * np.cos(y / 11)).astype(np.int64)
+
+    z = np.arange(height.max())
+    xs, ys, zs = np.broadcast_arrays(x[..., None], y[..., None], z[None, None, :])
+    inside = zs < height[..., None]
+    cells = np.stack([xs[inside], ys[inside], zs[inside]], axis=1)
+
+    depth = height[cells[:, 0], cells[:, 1]] - cells[:, 2]
+    palette = np.array([[0.2, 0.7, 0.2, 1], [0.4, 0.3, 0.2, 1], [0.5, 0.5, 0.5, 1]], dtype=np.float32)
+    layer = np.where(depth <= 1, 0, np.where(depth <= 4, 1, 2))
+
+    scene = Scene()
+    scene.add_cubes(cells.astype(np.float32), palette[layer])
+    return scene
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--side", type=int, default=256)
+    args = parser.parse_args()
+
+    scene = build_terrain(args.side)
+    store = scene.voxels
+    columns = (store.positions, store.eulers, store.colors, store.kinds)
+    count = len(store)
+    raw = count * RAW_BYTES_PER_VOXEL
+
+    formats = [
+        ("text v1", "scene.txt", lambda path: write_text(path, *columns), read_text),
+        (".voxb", "scene.voxb", lambda path: write_binary(path, *columns),
+         lambda path: [np.array(column) for column in read_binary(path)]),
+        (".voxc zlib", "zlib.voxc", lambda path: write_chunked(path, *columns, codec="zlib"), read_chunked),
+        (".voxc lzma", "lzma.voxc", lambda path: write_chunked(path, *columns, codec="lzma"), read_chunked),
+    ]
+
+    print(f"voxels: {count}, raw columns: {raw / 1e6:.1f} MB")
+    print(f"{'format':<12}{'size, KB':>12}{'vs text':>10}{'vs raw':>10}{'save, s':>10}{'load, s':>10}{'save MB/s':>11}{'load MB/s':>11}")
+
+    text_size = None
+    with tempfile.TemporaryDirectory() as folder:
+        for name, filename, write, read in formats:
+            path = os.path.join(folder, filename)
+
+            start = time.perf_counter()
+            write(path)
+            save = time.perf_counter() - start
+
+            start = time.perf_counter()
+            read(path)
+            load = time.perf_counter() - start
+
+            size = os.path.getsize(path)
+            text_size = text_size or size
+            print(
+                f"{name:<12}{size / 1024:>12.0f}{text_size / size:>10.1f}{raw / size:>10.1f}"
+                f"{save:>10.3f}{load:>10.3f}{raw / save / 1e6:>11.0f}{raw / load / 1e6:>11.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
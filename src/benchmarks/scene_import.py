@@ -0,0 +1,76 @@
+"""
+Скорость импорта текстовой сцены v1: разбор файла (строк в секунду)
+и полная загрузка в Scene. Для сравнения — построчный разбор split/float,
+которым импортёр пользовался раньше. OpenGL не нужен.
+
+Запуск из каталога src:
+    python -m benchmarks.scene_import --count 200000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from core.scene import Scene
+from core.scene_formats import read_text
+
+
+def write_scene_file(path: str, count: int) -> None:
+    """Сцена из count случайных кубов в разных клетках."""
+    rng = np.random.default_rng(0)
+    side = int(np.ceil(count ** (1 / 3))) + 1
+    cells = rng.permutation(side ** 3)[:count]
+    positions = np.stack(np.unravel_index(cells, (side,) * 3), axis=1).astype(np.float32)
+
+    scene = Scene()
+    scene.add_cubes(positions, rng.random((count, 4), dtype=np.float32),
+                    rng.random((count, 3), dtype=np.float32) * 360)
+    scene.export_scene(path)
+
+
+def read_text_per_line(path: str) -> int:
+    """Прежний разбор: split и float для каждой строки."""
+    rows = []
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = line.split()
+            rows.append(list(map(float, parts[1:11])))
+    return len(np.array(rows, dtype=np.float32))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "scene.txt")
+        write_scene_file(path, args.count)
+
+        start = time.perf_counter()
+        read_text_per_line(path)
+        per_line = time.perf_counter() - start
+
+        start = time.perf_counter()
+        read_text(path)
+        block = time.perf_counter() - start
+
+        scene = Scene()
+        start = time.perf_counter()
+        scene.import_scene(path)
+        full = time.perf_counter() - start
+
+    print(f"lines:                  {args.count}")
+    print(f"per-line parse:         {per_line:.2f} s  ({args.count / per_line:,.0f} lines/s)")
+    print(f"block parse:            {block:.2f} s  ({args.count / block:,.0f} lines/s)")
+    print(f"import_scene (total):   {full:.2f} s  ({args.count / full:,.0f} lines/s)")
+
+
+if __name__ == "__main__":
+    main()
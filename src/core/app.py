@@ -1,19 +1,50 @@
+import time
 import glfw
 import glfw.GLFW as GLFW_CONSTANTS
 from OpenGL.GL import *
 import numpy as np
 from PySide6.QtWidgets import QApplication
-from .graphics_engine import Graphics_Engine
+from .graphics_engine import Graphics_Engine, set_up_opengl
 from src.gui.material_editor_window import MaterialEditorWindow
 from src.gui.object_list_window import ObjectListWindow
 from src.gui.enter_window import SimpleInputDialog
+from src.gui.profiler_overlay import ProfilerOverlay
 from .scene import Scene
+from .autosave import Autosaver
+from .profiler import FrameProfiler
+from .frame_pacer import FramePacer
+from .generators import ProceduralGenerator, Terrain
+from .input import InputQueue, Keymap, RELEASE, REPEAT
 
 
 # ---------- Константы ----------
 SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 760
 
+# Ограничение частоты кадров (0 — без ограничения) и вертикальная синхронизация
+MAX_FPS = 60.0
+VSYNC = True
+
+# Шаг времени для движения камеры не больше этого (после простоя), мс
+MAX_FRAME_TIME_MS = 100.0
+
+# Раскладка клавиш: действия по умолчанию (core.input.DEFAULT_BINDINGS),
+# переопределённые этим файлом, если он есть
+KEYMAP_FILE = "keymap.json"
+
+# Действия, пока зажата клавиша которых кадры рисуются без ожидания событий
+CONTINUOUS_ACTIONS = ("camera.forward", "camera.left", "camera.back", "camera.right")
+
+# Действия, которые выполняются и по автоповтору зажатой клавиши
+REPEATABLE_ACTIONS = {"select.grow", "select.shrink", "edit.undo", "edit.redo"}
+
+# Шаг камеры на одно деление колеса мыши
+ZOOM_STEP = 2.0
+
+# Рельеф по Ctrl + T: размер по x, z и высота в клетках; каждое нажатие — следующее зерно
+TERRAIN_SIZE = (512, 512)
+TERRAIN_HEIGHT = 128
+
 RETURN_ACTION_CONTINUE = 0
 RETURN_ACTION_END = 1
 
@@ -24,21 +55,38 @@ class App:
     Управляет окном, обработкой ввода, Qt-диалогами, сценой и рендером.
     """
 
-    def __init__(self, window):
+    def __init__(self, window, max_fps: float = MAX_FPS, vsync: bool = VSYNC):
         self.window = window
         self.renderer = None
+        self.vsync = vsync
 
-        # Основная 3D-сцена
-        self.scene = Scene()
+        # Размер шага для привязки кубов к сетке
+        self.GRID_SIZE = 1.0
+
+        # Радиус выделения сферой (R) вокруг куба под курсором
+        self.SELECT_RADIUS = 4.0 * self.GRID_SIZE
+
+        # Основная 3D-сцена (клетка сетки занятости = GRID_SIZE)
+        self.scene = Scene(grid_size=self.GRID_SIZE)
+
+        # Фоновое сохранение: раз в interval секунд и по F5 / M
+        self.autosaver = Autosaver(self.scene)
+
+        # Процедурная генерация в пуле процессов: готовые области
+        # вставляются в сцену понемногу каждый кадр
+        self.generator = ProceduralGenerator()
+        self.terrain_seed = 0
 
         # Параметры времени
         self.lastTime = glfw.get_time()
         self.currentTime = 0
         self.frameTime = 16.7
         self.numFrames = 0
+        self.numSkipped = 0
 
-        # Размер шага для привязки кубов к сетке
-        self.GRID_SIZE = 1.0
+        # Кадр рисуется, только когда что-то изменилось (см. FramePacer)
+        self.frame_pacer = FramePacer(max_fps=max_fps)
+        self.lastIteration = self.lastTime
 
         # Таблица для расчёта направления камеры по WASD
         self.walk_offset_lookup = {
@@ -47,14 +95,32 @@ class App:
             13: 270, 14: 180
         }
 
+        # Профилировщик кадров: фазы главного цикла и рендерера за последние
+        # 600 кадров, время на GPU — запросами GL_TIME_ELAPSED.
+        # F12 — выгрузка в Chrome trace, F3 — оверлей с перцентилями.
+        self.profiler = FrameProfiler(capacity=600, gpu_timers=True)
+        self.profiler_overlay = None
+
         self._set_up_opengl()
-        self.renderer = Graphics_Engine(self.scene)
+        self.renderer = Graphics_Engine(self.scene, profiler=self.profiler)
+
+        # Окно открылось из-под другого или сменило размер — перерисовать
+        glfw.set_window_refresh_callback(self.window, lambda window: self.frame_pacer.request_redraw())
 
-        # Режим перемещения выбранных кубов
+        # Режим перемещения выбранных кубов: id перемещаемых объектов,
+        # ось, положение курсора при выборе оси и уже применённый сдвиг
         self.move_mode = False
         self.move_axis = None
-        self.selected_entities = []
-        self.selected_entity = None
+        self.move_ids = np.zeros(0, dtype=np.int64)
+        self.move_anchor = 0.0
+        self.move_offset = 0.0
+
+        # Ввод: события клавиатуры, мыши и колеса из обратных вызовов GLFW,
+        # сопоставленные действиям раскладки; обрабатываются раз в кадр
+        self.keymap = Keymap.load(KEYMAP_FILE)
+        self.input = InputQueue(self.window, self.keymap)
+        self.looking = False
+        self._build_action_handlers()
 
         # Окна Qt
         self.object_window = None
@@ -66,9 +132,8 @@ class App:
 
     def _set_up_opengl(self):
         """Начальная настройка OpenGL."""
-        glClearColor(0.1, 0.2, 0.2, 1)
-        glEnable(GL_DEPTH_TEST)
-        glViewport(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+        set_up_opengl(SCREEN_WIDTH, SCREEN_HEIGHT)
+        glfw.swap_interval(1 if self.vsync else 0)
 
     # --------------------------------------------------------------------
     #                    ОКНА ПОЛЬЗОВАТЕЛЬСКОГО ИНТЕРФЕЙСА
@@ -85,11 +150,6 @@ class App:
             else:
                 self.object_window.show()
 
-    def rebuild_object_window(self):
-        """Обновляет список объектов в окне."""
-        if self.object_window is not None:
-            self.object_window.rebuild_list()
-
     def open_material_editor(self):
         """Открывает окно редактирования материала выбранных объектов."""
         if hasattr(self, "material_editor") and self.material_editor is not None:
@@ -105,39 +165,158 @@ class App:
     # --------------------------------------------------------------------
 
     def run(self):
-        """Главный цикл приложения."""
+        """
+        Главный цикл приложения. Ввод обрабатывается на каждой итерации,
+        а кадр рисуется, только если изменились сцена, выделение или камера
+        (или ввод активен) — в простое цикл ждёт событий и не грузит
+        ни процессор, ни GPU. Частоту кадров ограничивает FramePacer.
+        """
+        profile = self.profiler.scope
+        pacer = self.frame_pacer
         running = True
         while running:
-            self.qt_app.processEvents()
+            now = glfw.get_time()
+            self.frameTime = min(now - self.lastIteration, MAX_FRAME_TIME_MS / 1000.0) * 1000.0
+            self.lastIteration = now
 
-            if (glfw.window_should_close(self.window) or
-                glfw.get_key(self.window, GLFW_CONSTANTS.GLFW_KEY_ESCAPE) == GLFW_CONSTANTS.GLFW_PRESS):
-                break
+            self.profiler.begin_frame()
+            with profile("qt_events"):
+                self.qt_app.processEvents()
 
-            self.handle_keys()
-            self.handle_mouse()
-
-            glfw.poll_events()
-            self.renderer.render(self.scene)
+            if glfw.window_should_close(self.window):
+                self.profiler.end_frame()
+                break
 
-            glfw.swap_buffers(self.window)
+            with profile("handle_input"):
+                self.handle_input()
+            with profile("autosave"):
+                self.autosaver.tick()
+            with profile("generate"):
+                self.generator.tick()
+
+            now = glfw.get_time()
+            if pacer.should_render(self._view_state(), self._input_active(), now):
+                with profile("render", gpu=True):
+                    self.renderer.render(self.scene)
+                with profile("swap_buffers"):
+                    glfw.swap_buffers(self.window)
+                self.profiler.end_frame()
+                pacer.frame_rendered(now)
+            else:
+                self.profiler.discard_frame()
             self.calculateFramerate()
 
+            timeout = pacer.timeout(glfw.get_time())
+            if timeout > 0:
+                glfw.wait_events_timeout(timeout)
+            else:
+                glfw.poll_events()
+
         self.quit()
 
+    def _view_state(self) -> tuple:
+        """То, от чего зависит картинка: ревизии сцены и выделения, положение и углы камеры."""
+        camera = self.scene.camera
+        return (
+            self.scene.revision, self.scene.voxels.selection_revision,
+            *camera.position.tolist(), camera.theta, camera.phi,
+        )
+
+    def _input_active(self) -> bool:
+        """
+        Нужно ли рисовать кадры подряд: зажаты клавиши движения, строятся
+        меши чанков или в сцену вставляются сгенерированные области.
+        """
+        if self.renderer.pending_chunks or self.generator.busy:
+            return True
+        return any(self.input.held(action) for action in CONTINUOUS_ACTIONS)
+
     # --------------------------------------------------------------------
-    #                        ОБРАБОТКА КЛАВИАТУРЫ
+    #                              ВВОД
     # --------------------------------------------------------------------
 
-    def handle_keys(self):
-        """Обрабатывает движение игрока, перемещение кубов и команды интерфейса."""
+    def _build_action_handlers(self):
+        """
+        Обработчики действий раскладки по режимам. Одно сочетание может
+        означать разные действия (R — сфера выделения или поворот), поэтому
+        обработчик ищется сначала среди действий текущего режима.
+        """
+        self.global_actions = {
+            "app.quit": lambda event: glfw.set_window_should_close(self.window, True),
+            "camera.zoom": self.zoom_camera,
+            "window.objects": lambda event: self.toggle_object_window(),
+            "window.material": lambda event: self.open_material_editor(),
+            "scene.save_now": lambda event: self.autosaver.save_now(),
+            "scene.export": lambda event: self.scene_file_dialog(load=False),
+            "scene.import": lambda event: self.scene_file_dialog(load=True),
+            "scene.generate_terrain": lambda event: self.generate_terrain(),
+            "profiler.trace": lambda event: self.dump_frame_trace(),
+            "profiler.overlay": lambda event: self.toggle_profiler_overlay(),
+        }
+        self.edit_actions = {
+            "edit.move": lambda event: self.begin_move(clone=False),
+            "edit.clone": lambda event: self.begin_move(clone=True),
+            "edit.delete": lambda event: self.scene.remove_selected(),
+            "edit.undo": lambda event: self.scene.history.undo(self.scene),
+            "edit.redo": lambda event: self.scene.history.redo(self.scene),
+            "edit.place": lambda event: self.place_adjacent(self.renderer.pick(self.scene, event.x, event.y)),
+            "select.pick": lambda event: self.select_hit(self.renderer.pick(self.scene, event.x, event.y)),
+            "select.pick_add": lambda event: self.select_hit(self.renderer.pick(self.scene, event.x, event.y), add=True),
+            "select.invert": lambda event: self.scene.invert_selection(),
+            "select.grow": lambda event: self.scene.grow_selection(),
+            "select.shrink": lambda event: self.scene.shrink_selection(),
+            "select.box": lambda event: self.select_selection_bounds(),
+            "select.sphere": lambda event: self.select_around_cursor(event, sphere=True, add=False),
+            "select.sphere_add": lambda event: self.select_around_cursor(event, sphere=True, add=True),
+            "select.color": lambda event: self.select_around_cursor(event, sphere=False, add=False),
+            "select.color_add": lambda event: self.select_around_cursor(event, sphere=False, add=True),
+        }
+        self.move_actions = {
+            "move.axis_x": lambda event: self.set_move_axis('X'),
+            "move.axis_y": lambda event: self.set_move_axis('Y'),
+            "move.axis_z": lambda event: self.set_move_axis('Z'),
+            "move.rotate": lambda event: self.rotate_moved(1),
+            "move.rotate_back": lambda event: self.rotate_moved(-1),
+            "move.mirror": lambda event: self.scene.mirror(
+                self.move_ids, {'X': 0, 'Y': 1, 'Z': 2}.get(self.move_axis, 0)),
+            "move.exit": lambda event: self.end_move(),
+        }
+
+    def handle_input(self):
+        """
+        Выполняет действия событий ввода, накопленных с прошлого кадра
+        (каждое нажатие — один раз), затем удерживаемые: движение камеры,
+        обзор мышью и перетаскивание выделения.
+        """
+        for event in self.input.take_events():
+            if event.type == RELEASE:
+                continue
+            mode_actions = self.move_actions if self.move_mode else self.edit_actions
+            for action in event.actions:
+                handler = mode_actions.get(action) or self.global_actions.get(action)
+                if handler is None:
+                    continue
+                # автоповтор зажатой клавиши — только у действий, где он уместен
+                if event.type == REPEAT and action not in REPEATABLE_ACTIONS:
+                    break
+                handler(event)
+                break
+
+        self.walk_camera()
+        self.look_camera()
+        if self.move_mode and self.move_axis:
+            self.drag_moved()
 
-        # ---------------- Движение игрока WASD ----------------
+    # --------------------------------------------------------------------
+    #                              КАМЕРА
+    # --------------------------------------------------------------------
+
+    def walk_camera(self):
+        """Движение игрока WASD, пока клавиши зажаты."""
         combo = 0
-        if glfw.get_key(self.window, GLFW_CONSTANTS.GLFW_KEY_W) == GLFW_CONSTANTS.GLFW_PRESS: combo += 1
-        if glfw.get_key(self.window, GLFW_CONSTANTS.GLFW_KEY_A) == GLFW_CONSTANTS.GLFW_PRESS: combo += 2
-        if glfw.get_key(self.window, GLFW_CONSTANTS.GLFW_KEY_S) == GLFW_CONSTANTS.GLFW_PRESS: combo += 4
-        if glfw.get_key(self.window, GLFW_CONSTANTS.GLFW_KEY_D) == GLFW_CONSTANTS.GLFW_PRESS: combo += 8
+        for bit, action in ((1, "camera.forward"), (2, "camera.left"), (4, "camera.back"), (8, "camera.right")):
+            if self.input.held(action):
+                combo += bit
 
         if combo in self.walk_offset_lookup:
             direction = self.walk_offset_lookup[combo]
@@ -147,154 +326,241 @@ class App:
             dPos = [scale * np.cos(angle), scale * np.sin(angle), 0.0]
             self.scene.move_player(dPos)
 
-        # ---------------- Переключение режима перемещения куба ----------------
-        g_pressed = glfw.get_key(self.window, GLFW_CONSTANTS.GLFW_KEY_G) == GLFW_CONSTANTS.GLFW_PRESS
-        n_pressed = glfw.get_key(self.window, GLFW_CONSTANTS.GLFW_KEY_N) == GLFW_CONSTANTS.GLFW_PRESS
-
-        if g_pressed or n_pressed:
-            if not self.move_mode:
-                self.selected_entities = self.scene.get_all_selected()
-
-                for selected_entity in self.selected_entities:
-                    self.selected_entity = selected_entity
-
-                    # Клонирование объекта (N)
-                    if n_pressed:
-                        pos = list(self.selected_entity.position)
-                        eulers = list(self.selected_entity.eulers)
-                        color = tuple(self.selected_entity.material.color)
-                        self.selected_entity.is_selected = False
-
-                        self.selected_entity = self.scene.add_cube(pos, eulers, color)
-                        self.rebuild_object_window()
-
-                if self.selected_entity:
-                    self.move_mode = True
-                    self.move_axis = None
-
-        # ---------------- Выбор оси перемещения ----------------
-        if self.move_mode:
-            if glfw.get_key(self.window, GLFW_CONSTANTS.GLFW_KEY_X) == GLFW_CONSTANTS.GLFW_PRESS:
-                self.move_axis = 'X'
-            elif glfw.get_key(self.window, GLFW_CONSTANTS.GLFW_KEY_Y) == GLFW_CONSTANTS.GLFW_PRESS:
-                self.move_axis = 'Y'
-            elif glfw.get_key(self.window, GLFW_CONSTANTS.GLFW_KEY_Z) == GLFW_CONSTANTS.GLFW_PRESS:
-                self.move_axis = 'Z'
-
-        # ---------------- Окна интерфейса ----------------
-        if glfw.get_key(self.window, GLFW_CONSTANTS.GLFW_KEY_O) == GLFW_CONSTANTS.GLFW_PRESS:
-            self.toggle_object_window()
-            self.rebuild_object_window()
-
-        if glfw.get_key(self.window, GLFW_CONSTANTS.GLFW_KEY_C) == GLFW_CONSTANTS.GLFW_PRESS:
-            self.open_material_editor()
-
-        # ---------------- Удаление объектов ----------------
-        if glfw.get_key(self.window, GLFW_CONSTANTS.GLFW_KEY_DELETE) == GLFW_CONSTANTS.GLFW_PRESS:
-            for e in self.scene.get_all_selected():
-                self.scene.remove_entity(e)
-
-        # ---------------- Импорт/экспорт сцены ----------------
-        m_pressed = glfw.get_key(self.window, GLFW_CONSTANTS.GLFW_KEY_M) == GLFW_CONSTANTS.GLFW_PRESS
-        ctrl_pressed = (
-            glfw.get_key(self.window, GLFW_CONSTANTS.GLFW_KEY_LEFT_CONTROL) == GLFW_CONSTANTS.GLFW_PRESS or
-            glfw.get_key(self.window, GLFW_CONSTANTS.GLFW_KEY_RIGHT_CONTROL) == GLFW_CONSTANTS.GLFW_PRESS
-        )
-
-        if m_pressed:
-            dialog = SimpleInputDialog(default_text="scene.txt")
-            if dialog.exec():
-                filename = dialog.result_text
-                if filename:
-                    path = "scenes/" + filename
-                    if ctrl_pressed:
-                        self.scene.import_scene(path)
-                    else:
-                        self.scene.export_scene(path)
+    def look_camera(self):
+        """Вращение камеры мышью, пока зажат Shift (курсор скрыт и возвращается в центр)."""
+        looking = self.input.held("camera.look")
+        if looking != self.looking:
+            self.looking = looking
+            glfw.set_input_mode(
+                self.window, GLFW_CONSTANTS.GLFW_CURSOR,
+                GLFW_CONSTANTS.GLFW_CURSOR_HIDDEN if looking else GLFW_CONSTANTS.GLFW_CURSOR_NORMAL,
+            )
+        if not looking:
+            return
 
-    # --------------------------------------------------------------------
-    #                             МЫШЬ
-    # --------------------------------------------------------------------
+        x, y = glfw.get_cursor_pos(self.window)
 
-    def handle_mouse(self):
-        """Обрабатывает вращение камеры и перемещение кубов."""
+        rate = self.frameTime / 16.7
+        theta_inc = rate * ((SCREEN_WIDTH / 2) - x) * 0.1
+        phi_inc = rate * ((SCREEN_HEIGHT / 2) - y) * 0.1
 
-        # ----------- Вращение камеры при зажатом Shift ------------
-        shift_pressed = (
-            glfw.get_key(self.window, GLFW_CONSTANTS.GLFW_KEY_LEFT_SHIFT) == GLFW_CONSTANTS.GLFW_PRESS or
-            glfw.get_key(self.window, GLFW_CONSTANTS.GLFW_KEY_RIGHT_SHIFT) == GLFW_CONSTANTS.GLFW_PRESS
-        )
+        self.scene.spin_player(theta_inc, phi_inc)
+        glfw.set_cursor_pos(self.window, SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
 
-        if shift_pressed:
-            glfw.set_input_mode(self.window, GLFW_CONSTANTS.GLFW_CURSOR, GLFW_CONSTANTS.GLFW_CURSOR_HIDDEN)
-            x, y = glfw.get_cursor_pos(self.window)
+    def zoom_camera(self, event):
+        """Колесо мыши — шаг камеры вперёд / назад по направлению взгляда."""
+        self.scene.move_player(self.scene.camera.forwards * event.amount * ZOOM_STEP)
 
-            rate = self.frameTime / 16.7
-            theta_inc = rate * ((SCREEN_WIDTH / 2) - x) * 0.1
-            phi_inc = rate * ((SCREEN_HEIGHT / 2) - y) * 0.1
+    # --------------------------------------------------------------------
+    #                       ПЕРЕМЕЩЕНИЕ ВЫДЕЛЕНИЯ
+    # --------------------------------------------------------------------
 
-            self.scene.spin_player(theta_inc, phi_inc)
-            glfw.set_cursor_pos(self.window, SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
+    def begin_move(self, clone: bool):
+        """
+        G — режим перемещения выделения, N — то же с клонированием:
+        копии ставятся рядом с выделением по оси X (в занятые клетки не
+        попадают) и перемещаются вместо оригиналов. Клонирование и всё
+        перетаскивание до выхода из режима отменяются одним Ctrl+Z.
+        """
+        self.scene.history.begin_group()
+
+        if clone:
+            selected_ids = self.scene.selected_ids()
+            if len(selected_ids):
+                positions = self.scene.voxels.positions[self.scene.voxels.selected]
+                span = np.ptp(positions[:, 0]) + self.GRID_SIZE
+                self.scene.duplicate(selected_ids, offset=[span, 0, 0])
+
+        self.move_ids = self.scene.selected_ids()
+
+        if len(self.move_ids):
+            self.move_mode = True
+            self.move_axis = None
         else:
-            glfw.set_input_mode(self.window, GLFW_CONSTANTS.GLFW_CURSOR, GLFW_CONSTANTS.GLFW_CURSOR_NORMAL)
+            self.scene.history.end_group()
 
-        # ----------- Выход из режима перемещения ПКМ ------------
-        if self.move_mode and glfw.get_mouse_button(
-                self.window, GLFW_CONSTANTS.GLFW_MOUSE_BUTTON_RIGHT) == GLFW_CONSTANTS.GLFW_PRESS:
+    def end_move(self):
+        """Выход из режима перемещения (ПКМ)."""
+        self.move_mode = False
+        self.move_axis = None
+        self.move_ids = np.zeros(0, dtype=np.int64)
+        self.scene.history.end_group()
+
+    def set_move_axis(self, axis: str):
+        """Ось перемещения; сдвиг отсчитывается от положения курсора в момент выбора оси."""
+        if axis != self.move_axis:
+            self.move_axis = axis
+            self.move_anchor = self._move_cursor_coordinate()
+            self.move_offset = 0.0
+
+    def rotate_moved(self, turns: int):
+        """Поворот выделения на 90° вокруг оси перемещения (по умолчанию Z)."""
+        self.scene.rotate90(self.move_ids, {'X': 0, 'Y': 1, 'Z': 2}.get(self.move_axis, 2), turns)
+
+    def drag_moved(self):
+        """
+        Перемещение кубов по выбранной оси вслед за курсором.
+        Выделение сдвигается целиком на относительный шаг сетки, одной
+        операцией Scene.translate; упёршись в чужой куб, оно останавливается.
+        """
+        max_dist = 20.0
+        target = (self._move_cursor_coordinate() - self.move_anchor) * max_dist
+        target = round(target / self.GRID_SIZE) * self.GRID_SIZE
+
+        if target != self.move_offset:
+            delta = np.zeros(3, dtype=np.float32)
+            delta['XYZ'.index(self.move_axis)] = target - self.move_offset
+            if self.scene.translate(self.move_ids, delta):
+                self.move_offset = target
+
+    def _move_cursor_coordinate(self) -> float:
+        """Координата курсора в [-1, 1] вдоль оси перемещения: X — по горизонтали, Y/Z — по вертикали."""
+        x, y = glfw.get_cursor_pos(self.window)
+        if self.move_axis == 'X':
+            return (x / SCREEN_WIDTH - 0.5) * 2
+        return -(y / SCREEN_HEIGHT - 0.5) * 2
 
-            self.move_mode = False
-            self.move_axis = None
-            self.selected_entities = []
-            self.selected_entity = None
+    # --------------------------------------------------------------------
+    #                              ВЫДЕЛЕНИЕ
+    # --------------------------------------------------------------------
+
+    def select_hit(self, hit, add: bool = False):
+        """
+        Выделяет куб под курсором. Без add выделение заменяется
+        (клик в пустоту снимает его), с add — куб добавляется к выделению.
+        """
+        if hit is None and add:
             return
 
-        # ----------- Перемещение кубов по выбранной оси ------------
-        if self.move_mode and self.move_axis and self.selected_entity:
-            x, y = glfw.get_cursor_pos(self.window)
+        if not add:
+            self.scene.select_all(False)
+        if hit is not None:
+            self.scene.set_selected([hit.voxel_id])
+
+    def select_selection_bounds(self):
+        """B — выделить всё в габаритах текущего выделения."""
+        selected = self.scene.voxels.slots_of(self.scene.selected_ids())
+        if len(selected):
+            positions = self.scene.voxels.positions[selected]
+            self.scene.select_box(positions.min(axis=0), positions.max(axis=0), add=True)
+
+    def select_around_cursor(self, event, sphere: bool, add: bool):
+        """R — сфера вокруг куба под курсором, K — все кубы его цвета (с Ctrl — добавить)."""
+        hit = self.renderer.pick(self.scene, event.x, event.y)
+        if hit is None:
+            return
+        slot = self.scene.voxels.slot(hit.voxel_id)
+        if sphere:
+            center = self.scene.voxels.positions[slot].copy()
+            self.scene.select_sphere(center, self.SELECT_RADIUS, add=add)
+        else:
+            color = self.scene.voxels.colors_of(slot).copy()
+            self.scene.select_color(color, add=add)
 
-            nx = (x / SCREEN_WIDTH - 0.5) * 2
-            ny = (y / SCREEN_HEIGHT - 0.5) * 2
+    def place_adjacent(self, hit):
+        """Ставит куб цвета задетого в клетку перед гранью, в которую попал луч."""
+        if hit is None or not any(hit.normal):
+            return
 
-            max_dist = 20.0
+        position = np.array(hit.adjacent_cell, dtype=np.float32) * self.GRID_SIZE
+        color = self.scene.voxels.colors_of(self.scene.voxels.slot(hit.voxel_id))
 
-            if self.move_axis == 'X':
-                new_pos = round((nx * max_dist) / self.GRID_SIZE) * self.GRID_SIZE
-                for e in self.selected_entities:
-                    e.position[0] = new_pos
+        self.scene.select_all(False)
+        self.scene.add_cube(position, [0, 0, 0], color)
 
-            elif self.move_axis == 'Y':
-                new_pos = round((-ny * max_dist) / self.GRID_SIZE) * self.GRID_SIZE
-                for e in self.selected_entities:
-                    e.position[1] = new_pos
+    # --------------------------------------------------------------------
+    #                              СЦЕНА
+    # --------------------------------------------------------------------
 
-            elif self.move_axis == 'Z':
-                new_pos = round((-ny * max_dist) / self.GRID_SIZE) * self.GRID_SIZE
-                for e in self.selected_entities:
-                    e.position[2] = new_pos
+    def scene_file_dialog(self, load: bool):
+        """M — сохранить сцену в файл (в фоне), Ctrl + M — загрузить."""
+        dialog = SimpleInputDialog(default_text="scene.txt")
+        if dialog.exec():
+            filename = dialog.result_text
+            if filename:
+                path = "scenes/" + filename
+                if load:
+                    self.scene.import_scene(path)
+                else:
+                    self.autosaver.save_now(path)
+
+    def generate_terrain(self):
+        """Ctrl + T — рельеф TERRAIN_SIZE под камерой (генерируется в фоне)."""
+        cell = self.scene.grid.cell_of(self.scene.camera.position.reshape(1, 3))[0]
+        origin = cell - [TERRAIN_SIZE[0] // 2, TERRAIN_HEIGHT, TERRAIN_SIZE[1] // 2]
+        self.generator.generate(
+            self.scene,
+            Terrain(size=TERRAIN_SIZE, height=TERRAIN_HEIGHT, origin=origin, seed=self.terrain_seed),
+        )
+        self.terrain_seed += 1
 
     # --------------------------------------------------------------------
     #                           FPS
     # --------------------------------------------------------------------
 
     def calculateFramerate(self):
-        """Подсчёт FPS и обновление заголовка окна."""
+        """
+        Подсчёт FPS и обновление заголовка окна: нарисованные кадры
+        и пропущенные (ничего не изменилось) итерации цикла в секунду.
+        """
         self.currentTime = glfw.get_time()
         delta = self.currentTime - self.lastTime
 
         if delta >= 1.0:
-            fps = max(1, int(self.numFrames / delta))
-            glfw.set_window_title(self.window, f"Running at {fps} fps")
+            fps = int((self.frame_pacer.rendered - self.numFrames) / delta)
+            skipped = int((self.frame_pacer.skipped - self.numSkipped) / delta)
+            stats = self.renderer.gl.last_frame_stats
+            glfw.set_window_title(
+                self.window,
+                f"Running at {fps} fps, {skipped} skipped/s | {stats['draw_calls']} draws, "
+                f"{self.renderer.gl.state_changes} state changes | {self.autosaver.status_text()}"
+                + (f" | {self.generator.status_text()}" if self.generator.busy else "")
+            )
 
             self.lastTime = self.currentTime
-            self.numFrames = 0
-            self.frameTime = 1000.0 / fps
+            self.numFrames = self.frame_pacer.rendered
+            self.numSkipped = self.frame_pacer.skipped
+
+            if self.profiler_overlay is not None and self.profiler_overlay.isVisible():
+                self.update_profiler_overlay()
 
-        self.numFrames += 1
+    # --------------------------------------------------------------------
+    #                           ПРОФИЛИРОВАНИЕ
+    # --------------------------------------------------------------------
+
+    def dump_frame_trace(self) -> str:
+        """Сохраняет последние кадры профилировщика в Chrome trace JSON (папка traces)."""
+        path = self.profiler.export_chrome_trace(time.strftime("traces/frame_trace_%Y%m%d_%H%M%S.json"))
+        print(f"[Profiler] {len(self.profiler.frames)} frames written to {path}")
+        return path
+
+    def toggle_profiler_overlay(self):
+        """Показывает или прячет оверлей с перцентилями фаз кадра."""
+        if self.profiler_overlay is None:
+            self.profiler_overlay = ProfilerOverlay()
+
+        if self.profiler_overlay.isVisible():
+            self.profiler_overlay.hide()
+        else:
+            self.update_profiler_overlay()
+            self.profiler_overlay.show()
+
+    def update_profiler_overlay(self):
+        """Обновляет таблицу оверлея и ставит его в левый верхний угол окна OpenGL."""
+        self.profiler_overlay.update_stats(self.profiler.phase_stats())
+        x, y = glfw.get_window_pos(self.window)
+        self.profiler_overlay.move(x + 10, y + 10)
 
     # --------------------------------------------------------------------
 
     def quit(self):
         """Освобождение ресурсов и завершение приложения."""
+        # несохранённые изменения дописываются в автосохранение перед выходом
+        if self.autosaver.dirty:
+            self.autosaver.save_now()
+        self.autosaver.close()
+        self.generator.close()
+
         if self.renderer:
             self.renderer.quit()
         glfw.terminate()
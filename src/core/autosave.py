@@ -0,0 +1,120 @@
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .scene_formats import write_scene_atomic
+
+
+class Autosaver:
+    """
+    Фоновое сохранение сцены.
+
+    На главном потоке снимается снимок колонок хранилища — копии массивов,
+    это memcpy порядка миллисекунд даже для миллиона вокселей. Запись,
+    fsync и атомарная замена файла (write_scene_atomic) идут в отдельном
+    потоке, поэтому цикл рендеринга не ждёт диска. Сохранения выполняются
+    по одному в порядке запроса; сжатие занимает не больше половины
+    ядер процессора, чтобы не отнимать время у кадра.
+
+    tick() вызывается каждый кадр и раз в interval секунд сохраняет сцену
+    в filepath, если она изменилась (Scene.revision). save_now() сохраняет
+    сразу — в filepath или в указанный файл.
+    """
+
+    def __init__(self, scene, filepath: str = "scenes/autosave.voxc", interval: float = 30.0):
+        self.scene = scene
+        self.filepath = filepath
+        self.interval = interval
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="autosave")
+        self._compress_workers = max(1, (os.cpu_count() or 2) // 2)
+        self._pending: Future | None = None
+        self._saved_revision = scene.revision
+        self._last_attempt = time.monotonic()
+
+        # Результат последнего сохранения — для заголовка окна
+        self.last_path: str | None = None
+        self.last_saved_at: float | None = None
+        self.last_duration = 0.0
+        self.last_bytes = 0
+        self.last_error: str | None = None
+
+        # Сколько миллисекунд главного потока занял последний снимок
+        self.snapshot_ms = 0.0
+
+    # ------------------------------------------------------------------
+
+    @property
+    def busy(self) -> bool:
+        """Идёт ли сейчас запись."""
+        return self._pending is not None and not self._pending.done()
+
+    @property
+    def dirty(self) -> bool:
+        """Менялась ли сцена с последнего автосохранения."""
+        return self.scene.revision != self._saved_revision
+
+    def tick(self) -> bool:
+        """Запускает периодическое автосохранение, если пора. True, если запущено."""
+        if self.busy or not self.dirty:
+            return False
+        if time.monotonic() - self._last_attempt < self.interval:
+            return False
+        return self.save_now()
+
+    def save_now(self, filepath: str | None = None) -> bool:
+        """Снимает снимок сцены и отдаёт его на запись в фоне."""
+        start = time.perf_counter()
+        store = self.scene.voxels
+        snapshot = (
+            store.positions.copy(), store.eulers.copy(), store.colors, store.kinds.copy()
+        )
+        self.snapshot_ms = (time.perf_counter() - start) * 1000.0
+
+        self._last_attempt = time.monotonic()
+        self._pending = self._executor.submit(
+            self._write, filepath or self.filepath, snapshot, self.scene.grid.cell_size, self.scene.revision
+        )
+        return True
+
+    def _write(self, filepath: str, snapshot, cell_size: float, revision: int) -> None:
+        """Поток записи: сериализация, fsync и атомарная замена файла."""
+        start = time.perf_counter()
+        try:
+            os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+            _, size = write_scene_atomic(
+                filepath, *snapshot, cell_size=cell_size, workers=self._compress_workers
+            )
+        except Exception as e:
+            self.last_error = str(e)
+            print("[Autosave] Save failed:", e)
+            return
+
+        self.last_path = filepath
+        self.last_saved_at = time.time()
+        self.last_duration = time.perf_counter() - start
+        self.last_bytes = size
+        self.last_error = None
+        if filepath == self.filepath:
+            self._saved_revision = revision
+        print(f"[Autosave] Saved {filepath}: {size} bytes in {self.last_duration:.2f} s")
+
+    # ------------------------------------------------------------------
+
+    def status_text(self) -> str:
+        """Короткая строка состояния для заголовка окна."""
+        if self.busy:
+            return "saving..."
+        if self.last_error is not None:
+            return f"save failed: {self.last_error}"
+        if self.last_saved_at is None:
+            return "not saved"
+        saved_at = time.strftime("%H:%M:%S", time.localtime(self.last_saved_at))
+        return (
+            f"saved {os.path.basename(self.last_path)} at {saved_at}, "
+            f"{self.last_duration:.2f} s, {self.last_bytes / 1024:.0f} KB"
+        )
+
+    def close(self) -> None:
+        """Дожидается незавершённых сохранений и останавливает поток записи."""
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,69 @@
+import math
+
+
+class FramePacer:
+    """
+    Решает, рисовать ли кадр на этой итерации главного цикла, и сколько
+    ждать событий до следующей.
+
+    Кадр рисуется, только если изменилось состояние вида (state — любое
+    сравнимое значение: ревизии сцены и выделения, положение камеры),
+    кто-то попросил перерисовку (request_redraw: окно открылось, сменило
+    размер и т. п.) или ввод активен (зажаты клавиши движения, строятся
+    меши). Не чаще max_fps раз в секунду (0 — без ограничения).
+
+    Между кадрами цикл ждёт событий glfw.wait_events_timeout(timeout()):
+    до срока следующего кадра, если есть что рисовать, иначе idle_timeout
+    секунд. Окна Qt не будят GLFW, поэтому idle_timeout задаёт и то, как
+    часто в простое обрабатываются их события.
+
+    rendered / skipped — сколько итераций нарисовали кадр и сколько нет.
+    """
+
+    def __init__(self, max_fps: float = 60.0, idle_timeout: float = 1 / 30):
+        self.max_fps = max_fps
+        self.idle_timeout = idle_timeout
+
+        self._state = None
+        self._dirty = True
+        self._active = False
+        self._next_frame = -math.inf
+
+        self.rendered = 0
+        self.skipped = 0
+
+    @property
+    def frame_interval(self) -> float:
+        """Минимальный промежуток между кадрами, с."""
+        return 1.0 / self.max_fps if self.max_fps > 0 else 0.0
+
+    def request_redraw(self) -> None:
+        """Просит нарисовать кадр, даже если состояние вида не менялось."""
+        self._dirty = True
+
+    def should_render(self, state, active: bool, now: float) -> bool:
+        """
+        Нужно ли рисовать кадр сейчас. Если да, после отрисовки вызывается
+        frame_rendered(); если нет — итерация считается пропущенной.
+        """
+        if state != self._state:
+            self._state = state
+            self._dirty = True
+        self._active = active
+
+        if (self._dirty or active) and now >= self._next_frame:
+            return True
+        self.skipped += 1
+        return False
+
+    def frame_rendered(self, now: float) -> None:
+        """Отмечает нарисованный кадр: следующий — не раньше чем через frame_interval."""
+        self._dirty = False
+        self._next_frame = now + self.frame_interval
+        self.rendered += 1
+
+    def timeout(self, now: float) -> float:
+        """Сколько секунд ждать событий перед следующей итерацией (0 — не ждать)."""
+        if self._dirty or self._active:
+            return max(0.0, self._next_frame - now)
+        return self.idle_timeout
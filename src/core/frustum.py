@@ -0,0 +1,30 @@
+import numpy as np
+
+
+def frustum_planes(projection: np.ndarray, view: np.ndarray) -> np.ndarray:
+    """
+    Шесть плоскостей пирамиды видимости (left, right, bottom, top, near, far)
+    из матриц проекции и вида в соглашении pyrr (вектор-строка: clip = p @ view @ projection).
+    Возвращает (6, 4): нормаль (a, b, c), направленная внутрь, и смещение d;
+    точка p внутри, если a·x + b·y + c·z + d >= 0 для всех плоскостей.
+    """
+    clip = np.asarray(view, dtype=np.float64) @ np.asarray(projection, dtype=np.float64)
+    x, y, z, w = clip[:, 0], clip[:, 1], clip[:, 2], clip[:, 3]
+
+    planes = np.stack([w + x, w - x, w + y, w - y, w + z, w - z])
+    planes /= np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
+    return planes
+
+
+def boxes_in_frustum(planes: np.ndarray, mins: np.ndarray, maxs: np.ndarray) -> np.ndarray:
+    """
+    Маска (N,) для AABB [mins, maxs] формы (N, 3): True, если бокс хотя бы
+    частично внутри пирамиды. Для каждой плоскости проверяется ближайшая
+    к ней «положительная» вершина бокса — всё одним векторизованным проходом.
+    """
+    normals, offsets = planes[:, :3], planes[:, 3]
+
+    # (N, 6, 3): вершина бокса, дальше всего продвинутая вдоль нормали плоскости
+    positive = np.where(normals[None, :, :] >= 0, maxs[:, None, :], mins[:, None, :])
+    distances = np.einsum("npk,pk->np", positive, normals) + offsets
+    return np.all(distances >= 0, axis=1)
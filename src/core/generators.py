@@ -0,0 +1,445 @@
+import collections
+import multiprocessing
+import os
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .history import EditGroup
+
+
+# Сторона области, которую считает одна задача пула, в клетках.
+# Фигуры режутся на кубы SHAPE_REGION³, рельеф — на столбы TERRAIN_REGION²
+# во всю высоту: результат одной задачи вставляется в сцену за несколько мс
+SHAPE_REGION = 32
+TERRAIN_REGION = 32
+
+# Сколько секунд главного потока за кадр может уходить на вставку готовых областей
+APPLY_BUDGET = 0.008
+
+# Полосы цвета рельефа: (доля высоты, до которой действует цвет, RGBA)
+TERRAIN_BANDS = (
+    (0.30, (0.82, 0.76, 0.52, 1.0)),    # песок
+    (0.60, (0.33, 0.62, 0.24, 1.0)),    # трава
+    (0.85, (0.47, 0.45, 0.43, 1.0)),    # скалы
+    (1.00, (0.95, 0.95, 0.97, 1.0)),    # снег
+)
+
+
+# ======================================================================
+# Noise
+# ======================================================================
+
+def _hash2(ix: np.ndarray, iz: np.ndarray, seed: int) -> np.ndarray:
+    """Псевдослучайные числа [0, 1) для целочисленных точек решётки — чистая функция координат и seed."""
+    h = ((ix & 0xFFFFFFFF).astype(np.uint32) * np.uint32(0x27D4EB2D)
+         ^ (iz & 0xFFFFFFFF).astype(np.uint32) * np.uint32(0x165667B1))
+    h ^= np.uint32((seed * 0x9E3779B9) & 0xFFFFFFFF)
+    h ^= h >> np.uint32(15)
+    h *= np.uint32(0x2C1B3C6D)
+    h ^= h >> np.uint32(12)
+    h *= np.uint32(0x297A2D39)
+    h ^= h >> np.uint32(15)
+    return h * (1.0 / 2 ** 32)
+
+
+def value_noise(x: np.ndarray, z: np.ndarray, seed: int) -> np.ndarray:
+    """Сглаженный шум значений на плоскости: [0, 1), решётка с шагом 1."""
+    x0, z0 = np.floor(x), np.floor(z)
+    fx, fz = x - x0, z - z0
+    fx = fx * fx * (3.0 - 2.0 * fx)
+    fz = fz * fz * (3.0 - 2.0 * fz)
+    ix, iz = x0.astype(np.int64), z0.astype(np.int64)
+
+    a, b = _hash2(ix, iz, seed), _hash2(ix + 1, iz, seed)
+    c, d = _hash2(ix, iz + 1, seed), _hash2(ix + 1, iz + 1, seed)
+    return (a + (b - a) * fx) * (1.0 - fz) + (c + (d - c) * fx) * fz
+
+
+def fractal_noise(x, z, seed: int, octaves: int = 5, persistence: float = 0.5,
+                  lacunarity: float = 2.0) -> np.ndarray:
+    """
+    Фрактальный шум (fBm): сумма octaves октав value_noise с частотой,
+    растущей в lacunarity раз, и амплитудой, падающей в persistence раз.
+    Нормирован в [0, 1). Каждая октава — свой seed.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    z = np.asarray(z, dtype=np.float64)
+    total = np.zeros(np.broadcast(x, z).shape)
+    amplitude, frequency, norm = 1.0, 1.0, 0.0
+    for octave in range(octaves):
+        total += amplitude * value_noise(x * frequency, z * frequency, seed * 131 + octave)
+        norm += amplitude
+        amplitude *= persistence
+        frequency *= lacunarity
+    return total / norm
+
+
+# ======================================================================
+# Shapes
+# ======================================================================
+
+class Shape(ABC):
+    """
+    Процедурная фигура в клетках сетки. Фигура — небольшое описание
+    (пересылается в процесс пула), а заполнение области lo..hi считает
+    generate() векторно. Результат области зависит только от фигуры
+    и координат, поэтому не зависит ни от разбиения, ни от числа процессов.
+
+    palette — цвета фигуры; generate() возвращает клетки (N, 3) int32
+    и номера цветов palette (N,) uint8.
+    """
+
+    region = SHAPE_REGION
+
+    @abstractmethod
+    def bounds(self) -> tuple[np.ndarray, np.ndarray]:
+        """Клетки фигуры лежат в [lo, hi) — (3,) int64 каждое."""
+
+    def regions(self) -> list[tuple[tuple[int, ...], tuple[int, ...]]]:
+        """Разбиение bounds() на области по region клеток (порядок детерминирован)."""
+        lo, hi = self.bounds()
+        step = self._region_step()
+        starts = [range(int(lo[axis]), int(hi[axis]), step[axis]) for axis in range(3)]
+        return [
+            ((x, y, z), (min(x + step[0], int(hi[0])), min(y + step[1], int(hi[1])), min(z + step[2], int(hi[2]))))
+            for x in starts[0] for y in starts[1] for z in starts[2]
+        ]
+
+    def _region_step(self) -> tuple[int, int, int]:
+        return (self.region,) * 3
+
+    @abstractmethod
+    def generate(self, lo, hi) -> tuple[np.ndarray, np.ndarray]:
+        """Клетки области [lo, hi), занятые фигурой, и номера их цветов в palette."""
+
+
+class SDFShape(Shape):
+    """
+    Фигура, заданная функцией расстояния со знаком (SDF, в клетках):
+    клетка занята, если её центр внутри (sdf <= 0); у полой фигуры — только
+    слой толщиной в одну клетку у поверхности.
+    """
+
+    def __init__(self, color, hollow: bool = False):
+        self.palette = np.asarray(color, dtype=np.float32).reshape(1, 4)
+        self.hollow = hollow
+
+    @abstractmethod
+    def sdf(self, points: np.ndarray) -> np.ndarray:
+        """Расстояние со знаком от точек (..., 3) до поверхности фигуры."""
+
+    def generate(self, lo, hi):
+        axes = [np.arange(lo[axis], hi[axis]) for axis in range(3)]
+        cells = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, 3)
+        distance = self.sdf(cells.astype(np.float64))
+        inside = distance <= 0.0
+        if self.hollow:
+            inside &= distance > -1.0
+        cells = cells[inside].astype(np.int32)
+        return cells, np.zeros(len(cells), dtype=np.uint8)
+
+
+class Box(SDFShape):
+    """Параллелепипед из клеток lo..hi включительно."""
+
+    def __init__(self, lo, hi, color=(0.5, 0.5, 0.5, 1.0), hollow: bool = False):
+        super().__init__(color, hollow)
+        self.lo = np.minimum(lo, hi).astype(np.int64)
+        self.hi = np.maximum(lo, hi).astype(np.int64)
+
+    def bounds(self):
+        return self.lo, self.hi + 1
+
+    def sdf(self, points):
+        center = (self.lo + self.hi) / 2.0
+        half = (self.hi - self.lo) / 2.0 + 0.5
+        q = np.abs(points - center) - half
+        outside = np.linalg.norm(np.maximum(q, 0.0), axis=-1)
+        return outside + np.minimum(q.max(axis=-1), 0.0)
+
+
+class Sphere(SDFShape):
+    """Шар с центром center и радиусом radius (в клетках)."""
+
+    def __init__(self, center, radius: float, color=(0.5, 0.5, 0.5, 1.0), hollow: bool = False):
+        super().__init__(color, hollow)
+        self.center = np.asarray(center, dtype=np.float64)
+        self.radius = float(radius)
+
+    def bounds(self):
+        return (np.floor(self.center - self.radius).astype(np.int64),
+                np.ceil(self.center + self.radius).astype(np.int64) + 1)
+
+    def sdf(self, points):
+        return np.linalg.norm(points - self.center, axis=-1) - self.radius
+
+
+class Cylinder(SDFShape):
+    """Цилиндр радиуса radius с осью от клетки start до клетки end (торцы плоские)."""
+
+    def __init__(self, start, end, radius: float, color=(0.5, 0.5, 0.5, 1.0), hollow: bool = False):
+        super().__init__(color, hollow)
+        self.start = np.asarray(start, dtype=np.float64)
+        self.end = np.asarray(end, dtype=np.float64)
+        self.radius = float(radius)
+
+    def bounds(self):
+        lo = np.minimum(self.start, self.end) - self.radius
+        hi = np.maximum(self.start, self.end) + self.radius
+        return np.floor(lo).astype(np.int64), np.ceil(hi).astype(np.int64) + 1
+
+    def sdf(self, points):
+        axis = self.end - self.start
+        length = np.linalg.norm(axis)
+        axis = axis / length if length > 0 else np.array([0.0, 1.0, 0.0])
+
+        # расстояние вдоль оси от середины и поперёк оси
+        along = (points - self.start) @ axis
+        across = np.linalg.norm(points - self.start - along[..., None] * axis, axis=-1)
+        d = np.stack([across - self.radius, np.abs(along - length / 2.0) - length / 2.0 - 0.5], axis=-1)
+        return np.minimum(d.max(axis=-1), 0.0) + np.linalg.norm(np.maximum(d, 0.0), axis=-1)
+
+
+class Line(SDFShape):
+    """Отрезок от клетки start до клетки end толщиной 2 * radius (капсула)."""
+
+    def __init__(self, start, end, color=(0.5, 0.5, 0.5, 1.0), radius: float = 0.5):
+        super().__init__(color, hollow=False)
+        self.start = np.asarray(start, dtype=np.float64)
+        self.end = np.asarray(end, dtype=np.float64)
+        self.radius = float(radius)
+
+    def bounds(self):
+        lo = np.minimum(self.start, self.end) - self.radius
+        hi = np.maximum(self.start, self.end) + self.radius
+        return np.floor(lo).astype(np.int64), np.ceil(hi).astype(np.int64) + 1
+
+    def sdf(self, points):
+        segment = self.end - self.start
+        length2 = float(segment @ segment)
+        t = np.zeros(points.shape[:-1]) if length2 == 0 else np.clip((points - self.start) @ segment / length2, 0.0, 1.0)
+        return np.linalg.norm(points - self.start - t[..., None] * segment, axis=-1) - self.radius
+
+
+class Terrain(Shape):
+    """
+    Рельеф по карте высот из fractal_noise: столб клеток от origin[1] до
+    высоты в каждой клетке size[0] × size[1] (x, z), высота до height.
+    scale — размер «холма» в клетках, seed — зерно шума. Цвет — по полосам
+    TERRAIN_BANDS от доли высоты.
+
+    fill="surface" ставит в столб только видимые клетки: от высоты самого
+    низкого из четырёх соседей до вершины (обрывы без дыр, внутренность
+    пустая); fill="solid" — столб целиком.
+    """
+
+    region = TERRAIN_REGION
+
+    def __init__(self, size=(512, 512), height: int = 128, origin=(0, 0, 0), seed: int = 0,
+                 scale: float = 128.0, octaves: int = 5, persistence: float = 0.5,
+                 lacunarity: float = 2.0, fill: str = "surface"):
+        if fill not in ("surface", "solid"):
+            raise ValueError(f"unknown terrain fill {fill!r}")
+        self.size = (int(size[0]), int(size[1]))
+        self.height = int(height)
+        self.origin = np.asarray(origin, dtype=np.int64)
+        self.seed = int(seed)
+        self.scale = float(scale)
+        self.octaves = int(octaves)
+        self.persistence = float(persistence)
+        self.lacunarity = float(lacunarity)
+        self.fill = fill
+        self.palette = np.array([color for _, color in TERRAIN_BANDS], dtype=np.float32)
+
+    def bounds(self):
+        lo = self.origin
+        return lo, lo + np.array([self.size[0], self.height, self.size[1]])
+
+    def _region_step(self):
+        return self.region, self.height, self.region
+
+    def heights(self, x, z) -> np.ndarray:
+        """Высота столба (1..height клеток) в клетках x, z (отсчёт от origin)."""
+        noise = fractal_noise(
+            np.asarray(x) / self.scale, np.asarray(z) / self.scale,
+            self.seed, self.octaves, self.persistence, self.lacunarity,
+        )
+        return 1 + np.floor(noise * self.height).astype(np.int64).clip(0, self.height - 1)
+
+    def generate(self, lo, hi):
+        lo = np.asarray(lo) - self.origin
+        hi = np.asarray(hi) - self.origin
+
+        # карта высот области с каймой в клетку — соседи на краях области
+        x = np.arange(lo[0] - 1, hi[0] + 1)
+        z = np.arange(lo[2] - 1, hi[2] + 1)
+        heights = self.heights(x[:, None], z[None, :])
+        top = heights[1:-1, 1:-1]
+
+        if self.fill == "solid":
+            bottom = np.zeros_like(top)
+        else:
+            neighbours = np.minimum.reduce([
+                heights[:-2, 1:-1], heights[2:, 1:-1], heights[1:-1, :-2], heights[1:-1, 2:]
+            ])
+            bottom = np.minimum(neighbours, top - 1)
+        bottom = np.maximum(bottom, lo[1])
+        top = np.minimum(top, hi[1])
+        counts = np.maximum(top - bottom, 0).reshape(-1)
+
+        # столбы → клетки: для каждой клетки столба — её высота
+        columns = np.repeat(np.arange(counts.size), counts)
+        starts = np.cumsum(counts) - counts
+        y = bottom.reshape(-1)[columns] + np.arange(columns.size) - starts[columns]
+        cx, cz = np.unravel_index(columns, top.shape)
+
+        cells = np.stack([cx + lo[0], y, cz + lo[2]], axis=1) + self.origin
+        limits = np.array([limit for limit, _ in TERRAIN_BANDS]) * self.height
+        materials = np.minimum(np.searchsorted(limits, y, side="right"), len(limits) - 1)
+        return cells.astype(np.int32), materials.astype(np.uint8)
+
+
+def _generate_region(shape: Shape, lo, hi):
+    """Задача процесса пула: клетки и номера цветов одной области."""
+    return shape.generate(lo, hi)
+
+
+# ======================================================================
+# Generator
+# ======================================================================
+
+class GenerationJob:
+    """
+    Генерация одной фигуры: задачи пула по областям в порядке regions().
+    Готовые области вставляются в сцену (Scene.add_cubes) строго в этом
+    порядке, поэтому и состав, и id новых кубов одинаковы при любом числе
+    процессов и любом порядке их завершения.
+
+    Вставки всех областей копятся в одной группе правок и попадают
+    в журнал отмены одной записью, когда генерация закончена или отменена.
+    """
+
+    def __init__(self, scene, shape: Shape, futures):
+        self.scene = scene
+        self.shape = shape
+        self.total = len(futures)
+        self.added = 0
+        self._futures = collections.deque(futures)
+        self._started = time.perf_counter()
+        self.seconds = 0.0
+        self._edits = EditGroup()
+
+    @property
+    def done(self) -> bool:
+        return not self._futures
+
+    @property
+    def progress(self) -> float:
+        """Доля вставленных областей, 0..1."""
+        return 1.0 - len(self._futures) / self.total if self.total else 1.0
+
+    def apply(self, budget: float | None = APPLY_BUDGET) -> int:
+        """
+        Вставляет готовые области, пока не кончится budget секунд (None —
+        дождаться и вставить всё). Возвращает число добавленных кубов.
+        """
+        start = time.perf_counter()
+        added = 0
+        while self._futures:
+            future = self._futures[0]
+            if budget is not None and (not future.done() or time.perf_counter() - start >= budget):
+                break
+            cells, materials = future.result()
+            self._futures.popleft()
+            if len(cells):
+                positions = cells.astype(np.float32) * np.float32(self.scene.grid.cell_size)
+                with self.scene.history.collect(self._edits):
+                    added += len(self.scene.add_cubes(positions, self.shape.palette[materials]))
+
+        self.added += added
+        if not self._futures:
+            self._finish()
+        return added
+
+    def cancel(self) -> None:
+        """Отменяет ещё не начатые задачи; уже вставленное остаётся в сцене (и в журнале)."""
+        for future in self._futures:
+            future.cancel()
+        self._futures.clear()
+        self._finish()
+
+    def _finish(self) -> None:
+        """Кладёт вставки генерации в журнал отмены одной записью."""
+        self.seconds = time.perf_counter() - self._started
+        group, self._edits = self._edits, EditGroup()
+        if group.edits:
+            self.scene.history.record(group.edits[0] if len(group.edits) == 1 else group)
+
+
+class ProceduralGenerator:
+    """
+    Процедурное наполнение сцены в пуле процессов.
+
+    generate(scene, shape) режет фигуру на области и раздаёт их процессам
+    ProcessPoolExecutor — шум и SDF считаются векторно NumPy на всех ядрах
+    и не держат GIL главного потока. Сцена меняется только на главном
+    потоке: tick() каждый кадр вставляет готовые области, не дольше budget
+    секунд, так что цикл рендеринга не ждёт генерации. Каждая вставка —
+    одна пачка add_cubes; вся генерация — одна запись журнала отмены.
+
+    Процессы запускаются методом spawn (форк процесса с контекстом OpenGL
+    и потоками Qt небезопасен) при первой генерации и живут до close().
+    spawn заново импортирует главный модуль программы, поэтому main.py
+    импортирует окно, OpenGL и Qt только под if __name__ == "__main__",
+    а этот модуль — только NumPy.
+    """
+
+    def __init__(self, workers: int | None = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.jobs: list[GenerationJob] = []
+        self._executor: ProcessPoolExecutor | None = None
+
+    @property
+    def busy(self) -> bool:
+        """Есть ли невставленные области."""
+        return bool(self.jobs)
+
+    def generate(self, scene, shape: Shape) -> GenerationJob:
+        """Запускает генерацию shape в scene; области вставляет tick()."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        futures = [self._executor.submit(_generate_region, shape, lo, hi) for lo, hi in shape.regions()]
+        job = GenerationJob(scene, shape, futures)
+        self.jobs.append(job)
+        return job
+
+    def tick(self, budget: float = APPLY_BUDGET) -> int:
+        """Вставляет готовые области всех генераций (не дольше budget секунд)."""
+        deadline = time.perf_counter() + budget
+        added = 0
+        for job in list(self.jobs):
+            added += job.apply(max(0.0, deadline - time.perf_counter()))
+            if job.done:
+                self.jobs.remove(job)
+                print(f"[Generator] {type(job.shape).__name__}: {job.added} cubes in {job.seconds:.2f} s")
+        return added
+
+    def status_text(self) -> str:
+        """Короткая строка состояния для заголовка окна."""
+        if not self.jobs:
+            return ""
+        return "generating {:.0%}".format(sum(job.progress for job in self.jobs) / len(self.jobs))
+
+    def close(self) -> None:
+        """Отменяет незавершённые генерации и останавливает процессы."""
+        for job in self.jobs:
+            job.cancel()
+        self.jobs.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,195 @@
+from OpenGL.GL import *
+import numpy as np
+
+
+# ======================================================================
+# GL State
+# ======================================================================
+
+class GLState:
+    """
+    Кэш состояния OpenGL на стороне Python.
+
+    - локации uniform-переменных: словарь на каждую шейдерную программу,
+      glGetUniformLocation вызывается один раз на пару (программа, имя);
+    - текущие программа и VAO: повторные glUseProgram / glBindVertexArray
+      с тем же объектом пропускаются;
+    - последние загруженные значения uniform'ов каждой программы (OpenGL
+      хранит их в самой программе): загрузка того же значения пропускается.
+
+    Счётчики вызовов за текущий кадр — в frame_stats, за прошлый — в last_frame_stats
+    (vertices — вершины, отправленные draw call'ами, с учётом инстансов).
+    Кто привязывает программу или VAO в обход кэша (создание буферов, загрузка
+    мешей), должен вызвать invalidate_bindings().
+    """
+
+    def __init__(self):
+        self._locations: dict[int, dict[str, int]] = {}
+        self._uniforms: dict[tuple[int, int], bytes] = {}
+        self.program: int | None = None
+        self.vertex_array: int | None = None
+
+        self.frame_stats = self._new_stats()
+        self.last_frame_stats = self._new_stats()
+
+    @staticmethod
+    def _new_stats() -> dict:
+        return {
+            "draw_calls": 0,
+            "vertices": 0,
+            "program_binds": 0,
+            "vertex_array_binds": 0,
+            "uniform_uploads": 0,
+            "skipped": 0,
+        }
+
+    @property
+    def state_changes(self) -> int:
+        """Смены состояния за прошлый кадр: привязки программ и VAO плюс загрузки uniform'ов."""
+        stats = self.last_frame_stats
+        return stats["program_binds"] + stats["vertex_array_binds"] + stats["uniform_uploads"]
+
+    def begin_frame(self) -> None:
+        """Закрывает счётчики прошлого кадра и начинает новые."""
+        self.last_frame_stats = self.frame_stats
+        self.frame_stats = self._new_stats()
+
+    def invalidate_bindings(self) -> None:
+        """Забывает текущие программу и VAO — их могли сменить в обход кэша."""
+        self.program = None
+        self.vertex_array = None
+
+    # ------------------------------------------------------------------
+    # Bindings
+    # ------------------------------------------------------------------
+
+    def use_program(self, program: int) -> None:
+        if program == self.program:
+            self.frame_stats["skipped"] += 1
+            return
+        glUseProgram(program)
+        self.program = program
+        self.frame_stats["program_binds"] += 1
+
+    def bind_vertex_array(self, vertex_array: int) -> None:
+        if vertex_array == self.vertex_array:
+            self.frame_stats["skipped"] += 1
+            return
+        glBindVertexArray(vertex_array)
+        self.vertex_array = vertex_array
+        self.frame_stats["vertex_array_binds"] += 1
+
+    # ------------------------------------------------------------------
+    # Uniforms (в текущей программе)
+    # ------------------------------------------------------------------
+
+    def location(self, program: int, name: str) -> int:
+        """Локация uniform'а name в программе program (из кэша)."""
+        locations = self._locations.setdefault(program, {})
+        location = locations.get(name)
+        if location is None:
+            location = locations[name] = glGetUniformLocation(program, name)
+        return location
+
+    def _changed(self, name: str, value: np.ndarray) -> int:
+        """Локация uniform'а, если его значение отличается от загруженного, иначе -1."""
+        location = self.location(self.program, name)
+        if location == -1:
+            return -1
+
+        key = (self.program, location)
+        data = value.tobytes()
+        if self._uniforms.get(key) == data:
+            self.frame_stats["skipped"] += 1
+            return -1
+        self._uniforms[key] = data
+        self.frame_stats["uniform_uploads"] += 1
+        return location
+
+    def uniform_matrix4(self, name: str, value: np.ndarray) -> None:
+        value = np.ascontiguousarray(value, dtype=np.float32)
+        location = self._changed(name, value)
+        if location != -1:
+            glUniformMatrix4fv(location, 1, GL_FALSE, value)
+
+    def uniform4(self, name: str, value: np.ndarray) -> None:
+        value = np.ascontiguousarray(value, dtype=np.float32)
+        location = self._changed(name, value)
+        if location != -1:
+            glUniform4fv(location, 1, value)
+
+    def uniform1i(self, name: str, value: int) -> None:
+        location = self._changed(name, np.array([value], dtype=np.int32))
+        if location != -1:
+            glUniform1i(location, value)
+
+    # ------------------------------------------------------------------
+    # Draw calls
+    # ------------------------------------------------------------------
+
+    def draw_arrays(self, mode, first: int, count: int) -> None:
+        glDrawArrays(mode, first, count)
+        self.frame_stats["draw_calls"] += 1
+        self.frame_stats["vertices"] += count
+
+    def draw_arrays_instanced(self, mode, first: int, count: int, instance_count: int) -> None:
+        glDrawArraysInstanced(mode, first, count, instance_count)
+        self.frame_stats["draw_calls"] += 1
+        self.frame_stats["vertices"] += count * instance_count
+
+    def draw_elements(self, mode, count: int, index_type) -> None:
+        glDrawElements(mode, count, index_type, None)
+        self.frame_stats["draw_calls"] += 1
+        self.frame_stats["vertices"] += count
+
+
+# ======================================================================
+# Render Queue
+# ======================================================================
+
+class RenderQueue:
+    """
+    Очередь отрисовки кадра. Элементы отправляются пачками (массивами ключей)
+    и выдаются отсортированными по (программа, материал, меш), чтобы подряд
+    шли элементы с одинаковым состоянием и GLState пропускал повторные
+    привязки и загрузки uniform'ов.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self) -> None:
+        self._programs: list[np.ndarray] = []
+        self._materials: list[np.ndarray] = []
+        self._meshes: list[np.ndarray] = []
+        self._items: list[np.ndarray] = []
+
+    def submit(self, program: int, materials, meshes, items) -> None:
+        """
+        Добавляет пачку элементов одной программы. materials, meshes — целые
+        ключи (одно значение или по одному на элемент), items — что рисовать
+        (номера строк, индексы мешей и т. п.).
+        """
+        items = np.asarray(items).reshape(-1)
+        count = len(items)
+        self._programs.append(np.full(count, program, dtype=np.int64))
+        self._materials.append(np.broadcast_to(np.asarray(materials).astype(np.int64, copy=False), (count,)))
+        self._meshes.append(np.broadcast_to(np.asarray(meshes, dtype=np.int64), (count,)))
+        self._items.append(items)
+
+    def __len__(self) -> int:
+        return sum(len(items) for items in self._items)
+
+    def sorted(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(программы, материалы, меши, элементы) в порядке отрисовки."""
+        if not self._items:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty, empty
+
+        programs = np.concatenate(self._programs)
+        materials = np.concatenate(self._materials)
+        meshes = np.concatenate(self._meshes)
+        items = np.concatenate(self._items)
+
+        order = np.lexsort((meshes, materials, programs))
+        return programs[order], materials[order], meshes[order], items[order]
@@ -0,0 +1,370 @@
+from OpenGL.GL import *
+import numpy as np
+import ctypes
+
+
+FLOAT_SIZE = 4
+
+# ----------------------------------------------------------------------
+# Единичный куб — 36 вершин, на вершину позиция (x, y, z) и нормаль.
+# ----------------------------------------------------------------------
+CUBE_VERTICES = np.array([
+    # позиции (x, y, z)      нормаль
+    -0.5, -0.5, -0.5,        0,  0, -1,
+     0.5,  0.5, -0.5,        0,  0, -1,
+     0.5, -0.5, -0.5,        0,  0, -1,
+     0.5,  0.5, -0.5,        0,  0, -1,
+    -0.5, -0.5, -0.5,        0,  0, -1,
+    -0.5,  0.5, -0.5,        0,  0, -1,
+
+    -0.5, -0.5,  0.5,        0,  0,  1,
+     0.5, -0.5,  0.5,        0,  0,  1,
+     0.5,  0.5,  0.5,        0,  0,  1,
+     0.5,  0.5,  0.5,        0,  0,  1,
+    -0.5,  0.5,  0.5,        0,  0,  1,
+    -0.5, -0.5,  0.5,        0,  0,  1,
+
+    -0.5,  0.5,  0.5,       -1,  0,  0,
+    -0.5,  0.5, -0.5,       -1,  0,  0,
+    -0.5, -0.5, -0.5,       -1,  0,  0,
+    -0.5, -0.5, -0.5,       -1,  0,  0,
+    -0.5, -0.5,  0.5,       -1,  0,  0,
+    -0.5,  0.5,  0.5,       -1,  0,  0,
+
+     0.5,  0.5,  0.5,        1,  0,  0,
+     0.5, -0.5, -0.5,        1,  0,  0,
+     0.5,  0.5, -0.5,        1,  0,  0,
+     0.5, -0.5, -0.5,        1,  0,  0,
+     0.5,  0.5,  0.5,        1,  0,  0,
+     0.5, -0.5,  0.5,        1,  0,  0,
+
+    -0.5, -0.5, -0.5,        0, -1,  0,
+     0.5, -0.5, -0.5,        0, -1,  0,
+     0.5, -0.5,  0.5,        0, -1,  0,
+     0.5, -0.5,  0.5,        0, -1,  0,
+    -0.5, -0.5,  0.5,        0, -1,  0,
+    -0.5, -0.5, -0.5,        0, -1,  0,
+
+    -0.5,  0.5, -0.5,        0,  1,  0,
+     0.5,  0.5,  0.5,        0,  1,  0,
+     0.5,  0.5, -0.5,        0,  1,  0,
+     0.5,  0.5,  0.5,        0,  1,  0,
+    -0.5,  0.5, -0.5,        0,  1,  0,
+    -0.5,  0.5,  0.5,        0,  1,  0,
+], dtype=np.float32)
+
+
+def changed_ranges(mask: np.ndarray, merge_gap: int = 0) -> list[tuple[int, int]]:
+    """
+    Превращает булеву маску изменившихся строк в список полуинтервалов [start, stop).
+    Соседние диапазоны, между которыми не больше merge_gap неизменённых строк,
+    склеиваются — один glBufferSubData дешевле нескольких мелких.
+    """
+    idx = np.flatnonzero(mask)
+    if len(idx) == 0:
+        return []
+
+    breaks = np.flatnonzero(np.diff(idx) > merge_gap + 1)
+    starts = np.concatenate(([idx[0]], idx[breaks + 1]))
+    stops = np.concatenate((idx[breaks], [idx[-1]])) + 1
+    return list(zip(starts.tolist(), stops.tolist()))
+
+
+# ======================================================================
+# Cube Geometry
+# ======================================================================
+
+class CubeGeometry:
+    """
+    Общий VAO/VBO единичного куба.
+    Создаётся один раз на весь рендерер, а не на каждый воксель.
+    """
+
+    def __init__(self):
+        self.vertex_count = len(CUBE_VERTICES) // 6
+
+        self.vao = glGenVertexArrays(1)
+        glBindVertexArray(self.vao)
+
+        self.vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferData(GL_ARRAY_BUFFER, CUBE_VERTICES.nbytes, CUBE_VERTICES, GL_STATIC_DRAW)
+
+        # layout(location = 0) > позиция
+        glEnableVertexAttribArray(0)
+        glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 6 * FLOAT_SIZE, ctypes.c_void_p(0))
+
+        # layout(location = 1) > нормаль
+        glEnableVertexAttribArray(1)
+        glVertexAttribPointer(1, 3, GL_FLOAT, GL_FALSE, 6 * FLOAT_SIZE, ctypes.c_void_p(3 * FLOAT_SIZE))
+
+    # ------------------------------------------------------------------
+
+    def arm_for_drawing(self) -> None:
+        """Привязывает VAO куба перед отрисовкой."""
+        glBindVertexArray(self.vao)
+
+    def draw(self) -> None:
+        """Рисует один куб."""
+        glDrawArrays(GL_TRIANGLES, 0, self.vertex_count)
+
+    def draw_instanced(self, instance_count: int) -> None:
+        """Рисует instance_count кубов одним вызовом."""
+        glDrawArraysInstanced(GL_TRIANGLES, 0, self.vertex_count, instance_count)
+
+    # ------------------------------------------------------------------
+
+    def destroy(self) -> None:
+        """Удаляет VAO и VBO из памяти OpenGL."""
+        glDeleteVertexArrays(1, (self.vao,))
+        glDeleteBuffers(1, (self.vbo,))
+
+
+# ======================================================================
+# Instance Buffer
+# ======================================================================
+
+class InstanceBuffer:
+    """
+    Per-instance данные для CubeGeometry, адресуемые строкой (slot) хранилища.
+
+    Данные всех строк — модельная матрица (4 × vec4) и номер материала
+    (запись палитры, цвет шейдер берёт из PaletteTexture) — лежат в буфере
+    текстуры (GL_TEXTURE_BUFFER, RGBA32F, TEXELS_PER_INSTANCE текселей на
+    строку): строка i всегда на месте i. sync() сравнивает их с теневой
+    копией и отправляет в GPU только изменившиеся диапазоны, и только когда
+    сцена поменялась (ревизия) — отсечение на эти данные не влияет.
+
+    Отсечение — через косвенность: set_visible() загружает номера видимых
+    строк (uint32, 4 байта на инстанс) в per-instance атрибут in_slot,
+    и шейдер читает данные инстанса texelFetch по этому номеру.
+    """
+
+    TEXELS_PER_INSTANCE = 5
+    FLOATS_PER_INSTANCE = TEXELS_PER_INSTANCE * 4
+
+    # layout(location = 2) > in_slot
+    SLOT_LOCATION = 2
+
+    def __init__(self, geometry: CubeGeometry, capacity: int = 1024, merge_gap: int = 16):
+        self.capacity = 0
+        self.count = 0
+        self.merge_gap = merge_gap
+        self._shadow = np.zeros((0, self.FLOATS_PER_INSTANCE), dtype=np.float32)
+        self._revision = None
+
+        # Номера видимых строк: per-instance атрибут
+        self._visible = np.zeros(0, dtype=np.uint32)
+        self._slot_capacity = 0
+        self.slot_vbo = glGenBuffers(1)
+        glBindVertexArray(geometry.vao)
+        glBindBuffer(GL_ARRAY_BUFFER, self.slot_vbo)
+        glEnableVertexAttribArray(self.SLOT_LOCATION)
+        glVertexAttribIPointer(self.SLOT_LOCATION, 1, GL_UNSIGNED_INT, 4, ctypes.c_void_p(0))
+        glVertexAttribDivisor(self.SLOT_LOCATION, 1)
+
+        # Данные строк: буфер, видимый шейдеру как samplerBuffer
+        self.vbo = glGenBuffers(1)
+        self.texture = glGenTextures(1)
+        self._allocate(capacity)
+
+    # ------------------------------------------------------------------
+
+    def _allocate(self, capacity: int) -> None:
+        """Переразмечает хранилище буфера под capacity строк (содержимое — заново)."""
+        self.capacity = capacity
+        glBindBuffer(GL_TEXTURE_BUFFER, self.vbo)
+        glBufferData(GL_TEXTURE_BUFFER, capacity * self.FLOATS_PER_INSTANCE * FLOAT_SIZE, None, GL_DYNAMIC_DRAW)
+        glBindTexture(GL_TEXTURE_BUFFER, self.texture)
+        glTexBuffer(GL_TEXTURE_BUFFER, GL_RGBA32F, self.vbo)
+        self._shadow = np.zeros((0, self.FLOATS_PER_INSTANCE), dtype=np.float32)
+
+    def sync(self, store, revision) -> int:
+        """
+        Приводит данные строк в GPU к хранилищу store, если revision
+        (ревизия сцены) изменилась с прошлого вызова.
+        Возвращает число строк, реально отправленных в GPU.
+        """
+        if revision == self._revision and len(self._shadow) == store.count:
+            return 0
+        self._revision = revision
+
+        count = store.count
+        data = np.zeros((count, self.FLOATS_PER_INSTANCE), dtype=np.float32)
+        data[:, :16] = store.model_matrices().reshape(-1, 16)
+        data[:, 16] = store.materials
+
+        if count > self.capacity:
+            self._allocate(max(count, self.capacity * 2))
+
+        # строки стабильны, поэтому различаются только действительно изменённые
+        common = min(count, len(self._shadow))
+        changed = np.ones(count, dtype=bool)
+        changed[:common] = np.any(data[:common] != self._shadow[:common], axis=1)
+
+        glBindBuffer(GL_TEXTURE_BUFFER, self.vbo)
+        stride = self.FLOATS_PER_INSTANCE * FLOAT_SIZE
+        uploaded = 0
+        for start, stop in changed_ranges(changed, self.merge_gap):
+            glBufferSubData(GL_TEXTURE_BUFFER, start * stride, (stop - start) * stride, data[start:stop])
+            uploaded += stop - start
+
+        self._shadow = data
+        return uploaded
+
+    def set_visible(self, slots: np.ndarray) -> bool:
+        """Задаёт строки, которые рисуются (по инстансу на строку). True, если загружал."""
+        slots = np.ascontiguousarray(slots, dtype=np.uint32)
+        self.count = len(slots)
+        if np.array_equal(slots, self._visible):
+            return False
+        self._visible = slots
+        self._slot_capacity = _stream(GL_ARRAY_BUFFER, self.slot_vbo, slots, self._slot_capacity)
+        return True
+
+    def bind(self, unit: int = 1) -> None:
+        glActiveTexture(GL_TEXTURE0 + unit)
+        glBindTexture(GL_TEXTURE_BUFFER, self.texture)
+        glActiveTexture(GL_TEXTURE0)
+
+    # ------------------------------------------------------------------
+
+    def destroy(self) -> None:
+        """Удаляет буферы и текстуру из памяти OpenGL."""
+        glDeleteTextures(1, (self.texture,))
+        glDeleteBuffers(2, (self.vbo, self.slot_vbo))
+
+
+# ======================================================================
+# Chunk Mesh
+# ======================================================================
+
+class ChunkMesh:
+    """
+    VAO + VBO + EBO меша одного чанка (см. mesher.greedy_mesh).
+    Вершина: позиция (3), нормаль (3), номер материала (1); индексы uint32.
+    """
+
+    FLOATS_PER_VERTEX = 7
+    STRIDE = FLOATS_PER_VERTEX * FLOAT_SIZE
+
+    def __init__(self):
+        self.index_count = 0
+        self.vertex_count = 0
+
+        # Ёмкость буферов в байтах; растёт в полтора раза при нехватке
+        self.vertex_capacity = 0
+        self.index_capacity = 0
+
+        self.vao = glGenVertexArrays(1)
+        glBindVertexArray(self.vao)
+
+        self.vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+
+        self.ebo = glGenBuffers(1)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ebo)
+
+        # layout(location = 0) > позиция, 1 > нормаль, 2 > номер материала
+        for location, size, offset in ((0, 3, 0), (1, 3, 3), (2, 1, 6)):
+            glEnableVertexAttribArray(location)
+            glVertexAttribPointer(
+                location, size, GL_FLOAT, GL_FALSE, self.STRIDE,
+                ctypes.c_void_p(offset * FLOAT_SIZE)
+            )
+
+    # ------------------------------------------------------------------
+
+    def upload(self, vertices: np.ndarray, indices: np.ndarray) -> None:
+        """
+        Заменяет содержимое буферов новым мешем.
+        Старое хранилище «осиротевает» (glBufferData с None того же размера),
+        поэтому запись через glBufferSubData не ждёт, пока GPU дорисует
+        предыдущий кадр; заново память выделяется только при росте меша.
+        """
+        vertices = np.ascontiguousarray(vertices, dtype=np.float32)
+        indices = np.ascontiguousarray(indices, dtype=np.uint32)
+
+        glBindVertexArray(self.vao)
+        self.vertex_capacity = _stream(GL_ARRAY_BUFFER, self.vbo, vertices, self.vertex_capacity)
+        self.index_capacity = _stream(GL_ELEMENT_ARRAY_BUFFER, self.ebo, indices, self.index_capacity)
+
+        self.vertex_count = len(vertices)
+        self.index_count = len(indices)
+
+    def draw(self) -> None:
+        """Рисует весь чанк одним вызовом."""
+        if self.index_count:
+            glBindVertexArray(self.vao)
+            glDrawElements(GL_TRIANGLES, self.index_count, GL_UNSIGNED_INT, None)
+
+    # ------------------------------------------------------------------
+
+    def destroy(self) -> None:
+        """Удаляет VAO и буферы из памяти OpenGL."""
+        glDeleteVertexArrays(1, (self.vao,))
+        glDeleteBuffers(2, (self.vbo, self.ebo))
+
+
+# ======================================================================
+# Palette Texture
+# ======================================================================
+
+class PaletteTexture:
+    """
+    Палитра материалов сцены в GPU: текстура RGBA32F шириной WIDTH,
+    запись i — тексель (i % WIDTH, i // WIDTH). Шейдеры читают цвет
+    texelFetch по номеру материала, поэтому цвета не загружаются
+    ни на draw call, ни в вершины и instance-данные.
+    Перезагружается только при смене palette.revision.
+    """
+
+    WIDTH = 256
+
+    def __init__(self):
+        self.texture = glGenTextures(1)
+        self.rows = 0
+        self.revision = None
+
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAX_LEVEL, 0)
+
+    def update(self, palette) -> bool:
+        """Загружает цвета палитры, если они менялись. Возвращает True, если загружал."""
+        if palette.revision == self.revision:
+            return False
+
+        rows = max(1, -(-palette.size // self.WIDTH))
+        data = np.zeros((rows * self.WIDTH, 4), dtype=np.float32)
+        data[:palette.size] = palette.colors
+
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        if rows > self.rows:
+            self.rows = max(rows, self.rows * 2)
+            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA32F, self.WIDTH, self.rows, 0, GL_RGBA, GL_FLOAT, None)
+        glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, self.WIDTH, rows, GL_RGBA, GL_FLOAT, data)
+
+        self.revision = palette.revision
+        return True
+
+    def bind(self, unit: int = 0) -> None:
+        glActiveTexture(GL_TEXTURE0 + unit)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+
+    def destroy(self) -> None:
+        """Удаляет текстуру из памяти OpenGL."""
+        glDeleteTextures(1, (self.texture,))
+
+
+def _stream(target, buffer: int, data: np.ndarray, capacity: int) -> int:
+    """Orphan + glBufferSubData. Возвращает новую ёмкость буфера в байтах."""
+    glBindBuffer(target, buffer)
+    if data.nbytes > capacity:
+        capacity = max(data.nbytes, capacity * 3 // 2)
+    if capacity:
+        glBufferData(target, capacity, None, GL_DYNAMIC_DRAW)
+    if data.nbytes:
+        glBufferSubData(target, 0, data.nbytes, data)
+    return capacity
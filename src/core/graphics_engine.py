@@ -4,8 +4,16 @@ from OpenGL.GL import *
 from OpenGL.GL.shaders import compileProgram, compileShader
 import numpy as np
 import pyrr
+import time
 
 from .scene import Scene
+from .voxel_store import KIND_CUBE
+from .gpu_resources import CubeGeometry, InstanceBuffer, ChunkMesh, PaletteTexture
+from .mesher import mesh_scene_chunk
+from .frustum import frustum_planes, boxes_in_frustum
+from .picking import RayHit, screen_ray, raycast
+from .gl_state import GLState, RenderQueue
+from .profiler import FrameProfiler
 
 
 SCREEN_WIDTH = 1280
@@ -14,12 +22,23 @@ SCREEN_HEIGHT = 760
 RETURN_ACTION_CONTINUE = 0
 RETURN_ACTION_END = 1
 
+# Полуразмер AABB единичного куба, повёрнутого вокруг оси Y (с запасом)
+CUBE_HALF_EXTENT = np.sqrt(2.0) / 2
+
+# Режимы рендеринга
+RENDER_MODE_ENTITY = "entity"        # отдельный draw call на каждый объект
+RENDER_MODE_INSTANCED = "instanced"  # все кубы одним glDrawArraysInstanced
+RENDER_MODE_CHUNKED = "chunked"      # меш видимых граней на чанк, вызов на чанк
+
+# Текстурный слот данных инстансов (слот 0 — палитра материалов)
+INSTANCE_TEXTURE_UNIT = 1
+
 
 # ---------------------------------------------------------------------------
 # GLFW INITIALIZATION
 # ---------------------------------------------------------------------------
 
-def initialize_glfw():
+def initialize_glfw(visible: bool = True):
     """Создаёт окно, инициализирует контекст OpenGL и настраивает GLFW."""
 
     if not glfw.init():
@@ -29,6 +48,7 @@ def initialize_glfw():
     glfw.window_hint(GLFW_CONSTANTS.GLFW_CONTEXT_VERSION_MINOR, 3)
     glfw.window_hint(GLFW_CONSTANTS.GLFW_OPENGL_PROFILE, GLFW_CONSTANTS.GLFW_OPENGL_CORE_PROFILE)
     glfw.window_hint(GLFW_CONSTANTS.GLFW_OPENGL_FORWARD_COMPAT, GLFW_CONSTANTS.GLFW_TRUE)
+    glfw.window_hint(GLFW_CONSTANTS.GLFW_VISIBLE, GLFW_CONSTANTS.GLFW_TRUE if visible else GLFW_CONSTANTS.GLFW_FALSE)
 
     window = glfw.create_window(
         SCREEN_WIDTH, SCREEN_HEIGHT,
@@ -49,6 +69,13 @@ def initialize_glfw():
     return window
 
 
+def set_up_opengl(width: int = SCREEN_WIDTH, height: int = SCREEN_HEIGHT):
+    """Начальная настройка OpenGL в текущем контексте (окно или FBO без окна)."""
+    glClearColor(0.1, 0.2, 0.2, 1)
+    glEnable(GL_DEPTH_TEST)
+    glViewport(0, 0, width, height)
+
+
 # ---------------------------------------------------------------------------
 # SHADER CREATION
 # ---------------------------------------------------------------------------
@@ -61,9 +88,12 @@ def create_shader(vertex_filepath: str, fragment_filepath: str) -> int:
     with open(fragment_filepath, "r") as f:
         fragment_src = f.read()
 
+    # проверка программы против текущего состояния GL (validate) до назначения
+    # слотов семплерам ложно срабатывает: все семплеры пока смотрят в слот 0
     return compileProgram(
         compileShader(vertex_src, GL_VERTEX_SHADER),
-        compileShader(fragment_src, GL_FRAGMENT_SHADER)
+        compileShader(fragment_src, GL_FRAGMENT_SHADER),
+        validate=False,
     )
 
 
@@ -74,26 +104,77 @@ def create_shader(vertex_filepath: str, fragment_filepath: str) -> int:
 class Graphics_Engine:
     """
     Класс рендеринга всех объектов сцены.
-    Работает вместе с Scene и Material.
+    Цвета объектов берёт из палитры материалов сцены (Scene.palette),
+    загруженной в текстуру: объекты передают в шейдер только номер материала.
     """
 
-    def __init__(self, scene: Scene, scene_file: str = "scenes/scene.txt"):
+    def __init__(
+        self,
+        scene: Scene,
+        scene_file: str | None = "scenes/scene.txt",
+        render_mode: str = RENDER_MODE_CHUNKED,
+        profiler: FrameProfiler | None = None,
+    ):
         self.scene = scene
         self.scene_file = scene_file
+        self.render_mode = render_mode
 
-        # создаём и активируем шейдер
+        # создаём и активируем шейдеры
         self.shader = create_shader(
             vertex_filepath="shaders/vertex.txt",
             fragment_filepath="shaders/fragment.txt"
         )
+        self.instanced_shader = create_shader(
+            vertex_filepath="shaders/vertex_instanced.txt",
+            fragment_filepath="shaders/fragment_color.txt"
+        )
+        self.chunk_shader = create_shader(
+            vertex_filepath="shaders/vertex_chunk.txt",
+            fragment_filepath="shaders/fragment_color.txt"
+        )
+
+        # GPU-ресурсы создаются лениво, при первой отрисовке:
+        # одна общая геометрия куба и instance-буфер по числу рисуемых кубов
+        self.cube_geometry: CubeGeometry | None = None
+        self.instance_buffer: InstanceBuffer | None = None
+
+        # Палитра материалов в текстуре (слот 0), перезагружается при её изменении
+        self.palette_texture = PaletteTexture()
+
+        # Меши чанков: координата чанка → ChunkMesh. Перестраиваются только
+        # устаревшие чанки (scene.grid.dirty_chunks), не дольше
+        # remesh_budget_ms за кадр; остальные ждут следующих кадров.
+        self.chunk_meshes: dict[tuple[int, int, int], ChunkMesh] = {}
+        self.chunk_mesh_stats: dict[tuple[int, int, int], dict] = {}
+        self.remesh_budget_ms = 4.0
+        self.pending_chunks: set[tuple[int, int, int]] = set()
+        self.remeshed_last_frame = 0
+        self._chunk_keys: np.ndarray | None = None
+
+        # Отсечение по пирамиде видимости и счётчики последнего кадра:
+        # сколько боксов (чанков или кубов) проверено, отброшено и нарисовано
+        self.frustum_culling = True
+        self.cull_stats = {"tested": 0, "culled": 0, "drawn": 0}
+
+        # view-матрица последнего кадра — по ней строится луч выбора мышью
+        self.view: np.ndarray | None = None
+
+        # Кэш состояния OpenGL (локации и значения uniform'ов, текущие
+        # программа и VAO, счётчики вызовов за кадр) и очередь отрисовки,
+        # отсортированная по (программа, материал, меш)
+        self.gl = GLState()
+        self.render_queue = RenderQueue()
+
+        # Таймеры фаз отрисовки (render.*); замеряют, только пока владелец
+        # профилировщика ведёт кадр (begin_frame / end_frame)
+        self.profiler = profiler or FrameProfiler()
 
         # Загрузка сцены
-        if not self.scene.import_scene(self.scene_file):
+        if self.scene_file is not None and not self.scene.import_scene(self.scene_file):
             print("[Graphics_Engine] Scene file not found — creating demo cube")
             self.scene.add_cube(position=[0, 0, -3], eulers=[0, 0, 0])
 
         self._set_onetime_uniforms()
-        self._cache_uniform_locations()
 
     # ----------------------------------------------------------------------
     # UNIFORMS
@@ -101,30 +182,25 @@ class Graphics_Engine:
 
     def _set_onetime_uniforms(self):
         """Устанавливает uniform'ы, которые не меняются во время работы."""
-        glUseProgram(self.shader)
-
-        # текстурный слот
-        loc_tex = glGetUniformLocation(self.shader, "imageTexture")
-        if loc_tex != -1:
-            glUniform1i(loc_tex, 0)
-
-        # матрица проекции
-        projection = pyrr.matrix44.create_perspective_projection(
+        # матрица проекции (нужна и для отсечения по пирамиде видимости)
+        self.projection = projection = pyrr.matrix44.create_perspective_projection(
             fovy=45.0,
             aspect=SCREEN_WIDTH / SCREEN_HEIGHT,
             near=0.1,
             far=100.0,
             dtype=np.float32
         )
-        loc_proj = glGetUniformLocation(self.shader, "projection")
-        if loc_proj != -1:
-            glUniformMatrix4fv(loc_proj, 1, GL_FALSE, projection)
 
-    def _cache_uniform_locations(self):
-        """Читает и кеширует локации uniform-переменных."""
-        glUseProgram(self.shader)
-        self.modelMatrixLocation = glGetUniformLocation(self.shader, "model")
-        self.viewMatrixLocation = glGetUniformLocation(self.shader, "view")
+        for shader in (self.shader, self.instanced_shader, self.chunk_shader):
+            self.gl.use_program(shader)
+
+            # текстурный слот палитры материалов
+            self.gl.uniform1i("palette", 0)
+            self.gl.uniform_matrix4("projection", projection)
+
+        # данные инстансов — буфер текстуры в своём слоте
+        self.gl.use_program(self.instanced_shader)
+        self.gl.uniform1i("instances", INSTANCE_TEXTURE_UNIT)
 
     # ----------------------------------------------------------------------
     # RENDERING
@@ -132,8 +208,8 @@ class Graphics_Engine:
 
     def render(self, scene: Scene):
         """Главный метод — рисует всю сцену."""
+        self.gl.begin_frame()
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-        glUseProgram(self.shader)
 
         # view-матрица камеры
         cam = scene.camera
@@ -141,42 +217,209 @@ class Graphics_Engine:
         target = cam.position + cam.forwards
         up = cam.up
 
-        view = pyrr.matrix44.create_look_at(eye, target, up, dtype=np.float32)
-
-        if self.viewMatrixLocation != -1:
-            glUniformMatrix4fv(self.viewMatrixLocation, 1, GL_FALSE, view)
-
-        # Рисуем объекты
-        for entity in scene.entities:
-
-            # модельная матрица
-            if hasattr(entity, "get_model_transform") and self.modelMatrixLocation != -1:
-                model = entity.get_model_transform()
-                glUniformMatrix4fv(self.modelMatrixLocation, 1, GL_FALSE, model)
-
-            # материал
-            material = getattr(entity, "material", None)
-            if material:
-                material.use(self.shader)
-            else:
-                # fallback — белый цвет
-                loc_color = glGetUniformLocation(self.shader, "materialColor")
-                if loc_color != -1:
-                    glUniform4fv(loc_color, 1, np.array([1, 1, 1, 1], dtype=np.float32))
-
-            # VBO/VAO binding
-            if hasattr(entity, "arm_for_drawing"):
-                try:
-                    entity.arm_for_drawing()
-                except Exception:
-                    pass
-
-            # Рисование
-            if hasattr(entity, "draw"):
-                try:
-                    entity.draw()
-                except Exception:
-                    pass
+        self.view = view = pyrr.matrix44.create_look_at(eye, target, up, dtype=np.float32)
+        self._planes = frustum_planes(self.projection, view)
+
+        with self.profiler.scope("render.palette"):
+            self.palette_texture.update(scene.palette)
+            self.palette_texture.bind(0)
+
+        if self.render_mode == RENDER_MODE_CHUNKED:
+            self._render_chunked(scene, view)
+        elif self.render_mode == RENDER_MODE_INSTANCED:
+            self._render_instanced(scene, view)
+        else:
+            self._render_per_entity(scene, view)
+
+    def pick(self, scene: Scene, x: float, y: float, max_distance: float = 100.0) -> RayHit | None:
+        """
+        Воксель под точкой окна (x, y): луч через матрицы последнего кадра
+        проходит по сетке сцены до первой занятой клетки.
+        """
+        if self.view is None:
+            return None
+        origin, direction = screen_ray(x, y, SCREEN_WIDTH, SCREEN_HEIGHT, self.projection, self.view)
+        return raycast(scene.grid, origin, direction, max_distance)
+
+    def _render_chunked(self, scene: Scene, view: np.ndarray):
+        """
+        Рисует сцену мешами чанков: только видимые грани, склеенные
+        в прямоугольники, по одному draw call на чанк.
+        Кубы рисуются в центрах своих клеток сетки, без поворота.
+        """
+        profile = self.profiler.scope
+        with profile("render.remesh"):
+            self._update_chunk_meshes(scene)
+
+        self.gl.use_program(self.chunk_shader)
+        self.gl.uniform_matrix4("view", view)
+
+        if not self.chunk_meshes:
+            self._count_culling(np.zeros(0, dtype=bool))
+            return
+
+        if self._chunk_keys is None:
+            self._chunk_keys = np.array(list(self.chunk_meshes), dtype=np.int64)
+
+        # AABB чанка: клетки key*S .. key*S + S - 1, клетка i — [i - 0.5, i + 0.5]
+        with profile("render.cull"):
+            size, cell = scene.grid.chunk_size, scene.grid.cell_size
+            mins = (self._chunk_keys * size - 0.5) * cell
+            maxs = mins + size * cell
+            visible = self._visible(mins, maxs)
+
+        # у каждого чанка свой VAO, материалы — номера в вершинах
+        with profile("render.draw"):
+            meshes = list(self.chunk_meshes.values())
+            visible = np.flatnonzero(visible)
+            vertex_arrays = np.array([mesh.vao for mesh in meshes], dtype=np.int64)
+            self.render_queue.clear()
+            self.render_queue.submit(self.chunk_shader, 0, vertex_arrays[visible], visible)
+
+            _, _, _, items = self.render_queue.sorted()
+            for index in items.tolist():
+                mesh = meshes[index]
+                if mesh.index_count:
+                    self.gl.bind_vertex_array(mesh.vao)
+                    self.gl.draw_elements(GL_TRIANGLES, mesh.index_count, GL_UNSIGNED_INT)
+
+    def _visible(self, mins: np.ndarray, maxs: np.ndarray) -> np.ndarray:
+        """Маска боксов, попадающих в пирамиду видимости текущего кадра."""
+        if self.frustum_culling:
+            visible = boxes_in_frustum(self._planes, mins, maxs)
+        else:
+            visible = np.ones(len(mins), dtype=bool)
+        self._count_culling(visible)
+        return visible
+
+    def _visible_cubes(self, store) -> np.ndarray:
+        """Маска строк хранилища: кубы, попадающие в пирамиду видимости."""
+        cubes = store.kinds == KIND_CUBE
+        positions = store.positions[cubes]
+        cubes[cubes] = self._visible(positions - CUBE_HALF_EXTENT, positions + CUBE_HALF_EXTENT)
+        return cubes
+
+    def _count_culling(self, visible: np.ndarray):
+        """Обновляет счётчики отсечения за кадр."""
+        drawn = int(np.count_nonzero(visible))
+        self.cull_stats = {"tested": len(visible), "culled": len(visible) - drawn, "drawn": drawn}
+
+    def _update_chunk_meshes(self, scene: Scene):
+        """
+        Перестраивает устаревшие чанки в пределах бюджета кадра,
+        начиная с ближайших к камере. Хотя бы один чанк за кадр
+        перестраивается всегда, чтобы очередь не стояла на месте.
+        """
+        self.pending_chunks |= scene.grid.take_dirty_chunks()
+        self.remeshed_last_frame = 0
+        if not self.pending_chunks:
+            return
+
+        keys = list(self.pending_chunks)
+        chunk_extent = scene.grid.chunk_size * scene.grid.cell_size
+        centers = (np.array(keys, dtype=np.float32) + 0.5) * chunk_extent
+        order = np.argsort(np.linalg.norm(centers - scene.camera.position, axis=1))
+
+        # загрузка мешей привязывает их VAO в обход кэша состояния
+        self.gl.invalidate_bindings()
+        deadline = time.perf_counter() + self.remesh_budget_ms / 1000.0
+        for index in order.tolist():
+            key = keys[index]
+            self.pending_chunks.discard(key)
+            self._remesh_chunk(scene, key)
+            self.remeshed_last_frame += 1
+            if time.perf_counter() >= deadline:
+                break
+
+    def _remesh_chunk(self, scene: Scene, key):
+        """Перестраивает меш одного чанка или освобождает его, если чанк опустел."""
+        if key not in scene.grid.chunks:
+            mesh = self.chunk_meshes.pop(key, None)
+            if mesh is not None:
+                mesh.destroy()
+                self._chunk_keys = None
+            self.chunk_mesh_stats.pop(key, None)
+            return
+
+        vertices, indices, stats = mesh_scene_chunk(scene, key)
+        mesh = self.chunk_meshes.get(key)
+        if mesh is None:
+            mesh = self.chunk_meshes[key] = ChunkMesh()
+            self._chunk_keys = None
+        mesh.upload(vertices, indices)
+        self.chunk_mesh_stats[key] = stats
+
+    def mesh_stats(self) -> dict:
+        """Суммарная статистика мешей чанков: вершины до и после отсечения граней."""
+        total = {}
+        for stats in self.chunk_mesh_stats.values():
+            for name, value in stats.items():
+                total[name] = total.get(name, 0) + value
+        return total
+
+    def _render_instanced(self, scene: Scene, view: np.ndarray):
+        """Рисует все кубы сцены одним instanced draw call."""
+        if self.instance_buffer is None:
+            self.instance_buffer = InstanceBuffer(self._get_cube_geometry())
+            self.gl.invalidate_bindings()
+
+        self.gl.use_program(self.instanced_shader)
+        self.gl.uniform_matrix4("view", view)
+
+        profile = self.profiler.scope
+        store = scene.voxels
+        with profile("render.cull"):
+            cubes = self._visible_cubes(store)
+
+        # данные строк (матрица + материал) — только после правок сцены;
+        # каждый кадр — лишь номера видимых строк
+        with profile("render.upload"):
+            self.instance_buffer.sync(store, scene.revision)
+            self.instance_buffer.set_visible(np.flatnonzero(cubes))
+            self.instance_buffer.bind(INSTANCE_TEXTURE_UNIT)
+
+        with profile("render.draw"):
+            if self.instance_buffer.count:
+                self.gl.bind_vertex_array(self.cube_geometry.vao)
+                self.gl.draw_arrays_instanced(
+                    GL_TRIANGLES, 0, self.cube_geometry.vertex_count, self.instance_buffer.count
+                )
+
+    def _render_per_entity(self, scene: Scene, view: np.ndarray):
+        """Рисует кубы по одному — отдельный draw call на каждый."""
+        geometry = self._get_cube_geometry()
+
+        self.gl.use_program(self.shader)
+        self.gl.uniform_matrix4("view", view)
+        self.gl.bind_vertex_array(geometry.vao)
+
+        profile = self.profiler.scope
+        store = scene.voxels
+        with profile("render.cull"):
+            slots = np.flatnonzero(self._visible_cubes(store))
+
+        with profile("render.draw"):
+            # модельные матрицы — из кэша хранилища, пересчитываются только сдвинутые
+            models = store.model_matrices()
+
+            # Кубы одного материала идут подряд: номер материала загружается
+            # один раз на серию (повторы пропускает GLState)
+            self.render_queue.clear()
+            self.render_queue.submit(self.shader, store.materials[slots], geometry.vao, slots)
+            _, materials, _, slots = self.render_queue.sorted()
+
+            # Рисуем объекты
+            for slot, material in zip(slots.tolist(), materials.tolist()):
+                self.gl.uniform_matrix4("model", models[slot])
+                self.gl.uniform1i("materialIndex", material)
+                self.gl.draw_arrays(GL_TRIANGLES, 0, geometry.vertex_count)
+
+    def _get_cube_geometry(self) -> CubeGeometry:
+        """Возвращает общую геометрию куба, создавая её при первом обращении."""
+        if self.cube_geometry is None:
+            self.cube_geometry = CubeGeometry()
+            self.gl.invalidate_bindings()
+        return self.cube_geometry
 
     # ----------------------------------------------------------------------
     # CLEANUP
@@ -184,24 +427,24 @@ class Graphics_Engine:
 
     def quit(self):
         """Освобождает OpenGL-ресурсы."""
-        # Удаляем все объекты сцены
-        for entity in getattr(self.scene, "entities", []):
+        # общие буферы: объекты сцены собственных GPU-ресурсов не имеют
+        for resource in (self.instance_buffer, self.cube_geometry, self.palette_texture,
+                         *self.chunk_meshes.values()):
             try:
-                if hasattr(entity, "destroy"):
-                    entity.destroy()
+                if resource is not None:
+                    resource.destroy()
             except Exception:
                 pass
 
-            # материал
-            try:
-                mat = getattr(entity, "material", None)
-                if mat:
-                    mat.destroy()
-            except Exception:
-                pass
+        try:
+            self.profiler.destroy()
+        except Exception:
+            pass
 
-        # удаляем шейдер
+        # удаляем шейдеры
         try:
             glDeleteProgram(self.shader)
+            glDeleteProgram(self.instanced_shader)
+            glDeleteProgram(self.chunk_shader)
         except Exception:
             pass
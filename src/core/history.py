@@ -0,0 +1,281 @@
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+
+# ======================================================================
+# Edits
+# ======================================================================
+
+class Edit(ABC):
+    """
+    Запись журнала правок. undo/redo применяют её к сцене целиком,
+    векторными операциями Scene, а не циклом по объектам.
+    """
+
+    @abstractmethod
+    def nbytes(self) -> int:
+        """Сколько памяти занимают данные записи."""
+
+    @abstractmethod
+    def undo(self, scene) -> None:
+        """Возвращает сцену в состояние до правки."""
+
+    @abstractmethod
+    def redo(self, scene) -> None:
+        """Применяет правку к сцене снова."""
+
+    def merge(self, other: "Edit") -> bool:
+        """Поглощает следующую правку, если может. True — поглотила."""
+        return False
+
+
+class InsertEdit(Edit):
+    """Добавленные объекты: их id и все колонки, чтобы вернуть их с теми же id."""
+
+    def __init__(self, ids, positions, eulers, colors, selected, kinds):
+        self.ids = ids
+        self.positions = positions
+        self.eulers = eulers
+        self.colors = colors
+        self.selected = selected
+        self.kinds = kinds
+
+    @classmethod
+    def capture(cls, store, slots) -> "InsertEdit":
+        """Копирует строки хранилища slots (без повторов)."""
+        return cls(
+            store.ids[slots].copy(), store.positions[slots].copy(), store.eulers[slots].copy(),
+            store.colors_of(slots), store.selected[slots].copy(), store.kinds[slots].copy(),
+        )
+
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in
+                   (self.ids, self.positions, self.eulers, self.colors, self.selected, self.kinds))
+
+    def _remove(self, scene) -> None:
+        scene.remove_ids(self.ids)
+
+    def _restore(self, scene) -> None:
+        scene._insert(self.positions, self.eulers, self.colors, self.kinds, self.selected, ids=self.ids)
+
+    undo = _remove
+    redo = _restore
+
+
+class RemoveEdit(InsertEdit):
+    """Удалённые объекты — та же запись, что и InsertEdit, с обратным смыслом."""
+
+    undo = InsertEdit._restore
+    redo = InsertEdit._remove
+
+
+class ChangeEdit(Edit):
+    """
+    Изменение одной колонки у набора объектов: id и упакованные массивы
+    значений до и после. Соседние изменения той же колонки склеиваются:
+    у каждого id остаётся самое раннее «до» и самое позднее «после».
+    """
+
+    def __init__(self, ids, before, after):
+        self.ids = ids
+        self.before = before
+        self.after = after
+
+    def nbytes(self) -> int:
+        return self.ids.nbytes + self.before.nbytes + self.after.nbytes
+
+    def undo(self, scene) -> None:
+        self.apply(scene, self.before)
+
+    def redo(self, scene) -> None:
+        self.apply(scene, self.after)
+
+    @abstractmethod
+    def apply(self, scene, values) -> None:
+        """Назначает объектам ids значения values (before или after)."""
+
+    def merge(self, other: Edit) -> bool:
+        if type(other) is not type(self):
+            return False
+
+        # частый случай — перетаскивание одного и того же выделения
+        if np.array_equal(self.ids, other.ids):
+            self.after = other.after
+            return True
+
+        ids = np.concatenate([self.ids, other.ids])
+        before = np.concatenate([self.before, other.before])
+        after = np.concatenate([self.after, other.after])
+
+        self.ids, first = np.unique(ids, return_index=True)
+        _, last = np.unique(ids[::-1], return_index=True)
+        self.before = before[first]
+        self.after = after[len(ids) - 1 - last]
+        return True
+
+
+class MoveEdit(ChangeEdit):
+    """Смена позиций (перемещение выделения)."""
+
+    def apply(self, scene, values) -> None:
+        scene.set_positions(self.ids, values)
+
+
+class RotateEdit(ChangeEdit):
+    """Смена углов Эйлера."""
+
+    def apply(self, scene, values) -> None:
+        scene.set_eulers(self.ids, values)
+
+
+class RecolorEdit(ChangeEdit):
+    """Смена цветов."""
+
+    def apply(self, scene, values) -> None:
+        scene.recolor(self.ids, values)
+
+
+class EditGroup(Edit):
+    """Несколько правок, которые отменяются и повторяются как одна."""
+
+    def __init__(self):
+        self.edits: list[Edit] = []
+
+    def add(self, edit: Edit) -> None:
+        """Добавляет правку, по возможности склеивая её с предыдущей."""
+        if not self.edits or not self.edits[-1].merge(edit):
+            self.edits.append(edit)
+
+    def nbytes(self) -> int:
+        return sum(edit.nbytes() for edit in self.edits)
+
+    def undo(self, scene) -> None:
+        for edit in reversed(self.edits):
+            edit.undo(scene)
+
+    def redo(self, scene) -> None:
+        for edit in self.edits:
+            edit.redo(scene)
+
+
+# ======================================================================
+# History
+# ======================================================================
+
+class History:
+    """
+    Журнал отмены/повтора правок сцены.
+
+    Хранит не снимки сцены, а дельты (Edit): добавленные и удалённые строки,
+    изменённые позиции и цвета. Общий объём записей ограничен max_bytes —
+    при превышении самые старые записи выбрасываются.
+
+    Правки между begin_group() и end_group() (например, всё перетаскивание
+    в режиме G) становятся одной записью. Правки внутри collect(group)
+    копятся в отдельной группе — так фоновая операция, растянутая на много
+    кадров, собирает свою запись, не смешиваясь с правками пользователя.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+
+        self._undo: deque[Edit] = deque()
+        self._redo: list[Edit] = []
+        self._group: EditGroup | None = None
+        self._collector: EditGroup | None = None
+        self._applying = False
+
+    # ------------------------------------------------------------------
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def record(self, edit: Edit) -> None:
+        """Записывает правку. Во время undo/redo ничего не записывается."""
+        if self._applying:
+            return
+        if self._collector is not None:
+            self._collector.add(edit)
+            return
+        if self._group is not None:
+            self._group.add(edit)
+            return
+        self._push(edit)
+
+    def begin_group(self) -> None:
+        """Начинает группу: следующие правки станут одной записью."""
+        self.end_group()
+        self._group = EditGroup()
+
+    def end_group(self) -> None:
+        """Закрывает группу и кладёт её в журнал, если в ней что-то есть."""
+        group, self._group = self._group, None
+        if group is None or not group.edits:
+            return
+        self._push(group.edits[0] if len(group.edits) == 1 else group)
+
+    @contextmanager
+    def collect(self, group: EditGroup):
+        """
+        Правки внутри блока with складываются в group, а не в журнал.
+        В журнал группа попадает потом, одной записью: record(group).
+        """
+        previous, self._collector = self._collector, group
+        try:
+            yield group
+        finally:
+            self._collector = previous
+
+    def _push(self, edit: Edit) -> None:
+        self.nbytes -= sum(redo.nbytes() for redo in self._redo)
+        self._redo.clear()
+
+        self._undo.append(edit)
+        self.nbytes += edit.nbytes()
+        while self._undo and self.nbytes > self.max_bytes:
+            self.nbytes -= self._undo.popleft().nbytes()
+
+    # ------------------------------------------------------------------
+
+    def undo(self, scene) -> bool:
+        """Отменяет последнюю правку. False, если отменять нечего."""
+        self.end_group()
+        if not self._undo:
+            return False
+        edit = self._undo.pop()
+        self._apply(edit.undo, scene)
+        self._redo.append(edit)
+        return True
+
+    def redo(self, scene) -> bool:
+        """Повторяет последнюю отменённую правку. False, если нечего."""
+        self.end_group()
+        if not self._redo:
+            return False
+        edit = self._redo.pop()
+        self._apply(edit.redo, scene)
+        self._undo.append(edit)
+        return True
+
+    def _apply(self, action, scene) -> None:
+        self._applying = True
+        try:
+            action(scene)
+        finally:
+            self._applying = False
+
+    def clear(self) -> None:
+        """Забывает все записи (например, после загрузки другой сцены)."""
+        self._undo.clear()
+        self._redo.clear()
+        self._group = None
+        self.nbytes = 0
@@ -0,0 +1,287 @@
+import collections
+import json
+import os
+
+import glfw
+import glfw.GLFW as GLFW_CONSTANTS
+
+
+# Устройства в сочетаниях клавиш
+DEVICE_KEY = 0
+DEVICE_MOUSE = 1
+DEVICE_SCROLL = 2
+
+# Тип события
+PRESS = GLFW_CONSTANTS.GLFW_PRESS
+RELEASE = GLFW_CONSTANTS.GLFW_RELEASE
+REPEAT = GLFW_CONSTANTS.GLFW_REPEAT
+
+# Модификаторы, которые различает раскладка (Caps Lock / Num Lock — нет)
+MODIFIERS = {
+    "shift": GLFW_CONSTANTS.GLFW_MOD_SHIFT,
+    "ctrl": GLFW_CONSTANTS.GLFW_MOD_CONTROL,
+    "alt": GLFW_CONSTANTS.GLFW_MOD_ALT,
+    "super": GLFW_CONSTANTS.GLFW_MOD_SUPER,
+}
+MODIFIER_MASK = sum(MODIFIERS.values())
+
+MOUSE_BUTTONS = {
+    "mouseleft": GLFW_CONSTANTS.GLFW_MOUSE_BUTTON_LEFT,
+    "mouseright": GLFW_CONSTANTS.GLFW_MOUSE_BUTTON_RIGHT,
+    "mousemiddle": GLFW_CONSTANTS.GLFW_MOUSE_BUTTON_MIDDLE,
+}
+
+# Клавиши, чьё имя в GLFW неудобно писать в раскладке
+KEY_ALIASES = {"=": "equal", "-": "minus", "esc": "escape", "del": "delete"}
+
+# Раскладка по умолчанию: действие → сочетания ("Ctrl+Shift+Z", "MouseLeft", "Scroll").
+# Сочетание сравнивается с модификаторами точно; у удерживаемых действий
+# (движение камеры) модификаторы не учитываются. Пока зажат camera.look,
+# курсор скрыт и каждый кадр возвращается в центр окна — поэтому действия
+# «под курсором» (select.*, edit.place) не используют Shift.
+DEFAULT_BINDINGS = {
+    "app.quit": ["Escape"],
+
+    "camera.forward": ["W"],
+    "camera.left": ["A"],
+    "camera.back": ["S"],
+    "camera.right": ["D"],
+    "camera.look": ["LeftShift", "RightShift"],
+    "camera.zoom": ["Scroll"],
+
+    "edit.move": ["G"],
+    "edit.clone": ["N"],
+    "edit.delete": ["Delete"],
+    "edit.undo": ["Ctrl+Z"],
+    "edit.redo": ["Ctrl+Y", "Ctrl+Shift+Z"],
+    "edit.place": ["MouseRight"],
+
+    "move.axis_x": ["X"],
+    "move.axis_y": ["Y"],
+    "move.axis_z": ["Z"],
+    "move.rotate": ["R"],
+    "move.rotate_back": ["Shift+R"],
+    "move.mirror": ["F"],
+    "move.exit": ["MouseRight", "Shift+MouseRight"],
+
+    "select.pick": ["MouseLeft"],
+    "select.pick_add": ["Ctrl+MouseLeft"],
+    "select.invert": ["I"],
+    "select.grow": ["="],
+    "select.shrink": ["-"],
+    "select.box": ["B"],
+    "select.sphere": ["R"],
+    "select.sphere_add": ["Ctrl+R"],
+    "select.color": ["K"],
+    "select.color_add": ["Ctrl+K"],
+
+    "window.objects": ["O"],
+    "window.material": ["C"],
+
+    "scene.save_now": ["F5"],
+    "scene.export": ["M"],
+    "scene.import": ["Ctrl+M"],
+    "scene.generate_terrain": ["Ctrl+T"],
+
+    "profiler.overlay": ["F3"],
+    "profiler.trace": ["F12"],
+}
+
+
+def parse_chord(text: str) -> tuple[int, int, int]:
+    """"Ctrl+Shift+Z" → (устройство, код клавиши или кнопки, модификаторы GLFW)."""
+    *modifiers, name = [part.strip() for part in text.split("+")]
+
+    mods = 0
+    for modifier in modifiers:
+        if modifier.lower() not in MODIFIERS:
+            raise ValueError(f"unknown modifier {modifier!r} in {text!r}")
+        mods |= MODIFIERS[modifier.lower()]
+
+    lowered = KEY_ALIASES.get(name.lower(), name.lower())
+    if lowered == "scroll":
+        return DEVICE_SCROLL, 0, mods
+    if lowered in MOUSE_BUTTONS:
+        return DEVICE_MOUSE, MOUSE_BUTTONS[lowered], mods
+
+    # "LeftShift" → GLFW_KEY_LEFT_SHIFT, "F12" → GLFW_KEY_F12
+    constant = "GLFW_KEY_" + "".join(
+        "_" + char if char.isupper() and i and name[i - 1].islower() else char
+        for i, char in enumerate(name)
+    ).upper()
+    code = getattr(GLFW_CONSTANTS, constant, None)
+    if code is None:
+        code = getattr(GLFW_CONSTANTS, "GLFW_KEY_" + lowered.upper(), None)
+    if code is None:
+        raise ValueError(f"unknown key {name!r} in {text!r}")
+    return DEVICE_KEY, code, mods
+
+
+# ======================================================================
+# Keymap
+# ======================================================================
+
+class Keymap:
+    """
+    Раскладка: именованные действия ↔ сочетания клавиш, кнопок мыши и
+    колеса. Одно сочетание может вести к нескольким действиям (R — выделить
+    сферу или повернуть выделение): какое из них выполнить, решает
+    приложение по своему режиму.
+    """
+
+    def __init__(self, bindings: dict[str, list[str]] | None = None):
+        self.bindings: dict[str, list[str]] = {}
+        self._chords: dict[tuple[int, int, int], tuple[str, ...]] = {}
+        self._inputs: dict[str, set[tuple[int, int]]] = {}
+        for action, chords in (DEFAULT_BINDINGS if bindings is None else bindings).items():
+            self.bind(action, *chords)
+
+    @classmethod
+    def load(cls, filepath: str) -> "Keymap":
+        """
+        Раскладка по умолчанию, переопределённая JSON-файлом
+        {"действие": ["сочетание", ...]} (если файл есть).
+        """
+        keymap = cls()
+        if os.path.exists(filepath):
+            with open(filepath, "r", encoding="utf-8") as f:
+                for action, chords in json.load(f).items():
+                    keymap.bind(action, *([chords] if isinstance(chords, str) else chords))
+        return keymap
+
+    def save(self, filepath: str) -> None:
+        """Записывает раскладку в JSON-файл (формат load)."""
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump(self.bindings, f, indent=2, ensure_ascii=False)
+
+    def bind(self, action: str, *chords: str) -> None:
+        """Назначает действию сочетания chords (прежние сочетания действия снимаются)."""
+        parsed = [parse_chord(chord) for chord in chords]
+        self.unbind(action)
+        self.bindings[action] = list(chords)
+        self._inputs[action] = {(device, code) for device, code, _ in parsed}
+        for chord in parsed:
+            self._chords[chord] = self._chords.get(chord, ()) + (action,)
+
+    def unbind(self, action: str) -> None:
+        """Снимает все сочетания действия."""
+        for chord in [parse_chord(chord) for chord in self.bindings.pop(action, [])]:
+            actions = tuple(name for name in self._chords.get(chord, ()) if name != action)
+            if actions:
+                self._chords[chord] = actions
+            else:
+                self._chords.pop(chord, None)
+        self._inputs.pop(action, None)
+
+    def actions(self, device: int, code: int, mods: int) -> tuple[str, ...]:
+        """Действия сочетания (модификаторы сравниваются точно)."""
+        return self._chords.get((device, code, mods & MODIFIER_MASK), ())
+
+    def inputs(self, action: str) -> set[tuple[int, int]]:
+        """Клавиши и кнопки действия без модификаторов: (устройство, код)."""
+        return self._inputs.get(action, set())
+
+
+# ======================================================================
+# Input Queue
+# ======================================================================
+
+class InputEvent:
+    """Событие ввода, сопоставленное действиям раскладки."""
+
+    __slots__ = ("actions", "type", "mods", "x", "y", "amount")
+
+    def __init__(self, actions: tuple[str, ...], type: int, mods: int,
+                 x: float = 0.0, y: float = 0.0, amount: float = 0.0):
+        self.actions = actions
+        self.type = type        # PRESS / RELEASE / REPEAT
+        self.mods = mods
+        self.x = x              # курсор в момент события, пиксели окна
+        self.y = y
+        self.amount = amount    # прокрутка колеса по вертикали
+
+
+class InputQueue:
+    """
+    Ввод окна GLFW через обратные вызовы клавиатуры, мыши и колеса.
+    События, которым в раскладке соответствует действие, копятся в очереди
+    до take_events() — приложение обрабатывает каждый кадр только то, что
+    произошло с прошлого кадра, и каждое нажатие ровно один раз.
+    Для удерживаемых действий (движение камеры) ведётся множество
+    зажатых клавиш и кнопок: held(action).
+    """
+
+    def __init__(self, window, keymap: Keymap):
+        self.window = window
+        self.keymap = keymap
+        self.events: collections.deque[InputEvent] = collections.deque()
+        self._down: set[tuple[int, int]] = set()
+
+        glfw.set_key_callback(window, self._on_key)
+        glfw.set_mouse_button_callback(window, self._on_mouse_button)
+        glfw.set_scroll_callback(window, self._on_scroll)
+        glfw.set_window_focus_callback(window, self._on_focus)
+
+    # ------------------------------------------------------------------
+    # GLFW callbacks
+    # ------------------------------------------------------------------
+
+    def _on_key(self, window, key, scancode, action, mods):
+        self._record(DEVICE_KEY, key, action, mods)
+
+    def _on_mouse_button(self, window, button, action, mods):
+        self._record(DEVICE_MOUSE, button, action, mods)
+
+    def _on_scroll(self, window, x_offset, y_offset):
+        actions = self.keymap.actions(DEVICE_SCROLL, 0, self._mods())
+        if actions:
+            x, y = glfw.get_cursor_pos(window)
+            self.events.append(InputEvent(actions, PRESS, self._mods(), x, y, y_offset))
+
+    def _on_focus(self, window, focused):
+        # отпускание клавиш вне окна не придёт — забываем зажатые
+        if not focused:
+            self._down.clear()
+
+    def _record(self, device: int, code: int, action: int, mods: int) -> None:
+        if action == RELEASE:
+            self._down.discard((device, code))
+        else:
+            self._down.add((device, code))
+
+        actions = self.keymap.actions(device, code, mods)
+        if actions:
+            x, y = glfw.get_cursor_pos(self.window)
+            self.events.append(InputEvent(actions, action, mods & MODIFIER_MASK, x, y))
+
+    def _mods(self) -> int:
+        """Модификаторы по зажатым клавишам (колесо их не сообщает)."""
+        mods = 0
+        for key, mod in (
+            (GLFW_CONSTANTS.GLFW_KEY_LEFT_SHIFT, GLFW_CONSTANTS.GLFW_MOD_SHIFT),
+            (GLFW_CONSTANTS.GLFW_KEY_RIGHT_SHIFT, GLFW_CONSTANTS.GLFW_MOD_SHIFT),
+            (GLFW_CONSTANTS.GLFW_KEY_LEFT_CONTROL, GLFW_CONSTANTS.GLFW_MOD_CONTROL),
+            (GLFW_CONSTANTS.GLFW_KEY_RIGHT_CONTROL, GLFW_CONSTANTS.GLFW_MOD_CONTROL),
+            (GLFW_CONSTANTS.GLFW_KEY_LEFT_ALT, GLFW_CONSTANTS.GLFW_MOD_ALT),
+            (GLFW_CONSTANTS.GLFW_KEY_RIGHT_ALT, GLFW_CONSTANTS.GLFW_MOD_ALT),
+        ):
+            if (DEVICE_KEY, key) in self._down:
+                mods |= mod
+        return mods
+
+    # ------------------------------------------------------------------
+
+    def take_events(self) -> list[InputEvent]:
+        """События с прошлого вызова, по порядку; очередь очищается."""
+        events = list(self.events)
+        self.events.clear()
+        return events
+
+    def held(self, action: str) -> bool:
+        """Зажата ли сейчас какая-нибудь клавиша (кнопка) действия."""
+        return not self._down.isdisjoint(self.keymap.inputs(action))
+
+    @property
+    def any_held(self) -> bool:
+        """Зажата ли хоть одна клавиша или кнопка."""
+        return bool(self._down)
@@ -1,33 +1,194 @@
-from OpenGL.GL import *
 import numpy as np
 
 
 class Material:
     """
     Простой материал RGBA без текстур.
-    Отправляет цвет в шейдер через uniform `materialColor`.
+    Хранит только данные; цвета объектов сцены лежат в MaterialPalette,
+    в шейдеры они попадают текстурой палитры (см. Graphics_Engine).
     """
 
     def __init__(self, r: float = 0.5, g: float = 0.5, b: float = 0.5, a: float = 1.0):
         # Храним цвет в numpy-массиве для удобной передачи в OpenGL
         self.color = np.array([r, g, b, a], dtype=np.float32)
 
+
+# ======================================================================
+# Material Palette
+# ======================================================================
+
+class MaterialPalette:
+    """
+    Палитра материалов сцены: каждый различный цвет RGBA хранится один раз,
+    объекты ссылаются на него номером записи (uint32).
+
+    У записи есть счётчик ссылок; запись, на которую не ссылается ни один
+    объект, освобождается и отдаётся следующему новому цвету. Поэтому номера
+    записей стабильны, пока запись жива, но не после её освобождения.
+
+    revision растёт при каждом изменении цветов записей — по нему рендерер
+    понимает, что текстуру палитры пора перезагрузить.
+    """
+
+    def __init__(self, capacity: int = 16):
+        self.size = 0          # записи [0, size) выделялись хотя бы раз
+        self.revision = 0
+
+        self._colors = np.zeros((capacity, 4), dtype=np.float32)
+        self._counts = np.zeros(capacity, dtype=np.int64)
+
+        # байты цвета → номер живой записи; свободные номера внутри [0, size)
+        self._lookup: dict[bytes, int] = {}
+        self._free: list[int] = []
+
+    @property
+    def colors(self) -> np.ndarray:
+        """Цвета записей (size, 4); у свободных записей цвет произвольный."""
+        return self._colors[:self.size]
+
+    @property
+    def counts(self) -> np.ndarray:
+        """Счётчики ссылок записей (size,)."""
+        return self._counts[:self.size]
+
+    def __len__(self) -> int:
+        """Число живых записей (различных цветов)."""
+        return len(self._lookup)
+
+    def find(self, color) -> int:
+        """Номер записи с цветом color или -1."""
+        return self._lookup.get(_color_key(color), -1)
+
+    # ------------------------------------------------------------------
+    # References
     # ------------------------------------------------------------------
 
-    def use(self, shader_program: int | None = None) -> None:
+    def intern(self, colors, refs: int = 1) -> np.ndarray:
         """
-        Активирует материал, отправляя uniform 'materialColor'.
-        shader_program — ID шейдера, в который будут переданы данные.
+        Номера записей для цветов (N, 4); на запись каждой строки добавляется
+        refs ссылок. Новые цвета получают свободные или новые записи — все
+        разом. Словарь обходится один раз на различный цвет пачки, а не на
+        строку, ключи получаются одним tolist() без цикла по строкам.
         """
-        if shader_program is None:
+        colors = np.ascontiguousarray(colors, dtype=np.float32).reshape(-1, 4)
+        if len(colors) == 0:
+            return np.zeros(0, dtype=np.uint32)
+
+        unique, inverse = _unique_rows(colors)
+        keys = _color_keys(unique)
+        lookup = self._lookup
+        entries = np.fromiter((lookup.get(key, -1) for key in keys), dtype=np.int64, count=len(keys))
+
+        new = np.flatnonzero(entries < 0)
+        if len(new):
+            allocated = self._allocate(len(new))
+            self._colors[allocated] = unique[new]
+            self._counts[allocated] = 0
+            entries[new] = allocated
+            lookup.update(zip([keys[row] for row in new.tolist()], allocated.tolist()))
+            self.revision += 1
+
+        indices = entries.astype(np.uint32)[inverse]
+        self._counts[:self.size] += refs * np.bincount(indices, minlength=self.size)
+        return indices
+
+    def release(self, indices) -> None:
+        """Снимает по ссылке с записей indices; опустевшие записи освобождаются."""
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+        if len(indices) == 0:
             return
 
-        loc_color = glGetUniformLocation(shader_program, "materialColor")
-        if loc_color != -1:
-            glUniform4fv(loc_color, 1, self.color)
+        released = np.bincount(indices, minlength=self.size)
+        touched = np.flatnonzero(released)
+        self._counts[:self.size] -= released
+
+        freed = touched[self._counts[touched] <= 0]
+        for key in _color_keys(self._colors[freed]):
+            del self._lookup[key]
+        self._counts[freed] = 0
+        self._free.extend(freed.tolist())
+
+    def clear(self) -> None:
+        """Освобождает все записи."""
+        self.size = 0
+        self._counts[:] = 0
+        self._lookup.clear()
+        self._free.clear()
+        self.revision += 1
 
     # ------------------------------------------------------------------
+    # Remap
+    # ------------------------------------------------------------------
+
+    def set_color(self, entry: int, color) -> bool:
+        """
+        Меняет цвет живой записи entry на месте: все объекты, ссылающиеся
+        на неё, перекрашиваются без записи в их колонки. Возвращает False
+        (ничего не меняя), если такой цвет уже есть в другой записи —
+        тогда объекты нужно перевести на неё номерами.
+        """
+        color = np.asarray(color, dtype=np.float32).reshape(4)
+        key = color.tobytes()
+        other = self._lookup.get(key)
+        if other is not None:
+            return other == entry
+
+        del self._lookup[self._colors[entry].tobytes()]
+        self._lookup[key] = entry
+        self._colors[entry] = color
+        self.revision += 1
+        return True
+
+    # ------------------------------------------------------------------
+
+    def _allocate(self, count: int) -> np.ndarray:
+        """count записей под новые цвета: сначала свободные, остальные — в конце палитры."""
+        reused = min(count, len(self._free))
+        entries = self._free[len(self._free) - reused:]
+        del self._free[len(self._free) - reused:]
+
+        start = self.size
+        self.size += count - reused
+        while self.size > len(self._colors):
+            self._colors = _grown(self._colors)
+            self._counts = _grown(self._counts)
+        return np.concatenate([np.asarray(entries, dtype=np.int64), np.arange(start, self.size)])
+
 
-    def destroy(self) -> None:
-        """Материал не создаёт OpenGL-ресурсов, поэтому тут пусто."""
-        pass
+def color_hashes(colors: np.ndarray) -> np.ndarray:
+    """64-битный хэш битового представления каждого цвета RGBA (N, 4) float32."""
+    bits = np.ascontiguousarray(colors, dtype=np.float32).view(np.uint32).astype(np.uint64)
+    hashes = bits[:, 0]
+    for column in range(1, 4):
+        hashes = hashes * np.uint64(0x9E3779B97F4A7C15) ^ bits[:, column]
+    return hashes
+
+
+def _grown(column: np.ndarray) -> np.ndarray:
+    """Копия колонки удвоенной длины."""
+    grown = np.zeros((2 * len(column),) + column.shape[1:], dtype=column.dtype)
+    grown[:len(column)] = column
+    return grown
+
+
+def _color_key(color) -> bytes:
+    return np.asarray(color, dtype=np.float32).reshape(4).tobytes()
+
+
+def _color_keys(colors: np.ndarray) -> list[bytes]:
+    """Ключи _color_key для строк (N, 4) float32 — одним проходом на C."""
+    colors = np.ascontiguousarray(colors, dtype=np.float32).reshape(-1, 4)
+    return colors.view(np.dtype((np.void, 16))).reshape(-1).tolist()
+
+
+def _unique_rows(colors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Различные строки (K, 4) float32 и номер различной строки для каждой
+    исходной. Сортируются 64-битные хэши строк; если у разных цветов хэш
+    совпал, используется точный (медленный) np.unique по строкам.
+    """
+    _, first, inverse = np.unique(color_hashes(colors), return_index=True, return_inverse=True)
+    unique = colors[first]
+    if not np.array_equal(unique[inverse.reshape(-1)].view(np.uint32), colors.view(np.uint32)):
+        unique, inverse = np.unique(colors, axis=0, return_inverse=True)
+    return unique, inverse.reshape(-1)
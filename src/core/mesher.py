@@ -0,0 +1,175 @@
+import numpy as np
+
+from .voxel_grid import EMPTY
+
+
+# Вершина меша чанка: позиция (3), нормаль (3), номер материала (1).
+# Номер хранится в float — точно до 2**24 записей палитры.
+FLOATS_PER_VERTEX = 7
+
+# Столько вершин отправлял в GPU один куб без отсечения граней
+CUBE_VERTEX_COUNT = 36
+
+# Индексы двух треугольников квада по его четырём вершинам
+_QUAD_INDICES = np.array([0, 1, 2, 0, 2, 3], dtype=np.uint32)
+
+
+# ======================================================================
+# Greedy meshing
+# ======================================================================
+
+def greedy_mesh(labels: np.ndarray, occupied: np.ndarray,
+                origin=(0, 0, 0), cell_size: float = 1.0):
+    """
+    Строит меш чанка: только грани, граничащие с пустотой, причём соседние
+    компланарные грани одного материала склеиваются в прямоугольники.
+
+    labels   : (S, S, S) int — номер материала (записи палитры) для каждой
+               клетки чанка, -1 — пусто; номер попадает в вершины как есть
+    occupied : (S+2, S+2, S+2) bool — занятость чанка с рамкой в одну клетку
+               из соседних чанков (нужна, чтобы не рисовать грани на стыках)
+    origin   : клетка сетки, соответствующая labels[0, 0, 0]
+
+    Слияние двухпроходное и полностью векторизованное: сначала грани
+    собираются в отрезки вдоль одной оси среза, затем одинаковые отрезки
+    соседних строк — в прямоугольники.
+
+    Возвращает (vertices (4Q, 7) float32, indices (6Q,) uint32, stats).
+    """
+    labels = np.asarray(labels)
+    size = labels.shape[0]
+    origin = np.asarray(origin, dtype=np.float64)
+
+    quads = []
+    visible_faces = 0
+
+    for axis in range(3):
+        u_axis, v_axis = (axis + 1) % 3, (axis + 2) % 3
+        for sign in (1, -1):
+            # грань есть там, где клетка занята, а сосед по направлению — нет
+            neighbour = [slice(1, size + 1)] * 3
+            neighbour[axis] = slice(1 + sign, size + 1 + sign)
+            exposed = (labels >= 0) & ~occupied[tuple(neighbour)]
+            visible_faces += int(np.count_nonzero(exposed))
+
+            faces = np.where(exposed, labels, -1)
+            faces = np.transpose(faces, (axis, v_axis, u_axis))   # (срез, строка v, столбец u)
+
+            rects = _merge_faces(faces)
+            if len(rects):
+                quads.append(_quad_vertices(rects, axis, sign, origin, cell_size))
+
+    if quads:
+        vertices = np.concatenate(quads)
+    else:
+        vertices = np.zeros((0, FLOATS_PER_VERTEX), dtype=np.float32)
+
+    quad_count = len(vertices) // 4
+    indices = (np.arange(quad_count, dtype=np.uint32)[:, None] * 4 + _QUAD_INDICES).reshape(-1)
+
+    voxels = int(np.count_nonzero(labels >= 0))
+    stats = {
+        "voxels": voxels,
+        "naive_vertices": voxels * CUBE_VERTEX_COUNT,
+        "visible_faces": visible_faces,
+        "culled_vertices": visible_faces * 6,
+        "quads": quad_count,
+        "vertices": len(vertices),
+        "indices": len(indices),
+    }
+    return vertices, indices, stats
+
+
+def _merge_faces(faces: np.ndarray) -> np.ndarray:
+    """
+    Склеивает грани срезов (D, V, U) в прямоугольники.
+    Возвращает массив (R, 6): срез, v0, u0, длина по u, длина по v, материал.
+    """
+    depth, rows, cols = faces.shape
+    if not np.any(faces >= 0):
+        return np.zeros((0, 6), dtype=np.int64)
+
+    # 1) отрезки одного материала вдоль u
+    pad = np.full((depth, rows, 1), -1, dtype=faces.dtype)
+    before = np.concatenate([pad, faces[..., :-1]], axis=2)
+    after = np.concatenate([faces[..., 1:], pad], axis=2)
+    filled = faces >= 0
+
+    starts = np.flatnonzero(filled & (faces != before))
+    ends = np.flatnonzero(filled & (faces != after))
+
+    s, v, u0 = np.unravel_index(starts, faces.shape)
+    length_u = ends - starts + 1
+    material = faces.reshape(-1)[starts]
+
+    # 2) одинаковые отрезки в соседних строках одного среза → прямоугольник
+    order = np.lexsort((v, material, length_u, u0, s))
+    s, v, u0, length_u, material = s[order], v[order], u0[order], length_u[order], material[order]
+
+    same_run = np.zeros(len(s), dtype=bool)
+    same_run[1:] = (
+        (s[1:] == s[:-1]) & (u0[1:] == u0[:-1]) & (length_u[1:] == length_u[:-1])
+        & (material[1:] == material[:-1]) & (v[1:] == v[:-1] + 1)
+    )
+    first = np.flatnonzero(~same_run)
+    length_v = np.diff(np.append(first, len(s)))
+
+    return np.stack([s[first], v[first], u0[first], length_u[first], length_v, material[first]], axis=1)
+
+
+def _quad_vertices(rects: np.ndarray, axis: int, sign: int,
+                   origin: np.ndarray, cell_size: float) -> np.ndarray:
+    """Четыре вершины на прямоугольник, обход против часовой стрелки снаружи."""
+    u_axis, v_axis = (axis + 1) % 3, (axis + 2) % 3
+    s, v0, u0, length_u, length_v, material = rects.T
+
+    # клетка i занимает [i - 0.5, i + 0.5] в единицах сетки
+    plane = s + 0.5 * sign
+    u_lo, u_hi = u0 - 0.5, u0 + length_u - 0.5
+    v_lo, v_hi = v0 - 0.5, v0 + length_v - 0.5
+
+    corners_u = np.stack([u_lo, u_hi, u_hi, u_lo], axis=1)
+    corners_v = np.stack([v_lo, v_lo, v_hi, v_hi], axis=1)
+    if sign < 0:
+        corners_u, corners_v = corners_u[:, ::-1], corners_v[:, ::-1]
+
+    count = len(rects)
+    vertices = np.empty((count, 4, FLOATS_PER_VERTEX), dtype=np.float32)
+
+    positions = np.empty((count, 4, 3), dtype=np.float64)
+    positions[:, :, axis] = plane[:, None]
+    positions[:, :, u_axis] = corners_u
+    positions[:, :, v_axis] = corners_v
+    vertices[:, :, 0:3] = (positions + origin) * cell_size
+
+    normal = np.zeros(3, dtype=np.float32)
+    normal[axis] = sign
+    vertices[:, :, 3:6] = normal
+    vertices[:, :, 6] = material[:, None]
+
+    return vertices.reshape(-1, FLOATS_PER_VERTEX)
+
+
+# ======================================================================
+# Scene chunks
+# ======================================================================
+
+def mesh_scene_chunk(scene, key):
+    """
+    Меш чанка key сцены: собирает занятость с рамкой из соседних чанков,
+    номера материалов кубов из хранилища и вызывает greedy_mesh. Цвета
+    в меш не попадают, поэтому перекраска записи палитры его не меняет.
+    Поворот кубов в этом режиме не учитывается — кубы стоят в центрах клеток.
+    """
+    grid = scene.grid
+    ids = grid.padded_block(key)
+    occupied = ids != EMPTY
+
+    inner = ids[1:-1, 1:-1, 1:-1]
+    filled = inner != EMPTY
+    slots = scene.voxels.slots_of(inner[filled])
+
+    labels = np.full(inner.shape, -1, dtype=np.int64)
+    labels[filled] = scene.voxels.materials[slots]
+
+    return greedy_mesh(labels, occupied, grid.chunk_origin(key), grid.cell_size)
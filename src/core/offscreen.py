@@ -0,0 +1,185 @@
+"""
+Контекст OpenGL 3.3 core без окна — для бенчмарков и проверок в CI.
+
+Бэкенды:
+    egl    — EGL без поверхности (EGL_PLATFORM=surfaceless), Mesa llvmpipe
+             работает без GPU и без X-сервера;
+    osmesa — программный OSMesa.
+
+PyOpenGL выбирает платформу при первом импорте OpenGL.GL по переменной
+PYOPENGL_PLATFORM, поэтому select_platform() нужно вызвать до импорта
+модулей, рисующих через OpenGL (graphics_engine, gpu_resources и т. п.).
+"""
+
+import ctypes
+import os
+
+import numpy as np
+
+BACKEND_EGL = "egl"
+BACKEND_OSMESA = "osmesa"
+BACKENDS = (BACKEND_EGL, BACKEND_OSMESA)
+
+
+def select_platform(backend: str = BACKEND_EGL) -> str:
+    """
+    Настраивает PyOpenGL на бэкенд без окна. Уже заданная PYOPENGL_PLATFORM
+    имеет приоритет. Возвращает выбранный бэкенд.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown offscreen backend: {backend}")
+    os.environ.setdefault("PYOPENGL_PLATFORM", backend)
+    if os.environ["PYOPENGL_PLATFORM"] == BACKEND_EGL:
+        os.environ.setdefault("EGL_PLATFORM", "surfaceless")
+    return os.environ["PYOPENGL_PLATFORM"]
+
+
+# ======================================================================
+# Offscreen Context
+# ======================================================================
+
+class OffscreenContext:
+    """
+    Контекст OpenGL без окна и FBO width × height (цвет RGBA8, глубина 24 бита),
+    в который идёт вся отрисовка. После создания контекст текущий и FBO привязан,
+    поэтому Graphics_Engine рисует в него без изменений.
+    """
+
+    def __init__(self, width: int, height: int, backend: str | None = None):
+        self.width = width
+        self.height = height
+        self.backend = backend or os.environ.get("PYOPENGL_PLATFORM", BACKEND_EGL)
+
+        if self.backend == BACKEND_EGL:
+            self._create_egl()
+        elif self.backend == BACKEND_OSMESA:
+            self._create_osmesa()
+        else:
+            raise ValueError(f"unknown offscreen backend: {self.backend}")
+
+        self._create_framebuffer()
+
+    # ------------------------------------------------------------------
+    # Backends
+    # ------------------------------------------------------------------
+
+    def _create_egl(self) -> None:
+        from OpenGL import EGL
+
+        display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        if display == EGL.EGL_NO_DISPLAY or not EGL.eglInitialize(display, None, None):
+            raise RuntimeError("Failed to initialize EGL display")
+
+        config = EGL.EGLConfig()
+        count = EGL.EGLint()
+        config_attributes = (EGL.EGLint * 5)(
+            EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+            EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+            EGL.EGL_NONE,
+        )
+        if not EGL.eglChooseConfig(display, config_attributes, ctypes.pointer(config), 1, ctypes.pointer(count)) \
+                or count.value == 0:
+            raise RuntimeError("No EGL config with desktop OpenGL support")
+
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        context_attributes = (EGL.EGLint * 7)(
+            EGL.EGL_CONTEXT_MAJOR_VERSION, 3,
+            EGL.EGL_CONTEXT_MINOR_VERSION, 3,
+            EGL.EGL_CONTEXT_OPENGL_PROFILE_MASK, EGL.EGL_CONTEXT_OPENGL_CORE_PROFILE_BIT,
+            EGL.EGL_NONE,
+        )
+        context = EGL.eglCreateContext(display, config, EGL.EGL_NO_CONTEXT, context_attributes)
+        if context == EGL.EGL_NO_CONTEXT:
+            raise RuntimeError("Failed to create EGL OpenGL 3.3 core context")
+
+        # поверхность не нужна: рисуем только в FBO
+        if not EGL.eglMakeCurrent(display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, context):
+            raise RuntimeError("Failed to make EGL context current")
+
+        def destroy():
+            EGL.eglMakeCurrent(display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+            EGL.eglDestroyContext(display, context)
+            EGL.eglTerminate(display)
+
+        self._destroy_context = destroy
+
+    def _create_osmesa(self) -> None:
+        from OpenGL import GL, arrays, osmesa
+
+        attributes = arrays.GLintArray.asArray([
+            osmesa.OSMESA_FORMAT, osmesa.OSMESA_RGBA,
+            osmesa.OSMESA_DEPTH_BITS, 24,
+            osmesa.OSMESA_PROFILE, osmesa.OSMESA_CORE_PROFILE,
+            osmesa.OSMESA_CONTEXT_MAJOR_VERSION, 3,
+            osmesa.OSMESA_CONTEXT_MINOR_VERSION, 3,
+            0,
+        ])
+        context = osmesa.OSMesaCreateContextAttribs(attributes, None)
+        if not context:
+            raise RuntimeError("Failed to create OSMesa OpenGL 3.3 core context")
+
+        # буфер контекста OSMesa обязателен, хотя рисуем в FBO
+        self._osmesa_buffer = arrays.GLubyteArray.zeros((self.height, self.width, 4))
+        if not osmesa.OSMesaMakeCurrent(context, self._osmesa_buffer, GL.GL_UNSIGNED_BYTE, self.width, self.height):
+            raise RuntimeError("Failed to make OSMesa context current")
+
+        self._destroy_context = lambda: osmesa.OSMesaDestroyContext(context)
+
+    # ------------------------------------------------------------------
+    # Framebuffer
+    # ------------------------------------------------------------------
+
+    def _create_framebuffer(self) -> None:
+        from OpenGL import GL
+
+        self.framebuffer = GL.glGenFramebuffers(1)
+        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, self.framebuffer)
+
+        self.renderbuffers = GL.glGenRenderbuffers(2)
+        for renderbuffer, storage, attachment in zip(
+            self.renderbuffers,
+            (GL.GL_RGBA8, GL.GL_DEPTH_COMPONENT24),
+            (GL.GL_COLOR_ATTACHMENT0, GL.GL_DEPTH_ATTACHMENT),
+        ):
+            GL.glBindRenderbuffer(GL.GL_RENDERBUFFER, renderbuffer)
+            GL.glRenderbufferStorage(GL.GL_RENDERBUFFER, storage, self.width, self.height)
+            GL.glFramebufferRenderbuffer(GL.GL_FRAMEBUFFER, attachment, GL.GL_RENDERBUFFER, renderbuffer)
+
+        status = GL.glCheckFramebufferStatus(GL.GL_FRAMEBUFFER)
+        if status != GL.GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError(f"Offscreen framebuffer is incomplete: 0x{status:x}")
+
+    def read_pixels(self) -> np.ndarray:
+        """Содержимое FBO, (height, width, 4) uint8, первая строка — нижняя."""
+        from OpenGL import GL
+
+        GL.glBindFramebuffer(GL.GL_READ_FRAMEBUFFER, self.framebuffer)
+        data = GL.glReadPixels(0, 0, self.width, self.height, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE)
+        return np.frombuffer(data, dtype=np.uint8).reshape(self.height, self.width, 4).copy()
+
+    def info(self) -> dict:
+        """Бэкенд, размер FBO и строки GL_VENDOR / GL_RENDERER / GL_VERSION."""
+        from OpenGL import GL
+
+        def string(name) -> str:
+            value = GL.glGetString(name)
+            return value.decode() if value else ""
+
+        return {
+            "backend": self.backend,
+            "width": self.width,
+            "height": self.height,
+            "vendor": string(GL.GL_VENDOR),
+            "renderer": string(GL.GL_RENDERER),
+            "version": string(GL.GL_VERSION),
+        }
+
+    # ------------------------------------------------------------------
+
+    def destroy(self) -> None:
+        """Удаляет FBO и контекст."""
+        from OpenGL import GL
+
+        GL.glDeleteRenderbuffers(2, self.renderbuffers)
+        GL.glDeleteFramebuffers(1, (self.framebuffer,))
+        self._destroy_context()
@@ -0,0 +1,88 @@
+import math
+
+import numpy as np
+
+from .voxel_grid import EMPTY
+
+
+class RayHit:
+    """Результат луча: занятая клетка, нормаль грани входа, id вокселя и расстояние."""
+
+    __slots__ = ("cell", "normal", "voxel_id", "distance")
+
+    def __init__(self, cell, normal, voxel_id: int, distance: float):
+        self.cell = cell
+        self.normal = normal
+        self.voxel_id = voxel_id
+        self.distance = distance
+
+    @property
+    def adjacent_cell(self) -> tuple[int, int, int]:
+        """Клетка перед гранью, через которую вошёл луч, — туда ставится новый куб."""
+        return tuple(c + n for c, n in zip(self.cell, self.normal))
+
+
+def screen_ray(x: float, y: float, width: int, height: int,
+               projection: np.ndarray, view: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Луч из камеры через точку окна (x, y) в пикселях (начало — левый верхний угол).
+    Матрицы в соглашении pyrr (вектор-строка). Возвращает (origin, direction),
+    direction нормирован.
+    """
+    ndc_x = 2.0 * x / width - 1.0
+    ndc_y = 1.0 - 2.0 * y / height
+
+    inverse = np.linalg.inv(np.asarray(view, dtype=np.float64) @ np.asarray(projection, dtype=np.float64))
+    near = np.array([ndc_x, ndc_y, -1.0, 1.0]) @ inverse
+    far = np.array([ndc_x, ndc_y, 1.0, 1.0]) @ inverse
+    near = near[:3] / near[3]
+    far = far[:3] / far[3]
+
+    direction = far - near
+    return near, direction / np.linalg.norm(direction)
+
+
+def raycast(grid, origin, direction, max_distance: float = 100.0) -> RayHit | None:
+    """
+    Первая занятая клетка сетки вдоль луча (обход Amanatides–Woo).
+    Луч проходит клетки по одной, поэтому время зависит только от длины
+    луча в клетках, а не от числа вокселей в сцене.
+    Если начало луча уже внутри занятой клетки, нормаль нулевая.
+    """
+    cell_size = grid.cell_size
+
+    # координаты в клетках: клетка i занимает [i, i + 1)
+    start = [float(p) / cell_size + 0.5 for p in origin]
+    dirs = [float(d) for d in direction]
+    limit = max_distance / cell_size
+
+    cell = [math.floor(p) for p in start]
+    step = [0, 0, 0]
+    t_max = [math.inf] * 3
+    t_delta = [math.inf] * 3
+    for axis in range(3):
+        d = dirs[axis]
+        if d > 0:
+            step[axis] = 1
+            t_max[axis] = (cell[axis] + 1 - start[axis]) / d
+            t_delta[axis] = 1.0 / d
+        elif d < 0:
+            step[axis] = -1
+            t_max[axis] = (start[axis] - cell[axis]) / -d
+            t_delta[axis] = -1.0 / d
+
+    normal = [0, 0, 0]
+    t = 0.0
+    while t <= limit:
+        voxel_id = grid.get(cell)
+        if voxel_id != EMPTY:
+            return RayHit(tuple(cell), tuple(normal), voxel_id, t * cell_size)
+
+        axis = t_max.index(min(t_max))
+        t = t_max[axis]
+        cell[axis] += step[axis]
+        t_max[axis] += t_delta[axis]
+        normal = [0, 0, 0]
+        normal[axis] = -step[axis]
+
+    return None
@@ -0,0 +1,243 @@
+import collections
+import ctypes
+import json
+import os
+import time
+
+from OpenGL.GL import *
+from OpenGL.raw.GL.VERSION.GL_3_3 import glGetQueryObjectui64v as _glGetQueryObjectui64v
+import numpy as np
+
+
+# Перцентили по фазам для оверлея и phase_stats()
+PHASE_PERCENTILES = (50, 95, 99)
+
+# Результат GPU-таймера длиннее этого — мусор, а не замер: Mesa llvmpipe
+# на первый запрос контекста отдаёт абсолютную метку времени
+MAX_GPU_SCOPE_NS = 10_000_000_000
+
+
+# ======================================================================
+# Frame Profiler
+# ======================================================================
+
+class FrameProfiler:
+    """
+    Профилировщик кадров: именованные вложенные таймеры (scope) на CPU,
+    по желанию — таймеры GPU (запросы GL_TIME_ELAPSED), кольцевой буфер
+    последних capacity кадров и выгрузка в Chrome trace JSON
+    (открывается в chrome://tracing и ui.perfetto.dev).
+
+        profiler.begin_frame()
+        with profiler.scope("render", gpu=True):
+            ...
+        profiler.end_frame()
+
+    Вне begin_frame / end_frame и при enabled = False scope() ничего
+    не измеряет и почти ничего не стоит — поэтому таймеры можно оставлять
+    в коде рендерера, даже если профилировщик никто не ведёт.
+
+    Запрос GL_TIME_ELAPSED может быть активен только один, поэтому GPU
+    измеряется лишь у scope(gpu=True), внутри которых нет другого такого же.
+    Результаты запросов приходят с опозданием в кадр-другой и дописываются
+    в свои кадры, когда готовы (без ожидания GPU).
+    """
+
+    def __init__(self, capacity: int = 600, gpu_timers: bool = False):
+        self.enabled = True
+        self.gpu_timers = gpu_timers
+        self.frames: collections.deque = collections.deque(maxlen=capacity)
+
+        self._origin = time.perf_counter_ns()
+        self._frame: dict | None = None
+        self._frame_index = 0
+        self._depth = 0
+
+        # GPU: свободные объекты запросов, активный запрос и ожидающие результата
+        self._free_queries: list[int] = []
+        self._gpu_active = False
+        self._pending: collections.deque = collections.deque()
+        self._result = ctypes.c_uint64()
+
+    # ------------------------------------------------------------------
+    # Frames
+    # ------------------------------------------------------------------
+
+    def begin_frame(self) -> None:
+        """Начинает запись кадра (и забирает готовые результаты GPU-таймеров)."""
+        if not self.enabled:
+            return
+        if self._pending:
+            self._collect_gpu()
+        self._frame = {
+            "index": self._frame_index,
+            "start": time.perf_counter_ns() - self._origin,
+            "events": [],        # (имя, начало, длительность, глубина), нс
+            "gpu": [],           # (имя, начало scope на CPU, длительность на GPU), нс
+        }
+        self._frame_index += 1
+        self._depth = 0
+
+    def end_frame(self) -> None:
+        """Закрывает кадр и кладёт его в кольцевой буфер."""
+        frame = self._frame
+        if frame is None:
+            return
+        frame["duration"] = time.perf_counter_ns() - self._origin - frame["start"]
+        self.frames.append(frame)
+        self._frame = None
+
+    def discard_frame(self) -> None:
+        """Отбрасывает начатый кадр (итерация цикла без отрисовки)."""
+        self._frame = None
+
+    def scope(self, name: str, gpu: bool = False):
+        """Контекстный менеджер: время блока на CPU (и на GPU при gpu=True)."""
+        if self._frame is None:
+            return _NULL_SCOPE
+        return _Scope(self, name, gpu and self.gpu_timers and not self._gpu_active)
+
+    # ------------------------------------------------------------------
+    # GPU timers
+    # ------------------------------------------------------------------
+
+    def _begin_query(self) -> int:
+        query = self._free_queries.pop() if self._free_queries else int(glGenQueries(1)[0])
+        glBeginQuery(GL_TIME_ELAPSED, query)
+        self._gpu_active = True
+        return query
+
+    def _end_query(self, query: int, name: str, start: int) -> None:
+        glEndQuery(GL_TIME_ELAPSED)
+        self._gpu_active = False
+        self._pending.append((query, self._frame, name, start))
+
+    def _collect_gpu(self) -> None:
+        """Дописывает в кадры результаты готовых запросов (по порядку выдачи)."""
+        while self._pending:
+            query, frame, name, start = self._pending[0]
+            if not glGetQueryObjectiv(query, GL_QUERY_RESULT_AVAILABLE):
+                break
+            self._pending.popleft()
+            # обёртка PyOpenGL не умеет выходной массив GLuint64 — зовём сырую функцию
+            _glGetQueryObjectui64v(query, GL_QUERY_RESULT, ctypes.byref(self._result))
+            if self._result.value < MAX_GPU_SCOPE_NS:
+                frame["gpu"].append((name, start, self._result.value))
+            self._free_queries.append(query)
+
+    # ------------------------------------------------------------------
+    # Statistics
+    # ------------------------------------------------------------------
+
+    def phase_stats(self) -> dict[str, dict[str, float]]:
+        """
+        Перцентили PHASE_PERCENTILES по кадрам буфера, в мс: для каждого имени
+        scope — суммарное время за кадр (GPU — с префиксом "gpu:"), плюс
+        "frame" — длительность всего кадра. Порядок — порядок первого появления.
+        """
+        totals: dict[str, list[float]] = {"frame": []}
+        for frame in self.frames:
+            per_frame: dict[str, float] = {}
+            for name, _, duration, _ in frame["events"]:
+                per_frame[name] = per_frame.get(name, 0.0) + duration
+            for name, _, duration in frame["gpu"]:
+                key = "gpu:" + name
+                per_frame[key] = per_frame.get(key, 0.0) + duration
+            totals["frame"].append(frame["duration"])
+            for name, duration in per_frame.items():
+                totals.setdefault(name, []).append(duration)
+
+        stats = {}
+        for name, values in totals.items():
+            if not values:
+                continue
+            values = np.asarray(values) / 1e6
+            stats[name] = {f"p{q}": float(np.percentile(values, q)) for q in PHASE_PERCENTILES}
+        return stats
+
+    def chrome_trace(self) -> dict:
+        """Кадры буфера в формате Chrome Trace Event (события "X", время в мкс)."""
+        events = [
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": 1, "args": {"name": "CPU"}},
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": 2, "args": {"name": "GPU"}},
+        ]
+        for frame in self.frames:
+            events.append({
+                "name": "frame", "cat": "frame", "ph": "X", "pid": 1, "tid": 1,
+                "ts": frame["start"] / 1e3, "dur": frame["duration"] / 1e3,
+                "args": {"index": frame["index"]},
+            })
+            for name, start, duration, depth in frame["events"]:
+                events.append({
+                    "name": name, "cat": "cpu", "ph": "X", "pid": 1, "tid": 1,
+                    "ts": start / 1e3, "dur": duration / 1e3, "args": {"depth": depth},
+                })
+            # начало работы на GPU неизвестно — событие ставится на начало scope
+            for name, start, duration in frame["gpu"]:
+                events.append({
+                    "name": name, "cat": "gpu", "ph": "X", "pid": 1, "tid": 2,
+                    "ts": start / 1e3, "dur": duration / 1e3,
+                })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, filepath: str) -> str:
+        """Записывает chrome_trace() в файл и возвращает путь к нему."""
+        folder = os.path.dirname(filepath)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(filepath, "w") as f:
+            json.dump(self.chrome_trace(), f)
+        return filepath
+
+    # ------------------------------------------------------------------
+
+    def destroy(self) -> None:
+        """Удаляет объекты запросов GPU-таймеров."""
+        queries = self._free_queries + [pending[0] for pending in self._pending]
+        if queries:
+            glDeleteQueries(len(queries), queries)
+        self._free_queries, self._pending = [], collections.deque()
+
+
+class _Scope:
+    """Один замер FrameProfiler.scope()."""
+
+    __slots__ = ("profiler", "name", "gpu", "start", "query")
+
+    def __init__(self, profiler: FrameProfiler, name: str, gpu: bool):
+        self.profiler = profiler
+        self.name = name
+        self.gpu = gpu
+
+    def __enter__(self):
+        profiler = self.profiler
+        profiler._depth += 1
+        self.start = time.perf_counter_ns() - profiler._origin
+        if self.gpu:
+            self.query = profiler._begin_query()
+        return self
+
+    def __exit__(self, *exc):
+        profiler = self.profiler
+        if self.gpu:
+            profiler._end_query(self.query, self.name, self.start)
+        profiler._depth -= 1
+        duration = time.perf_counter_ns() - profiler._origin - self.start
+        if profiler._frame is not None:
+            profiler._frame["events"].append((self.name, self.start, duration, profiler._depth))
+        return False
+
+
+class _NullScope:
+    """scope() вне записи кадра: ничего не измеряет."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SCOPE = _NullScope()
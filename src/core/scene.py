@@ -2,35 +2,67 @@ import numpy as np
 from typing import List
 import os
 
-from .cube import Entity, CubeMesh
 from .camera import Camera
-from .material import Material
+from .material import MaterialPalette
+from .voxel_store import VoxelStore, VoxelView, KIND_CUBE, KIND_ENTITY, DEFAULT_COLOR
+from .voxel_grid import SparseVoxelGrid, EMPTY, pack_cells
+from .scene_formats import read_scene, write_scene_atomic
+from .history import History, InsertEdit, RemoveEdit, MoveEdit, RotateEdit, RecolorEdit
+
+
+# Шесть соседей клетки по граням (рост и сжатие выделения)
+FACE_NEIGHBOURS = np.array(
+    [[1, 0, 0], [-1, 0, 0], [0, 1, 0], [0, -1, 0], [0, 0, 1], [0, 0, -1]], dtype=np.int64
+)
 
 
 class Scene:
     """
     Основной класс сцены, содержащий объекты и камеру.
     Позволяет добавлять/удалять объекты, управлять камерой и сохранять/загружать сцену.
+    Сцена не зависит от OpenGL: её можно строить, загружать и редактировать
+    без окна и контекста — GPU-ресурсы создаёт Graphics_Engine.
     """
 
-    def __init__(self):
-        # Список всех объектов: CubeMesh, Entity и др.
-        self.entities: list = []
+    def __init__(self, grid_size: float = 1.0):
+        # Колоночное хранилище всех объектов (кубы и ENTITY)
+        self.voxels = VoxelStore()
+        self.voxels.scene = self
+
+        # Сетка занятости: не больше одного куба на клетку размера grid_size
+        self.grid = SparseVoxelGrid(cell_size=grid_size)
+
+        # Счётчик изменений геометрии и цвета сцены
+        # (какие именно чанки устарели, знает grid.dirty_chunks)
+        self.revision = 0
+
+        # Журнал отмены/повтора: добавления, удаления, перемещения и смены цвета
+        self.history = History()
 
         # Камера по умолчанию
         self.camera = Camera(position=[0, 0, 2])
 
+    @property
+    def entities(self) -> VoxelStore:
+        """Объекты сцены как последовательность VoxelView (для совместимости)."""
+        return self.voxels
+
+    @property
+    def palette(self) -> MaterialPalette:
+        """Палитра материалов сцены: различные цвета объектов со счётчиками ссылок."""
+        return self.voxels.palette
+
     # ----------------------------------------------------------------------
     # UPDATE
     # ----------------------------------------------------------------------
 
     def update(self, rate: float = 1.0):
         """Обновляет все объекты сцены, например, вращение кубов."""
-        for entity in self.entities:
-            if hasattr(entity, "eulers"):
-                entity.eulers[1] += 0.25 * rate
-                if entity.eulers[1] > 360:
-                    entity.eulers[1] -= 360
+        yaw = self.voxels.eulers[:, 1]
+        yaw += 0.25 * rate
+        yaw[yaw > 360] -= 360
+        self.voxels.invalidate_models()
+        self.revision += 1
 
     # ----------------------------------------------------------------------
     # CAMERA CONTROL
@@ -64,112 +96,486 @@ class Scene:
         position: List[float],
         eulers: List[float],
         color=np.array([0.5, 0.5, 0.5, 0.5], dtype=np.float32),
-    ) -> CubeMesh:
+    ) -> VoxelView | None:
         """
-        Создаёт и добавляет куб в сцену с собственным материалом.
-        Возвращает ссылку на объект CubeMesh.
+        Добавляет выделенный куб в сцену.
+        Возвращает представление VoxelView новой строки хранилища
+        или None, если клетка сетки уже занята.
         """
-        cube = CubeMesh(position=position, eulers=eulers)
-        try:
-            cube.material = Material(color[0], color[1], color[2], color[3])
-        except Exception as e:
-            print("[Scene] Failed to create material for cube:", e)
-            cube.material = None
+        ids = self.add_cubes([position], [color], [eulers], selected=True)
+        if len(ids) == 0:
+            return None
+        return self.voxels.view(int(ids[0]))
 
-        self.entities.append(cube)
-        cube.is_selected = True
-        return cube
+    def add_cubes(self, positions, colors=DEFAULT_COLOR, eulers=0, selected=False) -> np.ndarray:
+        """
+        Добавляет пачку кубов одной операцией: positions — (N, 3), colors —
+        один RGBA на всех или (N, 4), eulers — одни углы или (N, 3).
+        Кубы в занятых клетках и повторы клеток внутри пачки пропускаются.
+        id выдаются пачкой; ревизия сцены, чанки сетки, список объектов
+        и журнал отмены обновляются один раз на всю пачку.
+        Возвращает id добавленных кубов (в порядке positions).
+        """
+        return self._insert(positions, eulers, colors, KIND_CUBE, selected=selected)
 
-    def remove_entity_by_index(self, index: int) -> bool:
-        """Удаляет объект по индексу и освобождает ресурсы."""
-        if 0 <= index < len(self.entities):
-            ent = self.entities[index]
-            self._destroy_entity(ent)
-            del self.entities[index]
+    def duplicate(self, ids, offset) -> np.ndarray:
+        """
+        Копирует объекты со сдвигом offset. Копии становятся выделенными,
+        с оригиналов выделение снимается. Копии, попавшие в занятые клетки,
+        не создаются. Возвращает id созданных копий.
+        """
+        slots = self.voxels.slots_of(ids)
+        slots = slots[slots >= 0]
+        store = self.voxels
+
+        positions = store.positions[slots] + np.asarray(offset, dtype=np.float32)
+        eulers, colors, kinds = store.eulers[slots], store.colors_of(slots), store.kinds[slots]
+
+        store.set_selected(store.ids[slots], False)
+        return self._insert(positions, eulers, colors, kinds, selected=True)
+
+    def _insert(self, positions, eulers, colors, kinds, selected=False, ids=None) -> np.ndarray:
+        """
+        Добавляет пачку объектов, соблюдая правило «один куб на клетку сетки»:
+        кубы, чья клетка уже занята (или повторяется в пачке), пропускаются.
+        ids — вернуть объектам прежние id (отмена удаления).
+        Возвращает id добавленных объектов.
+        """
+        positions = np.asarray(positions, dtype=np.float32).reshape(-1, 3)
+        count = len(positions)
+        eulers = np.broadcast_to(np.asarray(eulers, dtype=np.float32), (count, 3))
+        colors = np.broadcast_to(np.asarray(colors, dtype=np.float32), (count, 4))
+        kinds = np.broadcast_to(np.asarray(kinds, dtype=np.uint8), (count,))
+        selected = np.broadcast_to(np.asarray(selected, dtype=bool), (count,))
+
+        cells = self.grid.cell_of(positions)
+        cubes = kinds == KIND_CUBE
+
+        accept = ~cubes
+        cube_rows = np.flatnonzero(cubes)
+        if len(cube_rows):
+            free = self.grid.get_many(cells[cube_rows]) == EMPTY
+            cube_rows = cube_rows[free]
+            _, first = np.unique(pack_cells(cells[cube_rows]), return_index=True)
+            accept[cube_rows[first]] = True
+
+        edit = InsertEdit(
+            None, positions[accept], eulers[accept], colors[accept], selected[accept], kinds[accept]
+        )
+        ids = self.voxels.add_many(
+            edit.positions, edit.eulers, edit.colors, edit.selected, edit.kinds,
+            ids=None if ids is None else np.asarray(ids, dtype=np.int64)[accept],
+        )
+        grid_rows = cubes[accept]
+        self.grid.set_many(cells[accept][grid_rows], ids[grid_rows])
+        self.revision += 1
+
+        if len(ids):
+            edit.ids = ids
+            self.history.record(edit)
+        return ids
+
+    def set_positions(self, ids, positions) -> np.ndarray:
+        """
+        Перемещает объекты в новые позиции, поддерживая сетку занятости.
+        Куб не перемещается, если целевая клетка занята кубом вне пачки,
+        уже досталась другому кубу из этой же пачки или остаётся за кубом
+        пачки, которому переместиться не удалось.
+        Возвращает маску принятых перемещений.
+        """
+        store = self.voxels
+        slots = store.slots_of(ids)
+        positions = np.asarray(positions, dtype=np.float32).reshape(-1, 3)
+        accept = slots >= 0
+
+        cubes = accept.copy()
+        cubes[accept] = store.kinds[slots[accept]] == KIND_CUBE
+        cube_slots = slots[cubes]
+        cube_ids = store.ids[cube_slots]
+        old_cells = self.grid.cell_of(store.positions[cube_slots])
+        new_cells = self.grid.cell_of(positions[cubes])
+
+        # Сначала решаем, кто перемещается, и только потом пишем в сетку.
+        # Клетки кубов пачки считаются свободными, пока их куб уходит;
+        # отказ одного куба оставляет за ним старую клетку и может вызвать
+        # отказ следующего — повторяем, пока набор принятых не перестанет меняться.
+        # коды сравнимы только внутри одного вызова pack_cells
+        new_codes, old_codes = np.split(pack_cells(np.concatenate([new_cells, old_cells])), 2)
+        stay = new_codes == old_codes
+        held = self.grid.get_many(new_cells)
+        moved = stay | (held == EMPTY) | np.isin(held, cube_ids)
+        while True:
+            blocked = np.isin(new_codes, old_codes[~moved | stay])
+            candidates = np.flatnonzero(moved & ~stay & ~blocked)
+            _, first = np.unique(new_codes[candidates], return_index=True)
+            settled = stay.copy()
+            settled[candidates[first]] = True
+            if np.array_equal(settled, moved):
+                break
+            moved = settled
+
+        self.grid.clear_many(old_cells[moved], cube_ids[moved])
+        self.grid.set_many(new_cells[moved], cube_ids[moved])
+
+        accept[np.flatnonzero(cubes)[~moved]] = False
+        before = store.positions[slots[accept]]
+        store.positions[slots[accept]] = positions[accept]
+        store.invalidate_models(slots[accept])
+        self.revision += 1
+
+        changed = np.any(before != positions[accept], axis=1)
+        if np.any(changed):
+            self.history.record(MoveEdit(
+                np.asarray(ids, dtype=np.int64).reshape(-1)[accept][changed],
+                before[changed], positions[accept][changed],
+            ))
+        return accept
+
+    def set_eulers(self, ids, eulers) -> None:
+        """Назначает объектам ids углы Эйлера (одни на всех или (N, 3))."""
+        store = self.voxels
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        slots = store.slots_of(ids)
+        found = slots >= 0
+        ids, slots = ids[found], slots[found]
+        eulers = np.broadcast_to(np.asarray(eulers, dtype=np.float32), (len(found), 3))[found]
+        if len(slots) == 0:
+            return
+
+        before = store.eulers[slots]
+        store.eulers[slots] = eulers
+        store.invalidate_models(slots)
+        self.grid.mark_dirty(self.grid.cell_of(store.positions[slots]))
+        self.revision += 1
+
+        changed = np.any(before != eulers, axis=1)
+        if np.any(changed):
+            self.history.record(RotateEdit(ids[changed], before[changed], eulers[changed].copy()))
+
+    # ----------------------------------------------------------------------
+    # BULK TRANSFORMS
+    # ----------------------------------------------------------------------
+
+    def translate(self, ids, delta) -> bool:
+        """
+        Сдвигает объекты на delta, округлённый до шага сетки.
+        Возвращает False (и ничего не меняет), если хоть один куб попал бы
+        в клетку, занятую кубом вне пачки.
+        """
+        shift = np.round(np.asarray(delta, dtype=np.float64) / self.grid.cell_size) * self.grid.cell_size
+        return self._transform(ids, np.eye(3), shift)
+
+    def rotate90(self, ids, axis: int, turns: int = 1, pivot=None) -> bool:
+        """
+        Поворачивает объекты на turns × 90° вокруг оси axis (0, 1, 2 — X, Y, Z),
+        проходящей через pivot (по умолчанию — центр клетки в середине
+        габаритов пачки). Ориентация кубов не меняется: поворот на 90°
+        переводит куб сам в себя. Возвращает False при столкновении.
+        """
+        a, b = [other for other in range(3) if other != axis]
+        rotation = np.eye(3)
+        for _ in range(turns % 4):
+            quarter = np.eye(3)
+            quarter[[a, b, a, b], [a, b, b, a]] = 0, 0, -1, 1
+            rotation = quarter @ rotation
+        pivot = self._pivot(ids) if pivot is None else np.asarray(pivot, dtype=np.float64)
+        return self._transform(ids, rotation, pivot - rotation @ pivot)
+
+    def mirror(self, ids, axis: int, pivot=None) -> bool:
+        """Зеркально отражает объекты по оси axis относительно плоскости через pivot."""
+        reflection = np.eye(3)
+        reflection[axis, axis] = -1
+        pivot = self._pivot(ids) if pivot is None else np.asarray(pivot, dtype=np.float64)
+        return self._transform(ids, reflection, pivot - reflection @ pivot)
+
+    def _pivot(self, ids) -> np.ndarray:
+        """Центр клетки, ближайшей к середине габаритов объектов ids."""
+        slots = self.voxels.slots_of(ids)
+        positions = self.voxels.positions[slots[slots >= 0]]
+        if len(positions) == 0:
+            return np.zeros(3)
+        middle = (positions.min(axis=0) + positions.max(axis=0)) / 2
+        return self.grid.cell_of(middle) * self.grid.cell_size
+
+    def _transform(self, ids, matrix, offset) -> bool:
+        """
+        Применяет ко всем объектам ids сразу p' = matrix @ p + offset:
+        одна операция над колонкой позиций и один перенос в сетке
+        (move_many) с проверкой занятости. Перемещение либо принимается
+        целиком, либо отклоняется при столкновении с кубом вне пачки.
+        """
+        store = self.voxels
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        slots = store.slots_of(ids)
+        ids, slots = ids[slots >= 0], slots[slots >= 0]
+        if len(slots) == 0:
+            return True
+
+        before = store.positions[slots]
+        if np.array_equal(matrix, np.eye(3)):
+            after = before + np.asarray(offset, dtype=np.float32)
+        else:
+            after = (before.astype(np.float64) @ np.asarray(matrix, dtype=np.float64).T + offset).astype(np.float32)
+        if np.array_equal(before, after):
             return True
+
+        cubes = store.kinds[slots] == KIND_CUBE
+        old_cells = self.grid.cell_of(before[cubes])
+        new_cells = self.grid.cell_of(after[cubes])
+
+        # кубы в центрах клеток переходят в разные клетки; со смещёнными
+        # от центра кубами две копии могут попасть в одну клетку
+        centred = np.array_equal(new_cells * self.grid.cell_size, after[cubes])
+        if not centred and len(np.unique(pack_cells(new_cells))) < len(new_cells):
+            return False
+
+        # в новой клетке может лежать только куб из этой же пачки
+        if not self.grid.move_many(old_cells, new_cells, ids[cubes]):
+            return False
+        store.positions[slots] = after
+        store.invalidate_models(slots)
+        self.revision += 1
+        self.history.record(MoveEdit(ids, before, after))
+        return True
+
+    def voxel_at(self, position) -> VoxelView | None:
+        """Куб в клетке сетки, содержащей мировую позицию, или None."""
+        voxel_id = self.grid.get(self.grid.cell_of(position))
+        if voxel_id == EMPTY:
+            return None
+        return self.voxels.view(voxel_id)
+
+    def remove_entity_by_index(self, index: int) -> bool:
+        """Удаляет объект по индексу."""
+        if 0 <= index < len(self.voxels):
+            return self.remove_ids([self.voxels.ids[index]]) == 1
         return False
 
     def remove_entity(self, entity) -> bool:
         """Удаляет объект сцены по ссылке."""
-        if entity not in self.entities:
+        if entity not in self.voxels:
             return False
-        self._destroy_entity(entity)
-        self.entities.remove(entity)
-        return True
+        return self.remove_ids([entity.id]) == 1
 
-    def _destroy_entity(self, entity):
-        """Освобождает ресурсы объекта и его материала."""
-        try:
-            if hasattr(entity, "destroy"):
-                entity.destroy()
-        except Exception:
-            pass
+    def remove_where(self, mask_or_ids) -> int:
+        """
+        Удаляет пачку объектов одной операцией: булева маска по строкам
+        хранилища (длины len(voxels), например voxels.positions[:, 2] < 0)
+        или массив id. Возвращает число удалённых.
+        """
+        selector = np.asarray(mask_or_ids)
+        if selector.dtype == bool:
+            if selector.shape != (len(self.voxels),):
+                raise ValueError(f"mask must have shape ({len(self.voxels)},), got {selector.shape}")
+            return self.remove_ids(self.voxels.ids[selector])
+        return self.remove_ids(selector)
 
-        try:
-            if hasattr(entity, "material") and entity.material:
-                entity.material.destroy()
-        except Exception:
-            pass
+    def remove_selected(self) -> int:
+        """Удаляет все выделенные объекты. Возвращает их число."""
+        return self.remove_ids(self.selected_ids())
+
+    def remove_ids(self, ids) -> int:
+        """Удаляет объекты по id вместе с их клетками сетки. Возвращает их число."""
+        store = self.voxels
+        slots = store.slots_of(ids)
+        slots = np.unique(slots[slots >= 0])
+        if len(slots) == 0:
+            return 0
+        self.history.record(RemoveEdit.capture(store, slots))
+
+        cubes = slots[store.kinds[slots] == KIND_CUBE]
+        self.grid.clear_many(self.grid.cell_of(store.positions[cubes]), store.ids[cubes])
+        self.revision += 1
+        return store.remove_many(ids)
+
+    # ----------------------------------------------------------------------
+    # SELECTION / MATERIALS
+    # ----------------------------------------------------------------------
+
+    def selected_ids(self) -> np.ndarray:
+        """id всех выделенных объектов (из индекса выделения, без обхода сцены)."""
+        return self.voxels.selected_ids()
 
     def get_all_selected(self) -> list:
         """Возвращает список всех выделенных объектов."""
-        return [e for e in self.entities if getattr(e, "is_selected", 0)]
+        return [self.voxels.view(voxel_id) for voxel_id in self.selected_ids().tolist()]
+
+    def set_selected(self, ids, selected: bool = True) -> int:
+        """Выделяет (или снимает выделение) объекты с данными id. Возвращает число изменённых."""
+        return self.voxels.set_selected(ids, selected)
+
+    def select_all(self, selected: bool = True):
+        """Выделяет все объекты сцены или снимает со всех выделение."""
+        self.voxels.select_all(selected)
+
+    def _select(self, ids, add: bool) -> int:
+        """Выделяет ids; без add прежнее выделение снимается. Возвращает len(ids)."""
+        if not add:
+            self.voxels.select_all(False)
+        self.voxels.set_selected(ids)
+        return len(ids)
+
+    def select_box(self, lo, hi, add: bool = False) -> int:
+        """
+        Выделяет кубы, чьи центры лежат в параллелепипеде [lo, hi] мировых
+        координат. Кандидатов даёт сетка (SparseVoxelGrid.query_box), поэтому
+        время зависит от числа задетых чанков, а не от размера сцены.
+        Возвращает число выделенных запросом кубов.
+        """
+        lo, hi = np.asarray(lo, dtype=np.float32), np.asarray(hi, dtype=np.float32)
+        lo, hi = np.minimum(lo, hi), np.maximum(lo, hi)
+        _, ids = self.grid.query_box(self.grid.cell_of(lo), self.grid.cell_of(hi))
+
+        positions = self.voxels.positions[self.voxels.slots_of(ids)]
+        inside = np.all((positions >= lo) & (positions <= hi), axis=1)
+        return self._select(ids[inside], add)
+
+    def select_sphere(self, center, radius: float, add: bool = False) -> int:
+        """Выделяет кубы, чьи центры не дальше radius от center. Возвращает их число."""
+        center = np.asarray(center, dtype=np.float32)
+        _, ids = self.grid.query_box(self.grid.cell_of(center - radius), self.grid.cell_of(center + radius))
+
+        positions = self.voxels.positions[self.voxels.slots_of(ids)]
+        inside = np.sum((positions - center) ** 2, axis=1) <= radius * radius
+        return self._select(ids[inside], add)
+
+    def select_color(self, color, add: bool = False) -> int:
+        """Выделяет все объекты цвета color (RGBA, точное совпадение). Возвращает их число."""
+        return self._select(self.voxels.ids_with_color(color), add)
+
+    def invert_selection(self) -> int:
+        """Инвертирует выделение. Возвращает число выделенных объектов."""
+        self.voxels.invert_selection()
+        return self.voxels.selected_count
+
+    def _selected_cubes(self) -> tuple[np.ndarray, np.ndarray]:
+        """id выделенных кубов и их клетки сетки."""
+        store = self.voxels
+        ids = store.selected_ids()
+        slots = store.slots_of(ids)
+        cubes = store.kinds[slots] == KIND_CUBE
+        return ids[cubes], self.grid.cell_of(store.positions[slots[cubes]])
+
+    def grow_selection(self) -> int:
+        """
+        Расширяет выделение на один слой: добавляет кубы, соседние по грани
+        с выделенными. Стоит O(числа выделенных). Возвращает число добавленных.
+        """
+        _, cells = self._selected_cubes()
+        neighbours = self.grid.get_many((cells[:, None, :] + FACE_NEIGHBOURS).reshape(-1, 3))
+        return self.voxels.set_selected(neighbours[neighbours != EMPTY])
+
+    def shrink_selection(self) -> int:
+        """
+        Сжимает выделение на один слой: снимает его с кубов, у которых хотя бы
+        один сосед по грани — пустая клетка или невыделенный куб.
+        Возвращает число снятых.
+        """
+        store = self.voxels
+        ids, cells = self._selected_cubes()
+        neighbours = self.grid.get_many((cells[:, None, :] + FACE_NEIGHBOURS).reshape(-1, 3))
+
+        inside = neighbours != EMPTY
+        inside[inside] = store.selected[store.slots_of(neighbours[inside])]
+        border = ~np.all(inside.reshape(-1, len(FACE_NEIGHBOURS)), axis=1)
+        return store.set_selected(ids[border], False)
+
+    def recolor(self, ids, color):
+        """
+        Назначает цвет RGBA (один на всех или (N, 4) — по строке на id) объектам с данными id.
+
+        Если все объекты одной записи палитры получают один и тот же новый
+        цвет, перекрашивается сама запись: номера в хранилище и меши чанков
+        остаются прежними, рендерер только перезагружает палитру. Иначе
+        объекты переводятся на записи новых цветов, и их чанки перестраиваются.
+        """
+        store = self.voxels
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        slots = store.slots_of(ids)
+        found = slots >= 0
+        slots = slots[found]
+        colors = np.broadcast_to(np.asarray(color, dtype=np.float32), (len(ids), 4))[found]
+
+        before = store.colors_of(slots)
+        if self._remap_palette(slots, colors):
+            store.notify_changed(slots)
+        else:
+            store.set_colors(ids[found], colors)
+            self.grid.mark_dirty(self.grid.cell_of(store.positions[slots]))
+        self.revision += 1
+
+        if len(slots):
+            self.history.record(RecolorEdit(ids[found], before, colors.copy()))
+
+    def _remap_palette(self, slots: np.ndarray, colors: np.ndarray) -> bool:
+        """Перекрашивает запись палитры, если slots — ровно все её объекты и цвет у них один."""
+        store = self.voxels
+        if len(slots) == 0 or np.any(colors != colors[0]):
+            return False
+
+        entries = np.unique(store.materials[slots])
+        if len(entries) != 1 or store.palette.counts[entries[0]] != len(np.unique(slots)):
+            return False
+        return store.palette.set_color(int(entries[0]), colors[0])
+
+    def recolor_selected(self, color) -> int:
+        """Назначает цвет RGBA всем выделенным объектам. Возвращает их число."""
+        ids = self.selected_ids()
+        self.recolor(ids, color)
+        return len(ids)
 
     # ----------------------------------------------------------------------
     # SCENE SAVE / LOAD
     # ----------------------------------------------------------------------
 
     def export_scene(self, filepath: str = "scenes/scene.txt") -> bool:
-        """Сохраняет текущую сцену в текстовый файл."""
+        """
+        Сохраняет текущую сцену в файл. Формат выбирается по расширению:
+        .voxb — двоичный, .voxc — сжатый чанковый (см. scene_formats),
+        иначе текстовый v1. Файл заменяется атомарно: при сбое во время
+        записи прежняя версия остаётся целой.
+        """
+        store = self.voxels
         try:
             os.makedirs(os.path.dirname(filepath), exist_ok=True)
-            with open(filepath, "w") as f:
-                f.write("# Scene file v1\n")
-                for ent in self.entities:
-                    etype = "CUBE" if isinstance(ent, CubeMesh) else "ENTITY"
-                    pos = ent.position
-                    eul = ent.eulers
-                    c = getattr(ent.material, "color", np.array([1.0, 1.0, 1.0, 1.0]))
-                    line = f"{etype} {pos[0]} {pos[1]} {pos[2]}  {eul[0]} {eul[1]} {eul[2]}  {c[0]} {c[1]} {c[2]} {c[3]}\n"
-                    f.write(line)
+            stats, _ = write_scene_atomic(
+                filepath, store.positions, store.eulers, store.colors, store.kinds,
+                cell_size=self.grid.cell_size,
+            )
             print(f"[Scene] Exported to {filepath}")
+            if stats is not None:
+                print(
+                    f"[Scene] {stats['voxels']} objects, {stats['bytes']} bytes, "
+                    f"compression x{stats['ratio']:.1f}, "
+                    f"{stats['raw_bytes'] / stats['seconds'] / 1e6:.0f} MB/s"
+                )
             return True
         except Exception as e:
             print("[Scene] Export failed:", e)
             return False
 
     def import_scene(self, filepath: str = "scenes/scene.txt") -> bool:
-        """Загружает сцену из текстового файла, очищая текущие объекты."""
+        """
+        Загружает сцену из файла (текстового, .voxb или .voxc), очищая текущие объекты.
+        Сцена меняется, только если файл прочитан целиком.
+        """
         if not os.path.exists(filepath):
             print("[Scene] Import failed: file not found", filepath)
             return False
 
         try:
-            self.entities.clear()
-            with open(filepath, "r") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line or line.startswith("#"):
-                        continue
-
-                    parts = line.split()
-                    etype = parts[0]
-                    px, py, pz = map(float, parts[1:4])
-                    ex, ey, ez = map(float, parts[4:7])
-                    r, g, b, a = map(float, parts[7:11])
-
-                    if etype == "CUBE":
-                        cube = self.add_cube(
-                            position=[px, py, pz],
-                            eulers=[ex, ey, ez],
-                            color=np.array([r, g, b, a], dtype=np.float32)
-                        )
-                        cube.is_selected = False
-                    elif etype == "ENTITY":
-                        ent = Entity(position=[px, py, pz], eulers=[ex, ey, ez])
-                        ent.material = Material(r, g, b, a)
-                        self.entities.append(ent)
+            positions, eulers, colors, kinds = read_scene(filepath)
+
+            self.voxels.clear()
+            self.grid.clear_all()
+            ids = self._insert(positions, eulers, colors, kinds)
+
+            # старый журнал ссылается на объекты прежней сцены
+            self.history.clear()
 
+            skipped = len(kinds) - len(ids)
+            if skipped:
+                print(f"[Scene] Skipped {skipped} cubes in already occupied cells")
             print(f"[Scene] Imported from {filepath}")
             return True
         except Exception as e:
@@ -0,0 +1,590 @@
+import io
+import lzma
+import math
+import os
+import tempfile
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
+
+import numpy as np
+
+from .voxel_grid import CHUNK_SIZE, pack_cells
+from .voxel_store import KIND_CUBE, KIND_ENTITY
+
+
+class SceneFormatError(ValueError):
+    """Файл сцены повреждён или не соответствует формату."""
+
+
+# ======================================================================
+# Text format v1
+# ======================================================================
+
+TEXT_HEADER = "# Scene file v1\n"
+
+# Поля строки: тип и 10 чисел; строк в блоке разбора за раз
+TEXT_FIELDS = 11
+TEXT_BLOCK_LINES = 1 << 16
+
+# Строка v1 для numpy.loadtxt; тип длиннее «ENTITY» не обрежется до допустимого
+_TEXT_ROW = np.dtype([("type", "U8"), ("values", "f8", (10,))])
+
+# Строка текстового формата v1: тип, позиция, повороты, цвет RGBA.
+# 9 значащих цифр достаточно, чтобы float32 читался обратно без потерь.
+SCENE_LINE_FORMAT = "%s %.9g %.9g %.9g  %.9g %.9g %.9g  %.9g %.9g %.9g %.9g\n"
+
+
+def write_text(filepath: str, positions, eulers, colors, kinds) -> None:
+    """Пишет сцену в текстовый формат v1: строка на объект."""
+    etypes = np.where(np.asarray(kinds) == KIND_CUBE, "CUBE", "ENTITY").tolist()
+    table = np.hstack([positions, eulers, colors]).tolist()
+    with open(filepath, "w") as f:
+        f.write(TEXT_HEADER)
+        f.writelines(SCENE_LINE_FORMAT % (etype, *row) for etype, row in zip(etypes, table))
+
+
+def read_text(filepath: str):
+    """
+    Читает текстовый формат v1. Возвращает (positions, eulers, colors, kinds).
+
+    Файл разбирается блоками по TEXT_BLOCK_LINES строк, каждый блок —
+    одним вызовом numpy.loadtxt (разбор на C). Как и прежде, поля после
+    первых TEXT_FIELDS и комментарий «# ...» в конце строки пропускаются.
+    Построчный разбор запускается только для блока с ошибкой — чтобы
+    назвать строку. Любая ошибка — SceneFormatError «файл:строка: причина»,
+    до неё ничего не возвращается, поэтому сцена не остаётся загруженной
+    наполовину.
+    """
+    blocks = []
+    line_offset = 0
+    with open(filepath, "r") as f:
+        while True:
+            lines = list(islice(f, TEXT_BLOCK_LINES))
+            if not lines:
+                break
+            blocks.append(_parse_text_block(filepath, lines, line_offset))
+            line_offset += len(lines)
+
+    table = np.concatenate([table for table, _ in blocks]) if blocks else np.zeros((0, 10), np.float32)
+    kinds = np.concatenate([kinds for _, kinds in blocks]) if blocks else np.zeros(0, np.uint8)
+    return table[:, 0:3], table[:, 3:6], table[:, 6:10], kinds
+
+
+def _parse_text_block(filepath: str, lines: list[str], line_offset: int):
+    """Разбирает блок строк v1 в (table (N, 10) float32, kinds (N,) uint8)."""
+    numbers = [index for index, line in enumerate(lines) if line.strip() and not line.lstrip().startswith("#")]
+    if not numbers:
+        return np.zeros((0, 10), dtype=np.float32), np.zeros(0, dtype=np.uint8)
+
+    try:
+        rows = np.loadtxt(
+            [lines[index] for index in numbers], dtype=_TEXT_ROW, comments="#",
+            usecols=range(TEXT_FIELDS), ndmin=1,
+        )
+    except ValueError:
+        _raise_first_error(filepath, lines, numbers, line_offset)
+
+    cubes = rows["type"] == "CUBE"
+    table = rows["values"]
+    if not np.all(cubes | (rows["type"] == "ENTITY")) or not np.all(np.isfinite(table)):
+        _raise_first_error(filepath, lines, numbers, line_offset)
+
+    kinds = np.where(cubes, KIND_CUBE, KIND_ENTITY).astype(np.uint8)
+    return table.astype(np.float32), kinds
+
+
+def _raise_first_error(filepath: str, lines: list[str], numbers: list[int], line_offset: int):
+    """Медленный путь: проверяет строки блока по одной и сообщает о первой плохой."""
+    for index in numbers:
+        parts = lines[index].split("#", 1)[0].split()
+        location = f"{filepath}:{line_offset + index + 1}"
+
+        if parts[0] not in ("CUBE", "ENTITY"):
+            raise SceneFormatError(f"{location}: unknown object type {parts[0]!r}")
+        if len(parts) < TEXT_FIELDS:
+            raise SceneFormatError(f"{location}: expected {TEXT_FIELDS} fields, got {len(parts)}")
+        for value in parts[1:TEXT_FIELDS]:
+            try:
+                number = float(value)
+            except ValueError:
+                raise SceneFormatError(f"{location}: not a number: {value!r}") from None
+            if not math.isfinite(number):
+                raise SceneFormatError(f"{location}: not a finite number: {value!r}")
+
+    raise SceneFormatError(f"{filepath}: malformed block at line {line_offset + 1}")
+
+
+# ======================================================================
+# Binary format
+# ======================================================================
+
+BINARY_EXTENSION = ".voxb"
+BINARY_MAGIC = b"VOXB"
+BINARY_VERSION = 1
+
+# Заголовок 32 байта, дальше подряд little-endian колонки по count строк:
+#   positions (N, 3) <f4, eulers (N, 3) <f4, colors (N, 4) <f4, kinds (N,) u1
+BINARY_HEADER = np.dtype([
+    ("magic", "S4"),
+    ("version", "<u2"),
+    ("header_size", "<u2"),
+    ("count", "<u8"),
+    ("reserved", "<u8", (2,)),
+])
+
+_BINARY_COLUMNS = (
+    ("positions", np.dtype("<f4"), 3),
+    ("eulers", np.dtype("<f4"), 3),
+    ("colors", np.dtype("<f4"), 4),
+    ("kinds", np.dtype("u1"), 1),
+)
+
+
+def write_binary(filepath: str, positions, eulers, colors, kinds) -> None:
+    """Пишет сцену в двоичный формат: заголовок и колонки как есть."""
+    count = len(kinds)
+    header = np.zeros((), dtype=BINARY_HEADER)
+    header["magic"] = BINARY_MAGIC
+    header["version"] = BINARY_VERSION
+    header["header_size"] = BINARY_HEADER.itemsize
+    header["count"] = count
+
+    with open(filepath, "wb") as f:
+        f.write(header.tobytes())
+        _write_columns(f, (positions, eulers, colors, kinds), count)
+
+
+def _write_columns(f, columns, count: int) -> None:
+    """Пишет колонки (positions, eulers, colors, kinds) подряд в порядке _BINARY_COLUMNS."""
+    for column, (_, dtype, width) in zip(columns, _BINARY_COLUMNS):
+        f.write(np.ascontiguousarray(column, dtype=dtype).reshape(count, width).tobytes())
+
+
+def _read_columns(data: bytes, offset: int, count: int):
+    """Читает колонки, записанные _write_columns, из буфера начиная с offset."""
+    columns = []
+    for _, dtype, width in _BINARY_COLUMNS:
+        shape = (count, width) if width > 1 else (count,)
+        columns.append(np.frombuffer(data, dtype=dtype, count=count * width, offset=offset).reshape(shape))
+        offset += count * width * dtype.itemsize
+    return columns
+
+
+class BinaryScene:
+    """
+    Двоичный файл сцены, открытый через numpy.memmap.
+    Колонки positions, eulers, colors, kinds — отображения файла только
+    для чтения: данные читаются с диска лишь при обращении к строкам,
+    поэтому открытие мгновенное, а срез читает только нужную часть.
+    """
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        size = os.path.getsize(filepath)
+        if size < BINARY_HEADER.itemsize:
+            raise SceneFormatError(f"{filepath}: file too short for a scene header")
+
+        header = np.fromfile(filepath, dtype=BINARY_HEADER, count=1)[0]
+        if header["magic"] != BINARY_MAGIC:
+            raise SceneFormatError(f"{filepath}: not a binary scene file")
+        if header["version"] != BINARY_VERSION:
+            raise SceneFormatError(f"{filepath}: unsupported binary scene version {header['version']}")
+
+        self.version = int(header["version"])
+        self.count = count = int(header["count"])
+
+        offset = int(header["header_size"])
+        expected = offset + sum(count * width * dtype.itemsize for _, dtype, width in _BINARY_COLUMNS)
+        if size < expected:
+            raise SceneFormatError(f"{filepath}: truncated, {size} of {expected} bytes")
+
+        for name, dtype, width in _BINARY_COLUMNS:
+            shape = (count, width) if width > 1 else (count,)
+            if count:
+                column = np.memmap(filepath, dtype=dtype, mode="r", offset=offset, shape=shape)
+            else:
+                column = np.zeros(shape, dtype=dtype)
+            setattr(self, name, column)
+            offset += count * width * dtype.itemsize
+
+    def __len__(self) -> int:
+        return self.count
+
+
+def read_binary(filepath: str):
+    """Открывает двоичный файл. Возвращает (positions, eulers, colors, kinds) — memmap-колонки."""
+    scene = BinaryScene(filepath)
+    return scene.positions, scene.eulers, scene.colors, scene.kinds
+
+
+# ======================================================================
+# Chunked palette + RLE format
+# ======================================================================
+
+CHUNKED_EXTENSION = ".voxc"
+CHUNKED_MAGIC = b"VOXC"
+CHUNKED_VERSION = 1
+
+_CODECS = {
+    "zlib": (0, zlib.compress, zlib.decompress),
+    "lzma": (1, lzma.compress, lzma.decompress),
+}
+_CODEC_NAMES = {code: name for name, (code, _, _) in _CODECS.items()}
+
+# Заголовок 40 байт (crc32 — контрольная сумма всего, что после него). Дальше: палитра (K, 4) <f4, каталог чанков,
+# сжатые чанки подряд в порядке каталога и в конце «прочие» объекты
+# (повёрнутые, не в центре клетки, ENTITY) колонками как в .voxb.
+CHUNKED_HEADER = np.dtype([
+    ("magic", "S4"),
+    ("version", "<u2"),
+    ("codec", "u1"),
+    ("chunk_size", "u1"),
+    ("cell_size", "<f8"),
+    ("palette_count", "<u4"),
+    ("chunk_count", "<u4"),
+    ("extra_count", "<u8"),
+    ("crc32", "<u4"),
+    ("reserved", "<u4"),
+])
+
+# Запись каталога: координата чанка, число серий RLE, размер сжатых данных
+CHUNKED_DIRECTORY = np.dtype([
+    ("key", "<i4", (3,)),
+    ("runs", "<u4"),
+    ("size", "<u4"),
+])
+
+# Столько байт на объект занимают несжатые колонки (как в .voxb)
+RAW_BYTES_PER_VOXEL = sum(dtype.itemsize * width for _, dtype, width in _BINARY_COLUMNS)
+
+
+@lru_cache(maxsize=None)
+def _morton_order(size: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Порядок обхода клеток чанка size³ по кривой Мортона (Z-order).
+    Возвращает (order, rank): order[r] — плоский индекс клетки с номером r
+    на кривой, rank — обратная перестановка. Соседние по кривой клетки
+    близки в пространстве, поэтому одноцветные области дают длинные серии.
+    """
+    x, y, z = np.unravel_index(np.arange(size ** 3), (size,) * 3)
+    code = np.zeros(size ** 3, dtype=np.int64)
+    for bit in range(max(int(size - 1).bit_length(), 1)):
+        code |= (((x >> bit) & 1) << (3 * bit + 2)) | (((y >> bit) & 1) << (3 * bit + 1)) | (((z >> bit) & 1) << (3 * bit))
+
+    order = np.argsort(code, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return order, rank
+
+
+def _intern_colors(colors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Палитра уникальных цветов (сравнение побитовое — без потерь).
+    Возвращает (palette (K, 4) float32, index (N,) — номер цвета в палитре).
+    """
+    if len(colors) == 0:
+        return np.zeros((0, 4), dtype=np.float32), np.zeros(0, dtype=np.int64)
+
+    bits = np.ascontiguousarray(colors, dtype=np.float32).view(np.uint64)   # (N, 2)
+    order = np.lexsort((bits[:, 1], bits[:, 0]))
+    sorted_bits = bits[order]
+    new = np.ones(len(order), dtype=bool)
+    new[1:] = np.any(sorted_bits[1:] != sorted_bits[:-1], axis=1)
+
+    index = np.empty(len(order), dtype=np.int64)
+    index[order] = np.cumsum(new) - 1
+    return np.asarray(colors, dtype=np.float32)[order[new]], index
+
+
+def _encode_chunk(ranks: np.ndarray, labels: np.ndarray, volume: int, compress) -> tuple[int, bytes]:
+    """Чанк → серии (значение, длина) вдоль кривой Мортона → сжатые байты."""
+    dense = np.zeros(volume, dtype="<u4")
+    dense[ranks] = labels
+
+    starts = np.flatnonzero(np.concatenate(([True], dense[1:] != dense[:-1])))
+    lengths = np.diff(np.append(starts, volume)).astype("<u4")
+    return len(starts), compress(dense[starts].tobytes() + lengths.tobytes())
+
+
+def _decode_chunk(payload: bytes, runs: int, decompress) -> tuple[np.ndarray, np.ndarray]:
+    """Сжатые байты чанка → (номера занятых клеток на кривой, метки палитры + 1)."""
+    data = decompress(payload)
+    values = np.frombuffer(data, dtype="<u4", count=runs)
+    lengths = np.frombuffer(data, dtype="<u4", count=runs, offset=runs * 4)
+
+    dense = np.repeat(values, lengths)
+    ranks = np.flatnonzero(dense)
+    return ranks, dense[ranks]
+
+
+def write_chunked(filepath: str, positions, eulers, colors, kinds, cell_size: float = 1.0,
+                  chunk_size: int = CHUNK_SIZE, codec: str = "zlib", workers: int | None = None) -> dict:
+    """
+    Пишет сцену в чанковый формат: общая палитра цветов, для каждого чанка
+    номера цветов клеток, свёрнутые в серии (RLE) вдоль кривой Мортона
+    и сжатые codec ("zlib" или "lzma") в пуле потоков — zlib и lzma
+    отпускают GIL, так что чанки сжимаются параллельно.
+
+    Без потерь: кубы без поворота ровно в центре своей клетки хранятся
+    номером цвета, остальные объекты — отдельными колонками в конце файла.
+    Порядок объектов при чтении может отличаться от исходного.
+
+    Возвращает статистику: voxels, chunks, palette, extras, raw_bytes,
+    bytes, ratio (raw_bytes / bytes) и seconds.
+    """
+    start = time.perf_counter()
+    code, compress, _ = _CODECS[codec]
+
+    positions = np.ascontiguousarray(positions, dtype=np.float32).reshape(-1, 3)
+    eulers = np.ascontiguousarray(eulers, dtype=np.float32).reshape(-1, 3)
+    colors = np.ascontiguousarray(colors, dtype=np.float32).reshape(-1, 4)
+    kinds = np.ascontiguousarray(kinds, dtype=np.uint8).reshape(-1)
+    count = len(kinds)
+
+    # «обычные» кубы: без поворота и ровно в центре клетки (сравнение по битам)
+    cells = np.floor(positions.astype(np.float64) / cell_size + 0.5).astype(np.int64)
+    centers = (cells * cell_size).astype(np.float32)
+    regular = (
+        (kinds == KIND_CUBE)
+        & np.all(eulers.view(np.uint32) == 0, axis=1)
+        & np.all(positions.view(np.uint32) == centers.view(np.uint32), axis=1)
+    )
+
+    rows = np.flatnonzero(regular)
+    keys = cells[rows] // chunk_size
+    local = cells[rows] - keys * chunk_size
+    _, rank_of = _morton_order(chunk_size)
+    ranks = rank_of[np.ravel_multi_index(local.T, (chunk_size,) * 3)]
+
+    # сортировка по (чанк, место на кривой); повтор клетки уходит в «прочие»
+    codes = pack_cells(keys)
+    order = np.lexsort((ranks, codes))
+    rows, keys, ranks, codes = rows[order], keys[order], ranks[order], codes[order]
+    repeated = np.zeros(len(rows), dtype=bool)
+    repeated[1:] = (codes[1:] == codes[:-1]) & (ranks[1:] == ranks[:-1])
+    regular[rows[repeated]] = False
+    keep = ~repeated
+    rows, keys, ranks, codes = rows[keep], keys[keep], ranks[keep], codes[keep]
+
+    palette, color_index = _intern_colors(colors[rows])
+    labels = (color_index + 1).astype("<u4")
+
+    starts = np.flatnonzero(np.concatenate(([True], codes[1:] != codes[:-1]))) if len(rows) else np.zeros(0, dtype=np.int64)
+    bounds = np.append(starts, len(rows)).tolist()
+    volume = chunk_size ** 3
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        encoded = list(pool.map(
+            lambda i: _encode_chunk(ranks[bounds[i]:bounds[i + 1]], labels[bounds[i]:bounds[i + 1]], volume, compress),
+            range(len(starts)),
+        ))
+
+    directory = np.zeros(len(starts), dtype=CHUNKED_DIRECTORY)
+    directory["key"] = keys[starts]
+    directory["runs"] = [runs for runs, _ in encoded]
+    directory["size"] = [len(payload) for _, payload in encoded]
+
+    extras = np.flatnonzero(~regular)
+    header = np.zeros((), dtype=CHUNKED_HEADER)
+    header["magic"] = CHUNKED_MAGIC
+    header["version"] = CHUNKED_VERSION
+    header["codec"] = code
+    header["chunk_size"] = chunk_size
+    header["cell_size"] = cell_size
+    header["palette_count"] = len(palette)
+    header["chunk_count"] = len(directory)
+    header["extra_count"] = len(extras)
+
+    body = io.BytesIO()
+    body.write(palette.astype("<f4").tobytes())
+    body.write(directory.tobytes())
+    body.writelines(payload for _, payload in encoded)
+    _write_columns(body, (positions[extras], eulers[extras], colors[extras], kinds[extras]), len(extras))
+    body = body.getbuffer()
+    header["crc32"] = zlib.crc32(body)
+
+    with open(filepath, "wb") as f:
+        f.write(header.tobytes())
+        f.write(body)
+
+    size = os.path.getsize(filepath)
+    return {
+        "voxels": count,
+        "chunks": len(directory),
+        "palette": len(palette),
+        "extras": len(extras),
+        "raw_bytes": count * RAW_BYTES_PER_VOXEL,
+        "bytes": size,
+        "ratio": count * RAW_BYTES_PER_VOXEL / size,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def read_chunked(filepath: str, workers: int | None = None):
+    """Читает чанковый формат. Возвращает (positions, eulers, colors, kinds)."""
+    with open(filepath, "rb") as f:
+        data = f.read()
+
+    if len(data) < CHUNKED_HEADER.itemsize:
+        raise SceneFormatError(f"{filepath}: file too short for a scene header")
+    header = np.frombuffer(data, dtype=CHUNKED_HEADER, count=1)[0]
+    if header["magic"] != CHUNKED_MAGIC:
+        raise SceneFormatError(f"{filepath}: not a chunked scene file")
+    if header["version"] != CHUNKED_VERSION:
+        raise SceneFormatError(f"{filepath}: unsupported chunked scene version {header['version']}")
+    if zlib.crc32(memoryview(data)[CHUNKED_HEADER.itemsize:]) != header["crc32"]:
+        raise SceneFormatError(f"{filepath}: checksum mismatch, file is corrupt")
+    if int(header["codec"]) not in _CODEC_NAMES:
+        raise SceneFormatError(f"{filepath}: unknown codec {header['codec']}")
+
+    _, _, decompress = _CODECS[_CODEC_NAMES[int(header["codec"])]]
+    chunk_size = int(header["chunk_size"])
+    cell_size = float(header["cell_size"])
+    palette_count, chunk_count, extra_count = (
+        int(header["palette_count"]), int(header["chunk_count"]), int(header["extra_count"])
+    )
+
+    offset = CHUNKED_HEADER.itemsize
+    directory_offset = offset + palette_count * 16
+    payload_offset = directory_offset + chunk_count * CHUNKED_DIRECTORY.itemsize
+    if len(data) < payload_offset:
+        raise SceneFormatError(f"{filepath}: truncated chunk directory")
+
+    palette = np.frombuffer(data, dtype="<f4", count=palette_count * 4, offset=offset).reshape(-1, 4)
+    directory = np.frombuffer(data, dtype=CHUNKED_DIRECTORY, count=chunk_count, offset=directory_offset)
+
+    ends = payload_offset + np.cumsum(directory["size"], dtype=np.int64)
+    begins = ends - directory["size"]
+    extras_offset = int(ends[-1]) if chunk_count else payload_offset
+    if len(data) < extras_offset + extra_count * RAW_BYTES_PER_VOXEL:
+        raise SceneFormatError(f"{filepath}: truncated, {len(data)} bytes")
+
+    def decode(i):
+        try:
+            return _decode_chunk(data[begins[i]:ends[i]], int(directory["runs"][i]), decompress)
+        except (zlib.error, lzma.LZMAError, ValueError) as e:
+            raise SceneFormatError(f"{filepath}: chunk {tuple(directory['key'][i])} is corrupt: {e}") from None
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        decoded = list(pool.map(decode, range(chunk_count)))
+
+    counts = [len(ranks) for ranks, _ in decoded]
+    ranks = np.concatenate([r for r, _ in decoded]) if decoded else np.zeros(0, dtype=np.int64)
+    labels = np.concatenate([l for _, l in decoded]) if decoded else np.zeros(0, dtype=np.uint32)
+    if len(labels) and (labels.max() > palette_count or ranks.max() >= chunk_size ** 3):
+        raise SceneFormatError(f"{filepath}: chunk data out of range")
+
+    order, _ = _morton_order(chunk_size)
+    local = np.stack(np.unravel_index(order[ranks], (chunk_size,) * 3), axis=1)
+    keys = np.repeat(directory["key"].astype(np.int64), counts, axis=0)
+    cells = keys * chunk_size + local
+
+    extra_positions, extra_eulers, extra_colors, extra_kinds = _read_columns(data, extras_offset, extra_count)
+    count = len(cells)
+
+    positions = np.concatenate([(cells * cell_size).astype(np.float32), extra_positions])
+    eulers = np.concatenate([np.zeros((count, 3), dtype=np.float32), extra_eulers])
+    colors = np.concatenate([palette[labels.astype(np.int64) - 1], extra_colors]).astype(np.float32)
+    kinds = np.concatenate([np.full(count, KIND_CUBE, dtype=np.uint8), extra_kinds])
+    return positions, eulers, colors, kinds
+
+
+# ======================================================================
+# Dispatch by extension
+# ======================================================================
+
+def _extension(filepath: str) -> str:
+    """Расширение файла в нижнем регистре — по нему выбирается формат."""
+    return os.path.splitext(filepath)[1].lower()
+
+
+def write_scene(filepath: str, positions, eulers, colors, kinds, cell_size: float = 1.0,
+                extension: str | None = None, workers: int | None = None) -> dict | None:
+    """
+    Сохраняет колонки сцены в формате, выбранном по расширению файла
+    (или по extension, если задано): .voxb — двоичный, .voxc — чанковый
+    сжатый (сжимается в workers потоков), иначе текстовый v1.
+    Для чанкового формата возвращает статистику сжатия, иначе None.
+    """
+    extension = extension or _extension(filepath)
+    if extension == CHUNKED_EXTENSION:
+        return write_chunked(filepath, positions, eulers, colors, kinds, cell_size=cell_size, workers=workers)
+    if extension == BINARY_EXTENSION:
+        write_binary(filepath, positions, eulers, colors, kinds)
+    else:
+        write_text(filepath, positions, eulers, colors, kinds)
+    return None
+
+
+def _read_umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# umask процесса: читается при импорте, а не при записи — os.umask меняет
+# его для всех потоков, а write_scene_atomic зовётся и из потока автосохранения
+_UMASK = _read_umask()
+
+
+def _target_mode(filepath: str) -> int:
+    """Права для нового содержимого filepath: как у прежнего файла, иначе 0666 по umask."""
+    try:
+        return os.stat(filepath).st_mode & 0o7777
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def write_scene_atomic(filepath: str, positions, eulers, colors, kinds, cell_size: float = 1.0,
+                       workers: int | None = None):
+    """
+    write_scene без риска испортить файл: данные пишутся во временный
+    файл рядом, сбрасываются на диск (fsync) и одним os.replace занимают
+    место filepath. Сбой посреди записи оставляет прежний файл целым.
+    Возвращает (статистика write_scene, размер файла в байтах).
+    """
+    directory = os.path.dirname(filepath) or "."
+    fd, temp_path = tempfile.mkstemp(prefix="." + os.path.basename(filepath) + ".", suffix=".tmp", dir=directory)
+    os.close(fd)
+
+    try:
+        stats = write_scene(
+            temp_path, positions, eulers, colors, kinds, cell_size,
+            extension=_extension(filepath), workers=workers,
+        )
+        with open(temp_path, "rb+") as f:
+            os.fsync(f.fileno())
+        size = os.path.getsize(temp_path)
+        # mkstemp создаёт файл с правами 0600 — берём права прежнего файла или по umask
+        os.chmod(temp_path, _target_mode(filepath))
+        os.replace(temp_path, filepath)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    # запись о переименовании тоже должна дойти до диска; на Windows каталог не открыть
+    try:
+        directory_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return stats, size
+    try:
+        os.fsync(directory_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(directory_fd)
+    return stats, size
+
+
+def read_scene(filepath: str):
+    """Читает колонки сцены (positions, eulers, colors, kinds) по расширению файла."""
+    extension = _extension(filepath)
+    if extension == CHUNKED_EXTENSION:
+        return read_chunked(filepath)
+    if extension == BINARY_EXTENSION:
+        return read_binary(filepath)
+    return read_text(filepath)
@@ -0,0 +1,378 @@
+import numpy as np
+
+
+CHUNK_SIZE = 16
+EMPTY = -1
+
+# Бит на ось при упаковке тройки координат в одно int64 (см. pack_cells)
+_PACK_BITS = 21
+
+
+def pack_cells(cells) -> np.ndarray:
+    """
+    Кодирует целочисленные тройки (N, 3) одним int64 на строку: равные
+    тройки дают равные коды, разные — разные. Координаты отсчитываются
+    от минимума пачки, по 21 биту на ось; для пачек шире 2^21 клеток
+    по оси коды — номера уникальных строк (медленнее, но без ограничений).
+    Одномерная сортировка кодов намного быстрее np.unique(axis=0).
+    """
+    cells = np.asarray(cells, dtype=np.int64).reshape(-1, 3)
+    if len(cells) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    shifted = cells - cells.min(axis=0)
+    if shifted.max() >= 1 << _PACK_BITS:
+        return np.unique(cells, axis=0, return_inverse=True)[1].reshape(-1)
+    return (shifted[:, 0] << (2 * _PACK_BITS)) | (shifted[:, 1] << _PACK_BITS) | shifted[:, 2]
+
+
+class SparseVoxelGrid:
+    """
+    Разреженная сетка занятости вокселей.
+
+    Пространство разбито на чанки CHUNK_SIZE³ клеток. Каждый непустой чанк —
+    плотный блок int64 с id вокселя в клетке (EMPTY, если клетка свободна),
+    блоки лежат в словаре по координате чанка. Поэтому get/set/clear клетки
+    стоят O(1), а память растёт с числом занятых чанков, а не с объёмом сцены.
+
+    Клетка — целочисленная координата: позиция, делённая на cell_size
+    и округлённая до ближайшего целого (шаг привязки GRID_SIZE в App).
+    """
+
+    def __init__(self, cell_size: float = 1.0, chunk_size: int = CHUNK_SIZE):
+        self.cell_size = cell_size
+        self.chunk_size = chunk_size
+        self.count = 0
+
+        # координата чанка → блок (chunk_size, chunk_size, chunk_size)
+        self.chunks: dict[tuple[int, int, int], np.ndarray] = {}
+        self._chunk_counts: dict[tuple[int, int, int], int] = {}
+
+        # Чанки, чей меш устарел. Правка клетки на границе чанка
+        # помечает и соседа: у него могла открыться или закрыться грань.
+        self.dirty_chunks: set[tuple[int, int, int]] = set()
+
+    # ------------------------------------------------------------------
+    # Coordinates
+    # ------------------------------------------------------------------
+
+    def cell_of(self, positions) -> np.ndarray:
+        """Клетки (N, 3) int64 для мировых позиций (N, 3)."""
+        positions = np.asarray(positions, dtype=np.float64)
+        return np.floor(positions / self.cell_size + 0.5).astype(np.int64)
+
+    def _split(self, cell) -> tuple[tuple[int, int, int], tuple[int, int, int]]:
+        """Координата чанка и локальная координата клетки внутри него."""
+        size = self.chunk_size
+        x, y, z = (int(c) for c in cell)
+        return (x // size, y // size, z // size), (x % size, y % size, z % size)
+
+    def _groups(self, cells: np.ndarray):
+        """Разбивает массив клеток по чанкам: (ключ, номера строк, локальные координаты)."""
+        cells = np.asarray(cells, dtype=np.int64).reshape(-1, 3)
+        if len(cells) == 0:
+            return
+
+        keys = cells // self.chunk_size
+        local = cells - keys * self.chunk_size
+
+        codes = pack_cells(keys)
+        order = np.argsort(codes, kind="stable")
+        sorted_codes = codes[order]
+        starts = np.flatnonzero(np.concatenate(([True], sorted_codes[1:] != sorted_codes[:-1])))
+        bounds = np.append(starts, len(order)).tolist()
+
+        for index, key in enumerate(map(tuple, keys[order[starts]].tolist())):
+            rows = order[bounds[index]:bounds[index + 1]]
+            yield key, rows, local[rows]
+
+    def _new_block(self) -> np.ndarray:
+        size = self.chunk_size
+        return np.full((size, size, size), EMPTY, dtype=np.int64)
+
+    def _recount(self, key: tuple[int, int, int]) -> None:
+        """Пересчитывает заполненность чанка и удаляет его, если он опустел."""
+        block = self.chunks[key]
+        filled = int(np.count_nonzero(block != EMPTY))
+        self.count += filled - self._chunk_counts.get(key, 0)
+
+        if filled:
+            self._chunk_counts[key] = filled
+        else:
+            del self.chunks[key]
+            self._chunk_counts.pop(key, None)
+
+    # ------------------------------------------------------------------
+    # Single cell
+    # ------------------------------------------------------------------
+
+    def get(self, cell) -> int:
+        """id вокселя в клетке или EMPTY."""
+        key, (x, y, z) = self._split(cell)
+        block = self.chunks.get(key)
+        if block is None:
+            return EMPTY
+        return int(block[x, y, z])
+
+    def set(self, cell, voxel_id: int) -> int:
+        """Записывает id в клетку. Возвращает прежнее содержимое клетки."""
+        key, (x, y, z) = self._split(cell)
+        block = self.chunks.get(key)
+        if block is None:
+            block = self.chunks[key] = self._new_block()
+            self._chunk_counts[key] = 0
+
+        previous = int(block[x, y, z])
+        block[x, y, z] = voxel_id
+        self._mark_dirty(key, np.array([[x, y, z]]))
+        if previous == EMPTY:
+            self.count += 1
+            self._chunk_counts[key] += 1
+        return previous
+
+    def clear(self, cell) -> int:
+        """Освобождает клетку. Возвращает id, который в ней был (или EMPTY)."""
+        key, (x, y, z) = self._split(cell)
+        block = self.chunks.get(key)
+        if block is None:
+            return EMPTY
+
+        previous = int(block[x, y, z])
+        if previous != EMPTY:
+            block[x, y, z] = EMPTY
+            self._mark_dirty(key, np.array([[x, y, z]]))
+            self.count -= 1
+            self._chunk_counts[key] -= 1
+            if self._chunk_counts[key] == 0:
+                del self.chunks[key]
+                del self._chunk_counts[key]
+        return previous
+
+    def __contains__(self, cell) -> bool:
+        return self.get(cell) != EMPTY
+
+    def __len__(self) -> int:
+        return self.count
+
+    # ------------------------------------------------------------------
+    # Batches (цикл по затронутым чанкам, а не по клеткам)
+    # ------------------------------------------------------------------
+
+    def get_many(self, cells) -> np.ndarray:
+        """id вокселей в клетках (N, 3); EMPTY для свободных."""
+        cells = np.asarray(cells, dtype=np.int64).reshape(-1, 3)
+        result = np.full(len(cells), EMPTY, dtype=np.int64)
+        for key, rows, local in self._groups(cells):
+            block = self.chunks.get(key)
+            if block is not None:
+                result[rows] = block[local[:, 0], local[:, 1], local[:, 2]]
+        return result
+
+    def set_many(self, cells, ids) -> None:
+        """Записывает id в клетки. Клетки в пачке должны быть уникальны."""
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        for key, rows, local in self._groups(cells):
+            block = self.chunks.get(key)
+            if block is None:
+                block = self.chunks[key] = self._new_block()
+            block[local[:, 0], local[:, 1], local[:, 2]] = ids[rows]
+            self._mark_dirty(key, local)
+            self._recount(key)
+
+    def clear_many(self, cells, expected_ids=None) -> None:
+        """
+        Освобождает клетки. Если задан expected_ids, клетка очищается,
+        только если в ней лежит именно этот id.
+        """
+        if expected_ids is not None:
+            expected_ids = np.asarray(expected_ids, dtype=np.int64).reshape(-1)
+
+        for key, rows, local in self._groups(cells):
+            block = self.chunks.get(key)
+            if block is None:
+                continue
+            x, y, z = local[:, 0], local[:, 1], local[:, 2]
+            if expected_ids is not None:
+                match = block[x, y, z] == expected_ids[rows]
+                x, y, z = x[match], y[match], z[match]
+            block[x, y, z] = EMPTY
+            self._mark_dirty(key, np.stack([x, y, z], axis=1))
+            self._recount(key)
+
+    def move_many(self, old_cells, new_cells, ids) -> bool:
+        """
+        Переносит воксели ids из их клеток old_cells в new_cells (например,
+        сдвиг выделения) за одну группировку по чанкам. Новая клетка может
+        быть свободной или одной из old_cells, поэтому области могут
+        перекрываться. Если хоть одна новая клетка занята вокселем не
+        из пачки, сетка не меняется и возвращается False.
+        """
+        old_cells = np.asarray(old_cells, dtype=np.int64).reshape(-1, 3)
+        new_cells = np.asarray(new_cells, dtype=np.int64).reshape(-1, 3)
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        moved = len(old_cells)
+
+        # сначала проверка столкновений по всем чанкам, потом запись
+        groups = []
+        for key, rows, local in self._groups(np.concatenate([old_cells, new_cells])):
+            # сортировка в _groups устойчива: строки старых клеток идут первыми
+            split = np.searchsorted(rows, moved)
+            old, new = local[:split], local[split:]
+
+            block = self.chunks.get(key)
+            if block is not None and len(new):
+                freed = np.zeros(block.shape, dtype=bool)
+                freed[old[:, 0], old[:, 1], old[:, 2]] = True
+                x, y, z = new[:, 0], new[:, 1], new[:, 2]
+                if np.any((block[x, y, z] != EMPTY) & ~freed[x, y, z]):
+                    return False
+            groups.append((key, old, new, rows[split:] - moved))
+
+        for key, old, new, rows in groups:
+            block = self.chunks.get(key)
+            if block is None:
+                block = self.chunks[key] = self._new_block()
+            block[old[:, 0], old[:, 1], old[:, 2]] = EMPTY
+            block[new[:, 0], new[:, 1], new[:, 2]] = ids[rows]
+            self._mark_dirty(key, np.concatenate([old, new]))
+            self._recount(key)
+        return True
+
+    def clear_all(self) -> None:
+        """Очищает всю сетку."""
+        self.dirty_chunks.update(self.chunks)
+        self.chunks.clear()
+        self._chunk_counts.clear()
+        self.count = 0
+
+    # ------------------------------------------------------------------
+    # Dirty chunks
+    # ------------------------------------------------------------------
+
+    def _mark_dirty(self, key, local: np.ndarray, neighbours: bool = True) -> None:
+        """Помечает чанк key (и соседей через задетые границы) устаревшим."""
+        self.dirty_chunks.add(key)
+        if not neighbours or len(local) == 0:
+            return
+
+        lows, highs = local.min(axis=0).tolist(), local.max(axis=0).tolist()
+        for axis in range(3):
+            for sign, touches in ((-1, lows[axis] == 0), (1, highs[axis] == self.chunk_size - 1)):
+                if touches:
+                    neighbour = list(key)
+                    neighbour[axis] += sign
+                    self.dirty_chunks.add(tuple(neighbour))
+
+    def mark_dirty(self, cells, neighbours: bool = False) -> None:
+        """
+        Помечает устаревшими чанки, содержащие cells, — например, после
+        смены цвета. Занятость не менялась, поэтому соседей по умолчанию не трогаем.
+        """
+        for key, _, local in self._groups(cells):
+            self._mark_dirty(key, local, neighbours)
+
+    def take_dirty_chunks(self) -> "set[tuple[int, int, int]]":
+        """Забирает накопленное множество устаревших чанков и очищает его."""
+        dirty, self.dirty_chunks = self.dirty_chunks, set()
+        return dirty
+
+    # ------------------------------------------------------------------
+    # Chunks and bounds
+    # ------------------------------------------------------------------
+
+    def iter_chunks(self):
+        """Итерация по непустым чанкам: (координата чанка, блок id)."""
+        yield from self.chunks.items()
+
+    def chunk_origin(self, key) -> np.ndarray:
+        """Клетка с минимальными координатами в чанке key."""
+        return np.asarray(key, dtype=np.int64) * self.chunk_size
+
+    def padded_block(self, key) -> np.ndarray:
+        """
+        Блок чанка key с рамкой в одну клетку: (S+2)³ id, где рамку по граням
+        заполняют пограничные слои шести соседних чанков (рёбра и углы пусты).
+        """
+        size = self.chunk_size
+        padded = np.full((size + 2,) * 3, EMPTY, dtype=np.int64)
+
+        block = self.chunks.get(tuple(key))
+        if block is not None:
+            padded[1:-1, 1:-1, 1:-1] = block
+
+        for axis in range(3):
+            for sign in (-1, 1):
+                neighbour_key = list(key)
+                neighbour_key[axis] += sign
+                neighbour = self.chunks.get(tuple(neighbour_key))
+                if neighbour is None:
+                    continue
+
+                # ближайший к нам слой соседа → соответствующая грань рамки
+                source = [slice(None)] * 3
+                source[axis] = 0 if sign > 0 else size - 1
+                target = [slice(1, -1)] * 3
+                target[axis] = size + 1 if sign > 0 else 0
+                padded[tuple(target)] = neighbour[tuple(source)]
+        return padded
+
+    def bounds(self) -> tuple[np.ndarray, np.ndarray] | None:
+        """Минимальная и максимальная занятые клетки (включительно) или None."""
+        if not self.chunks:
+            return None
+
+        keys = np.array(list(self.chunks), dtype=np.int64)
+        lo = np.full(3, np.iinfo(np.int64).max)
+        hi = np.full(3, np.iinfo(np.int64).min)
+
+        # точные границы нужны только у крайних чанков
+        for axis in range(3):
+            for key in map(tuple, keys[keys[:, axis] == keys[:, axis].min()].tolist()):
+                occupied = np.nonzero(np.any(self.chunks[key] != EMPTY, axis=tuple(a for a in range(3) if a != axis)))[0]
+                lo[axis] = min(lo[axis], key[axis] * self.chunk_size + occupied[0])
+            for key in map(tuple, keys[keys[:, axis] == keys[:, axis].max()].tolist()):
+                occupied = np.nonzero(np.any(self.chunks[key] != EMPTY, axis=tuple(a for a in range(3) if a != axis)))[0]
+                hi[axis] = max(hi[axis], key[axis] * self.chunk_size + occupied[-1])
+        return lo, hi
+
+    def query_box(self, lo, hi) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Все занятые клетки в параллелепипеде [lo, hi] (включительно).
+        Возвращает (клетки (K, 3), id (K,)). Перебираются только
+        пересекающиеся с запросом чанки.
+        """
+        lo = np.asarray(lo, dtype=np.int64)
+        hi = np.asarray(hi, dtype=np.int64)
+        key_lo, key_hi = lo // self.chunk_size, hi // self.chunk_size
+
+        span = int(np.prod(np.maximum(key_hi - key_lo + 1, 0)))
+        if span <= len(self.chunks):
+            keys = (
+                (x, y, z)
+                for x in range(key_lo[0], key_hi[0] + 1)
+                for y in range(key_lo[1], key_hi[1] + 1)
+                for z in range(key_lo[2], key_hi[2] + 1)
+            )
+        else:
+            keys = (
+                key for key in self.chunks
+                if all(key_lo[a] <= key[a] <= key_hi[a] for a in range(3))
+            )
+
+        cells, ids = [], []
+        for key in keys:
+            block = self.chunks.get(key)
+            if block is None:
+                continue
+            origin = self.chunk_origin(key)
+            start = np.clip(lo - origin, 0, self.chunk_size)
+            stop = np.clip(hi - origin + 1, 0, self.chunk_size)
+            window = block[start[0]:stop[0], start[1]:stop[1], start[2]:stop[2]]
+            local = np.argwhere(window != EMPTY)
+            if len(local):
+                cells.append(local + origin + start)
+                ids.append(window[window != EMPTY])
+
+        if not cells:
+            return np.zeros((0, 3), dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(cells), np.concatenate(ids)
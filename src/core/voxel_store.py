@@ -0,0 +1,595 @@
+import numpy as np
+
+from .cube import batch_model_transforms
+from .material import MaterialPalette
+
+
+# Типы объектов сцены (колонка kinds)
+KIND_CUBE = 0      # рисуемый воксель-куб
+KIND_ENTITY = 1    # объект без геометрии (строки ENTITY в файле сцены)
+
+DEFAULT_COLOR = (0.5, 0.5, 0.5, 0.5)
+
+
+class VoxelStoreListener:
+    """
+    Наблюдатель строк VoxelStore (например, модель списка объектов в GUI).
+    Уведомления приходят после изменения хранилища; по умолчанию методы
+    ничего не делают — достаточно переопределить нужные.
+    """
+
+    def rows_inserted(self, start: int, stop: int) -> None:
+        """Добавлены строки [start, stop)."""
+
+    def rows_removed(self, start: int, stop: int) -> None:
+        """
+        Строки [start, stop) отрезаны с конца. Удаление из середины переносит
+        на место дыр строки из хвоста — о дырах приходит rows_changed.
+        """
+
+    def rows_changed(self, slots: np.ndarray | None) -> None:
+        """Изменилось содержимое строк slots (None — всех)."""
+
+    def rows_reset(self) -> None:
+        """Хранилище очищено."""
+
+
+# ======================================================================
+# Voxel Store
+# ======================================================================
+
+class VoxelStore:
+    """
+    Колоночное хранилище объектов сцены (structure-of-arrays).
+
+    Каждое свойство лежит в отдельном непрерывном массиве:
+        positions : (N, 3) float32
+        eulers    : (N, 3) float32
+        materials : (N,)   uint32 — номер цвета в палитре palette
+        selected  : (N,)   bool
+        kinds     : (N,)   uint8
+        ids       : (N,)   int64 — стабильный идентификатор строки
+
+    Строки (slot) плотно упакованы в [0, count); удаление переносит
+    последнюю строку на место удалённой (swap-remove), поэтому slot объекта
+    может меняться, а id — нет. Ёмкость растёт удвоением.
+
+    Модельные матрицы кэшируются в колонке (N, 4, 4) с флагом «устарела»
+    на строку: model_matrices() пересчитывает одной векторной операцией
+    только строки, чьи позиция или поворот менялись. Код, который пишет
+    в колонки positions/eulers напрямую, сообщает об этом invalidate_models().
+
+    Цвета интернированы в MaterialPalette: одинаковые RGBA хранятся один
+    раз, объект хранит только номер записи. colors — вычисляемая колонка
+    (palette.colors[materials], новый массив при каждом обращении), поэтому
+    в горячих местах лучше colors_of(slots) или сами номера materials.
+
+    Выделение хранится дважды: колонкой selected (по строкам) и множеством
+    id выделенных объектов — поэтому selected_ids() стоит O(числа выделенных),
+    а не O(размера сцены). Колонки selected и materials только читаются,
+    меняются они через set_selected / select_all / set_colors.
+
+    Наблюдатели из listeners (VoxelStoreListener) получают диапазоны
+    добавленных, удалённых и изменённых строк — так список объектов в GUI
+    обновляется без перестройки.
+
+    Для совместимости хранилище ведёт себя как последовательность
+    лёгких представлений VoxelView (len, итерация, индексация, in).
+    """
+
+    def __init__(self, capacity: int = 256):
+        self.count = 0
+        self._next_id = 0
+
+        self._positions = np.zeros((capacity, 3), dtype=np.float32)
+        self._eulers = np.zeros((capacity, 3), dtype=np.float32)
+        self._materials = np.zeros(capacity, dtype=np.uint32)
+        self._selected = np.zeros(capacity, dtype=bool)
+        self._kinds = np.zeros(capacity, dtype=np.uint8)
+        self._ids = np.zeros(capacity, dtype=np.int64)
+
+        # Кэш модельных матриц и флаги устаревших строк
+        self._models = np.zeros((capacity, 4, 4), dtype=np.float32)
+        self._models_dirty = np.zeros(capacity, dtype=bool)
+        self._any_models_dirty = False
+
+        # id → slot (-1, если объекта с таким id нет)
+        self._slots = np.full(capacity, -1, dtype=np.int64)
+
+        # Палитра цветов объектов (счётчики ссылок ведутся по строкам хранилища)
+        self.palette = MaterialPalette()
+
+        # id выделенных объектов (согласовано с колонкой selected)
+        self._selection: set[int] = set()
+
+        # Счётчик изменений выделения (Scene.revision его не учитывает)
+        self.selection_revision = 0
+
+        # Наблюдатели строк (VoxelStoreListener)
+        self.listeners: list[VoxelStoreListener] = []
+
+        # Сцена-владелец: правки через VoxelView идут её методами, чтобы
+        # сетка занятости, ревизия и журнал отмены не отставали от колонок
+        self.scene = None
+
+        # Индекс цветов для ids_with_color: (отсортированные номера записей
+        # палитры, id в том же порядке). Строится лениво, None — устарел.
+        self._color_index: tuple[np.ndarray, np.ndarray] | None = None
+
+    # ------------------------------------------------------------------
+    # Columns (живые представления длины count)
+    # ------------------------------------------------------------------
+
+    @property
+    def positions(self) -> np.ndarray:
+        return self._positions[:self.count]
+
+    @property
+    def eulers(self) -> np.ndarray:
+        return self._eulers[:self.count]
+
+    @property
+    def materials(self) -> np.ndarray:
+        return self._materials[:self.count]
+
+    @property
+    def colors(self) -> np.ndarray:
+        """Цвета RGBA всех строк (count, 4) — копия из палитры, запись в неё ничего не меняет."""
+        return self.palette.colors[self.materials]
+
+    def colors_of(self, slots) -> np.ndarray:
+        """Цвета RGBA строк slots."""
+        return self.palette.colors[self._materials[slots]]
+
+    @property
+    def selected(self) -> np.ndarray:
+        return self._selected[:self.count]
+
+    @property
+    def kinds(self) -> np.ndarray:
+        return self._kinds[:self.count]
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._ids[:self.count]
+
+    def _columns(self) -> tuple:
+        return (
+            self._positions, self._eulers, self._materials, self._selected, self._kinds, self._ids,
+            self._models, self._models_dirty,
+        )
+
+    # ------------------------------------------------------------------
+    # Capacity
+    # ------------------------------------------------------------------
+
+    def _reserve(self, count: int) -> None:
+        """Гарантирует место под count строк (амортизированное удвоение)."""
+        capacity = len(self._ids)
+        if count > capacity:
+            capacity = max(count, capacity * 2)
+            (self._positions, self._eulers, self._materials, self._selected, self._kinds, self._ids,
+             self._models, self._models_dirty) = (_resized(column, capacity) for column in self._columns())
+
+    def _reserve_ids(self, next_id: int) -> None:
+        """Расширяет таблицу id → slot до next_id записей."""
+        size = len(self._slots)
+        if next_id > size:
+            grown = np.full(max(next_id, size * 2), -1, dtype=np.int64)
+            grown[:size] = self._slots
+            self._slots = grown
+
+    # ------------------------------------------------------------------
+    # Insert / remove
+    # ------------------------------------------------------------------
+
+    def add(self, position, eulers=(0, 0, 0), color=DEFAULT_COLOR,
+            selected: bool = False, kind: int = KIND_CUBE) -> int:
+        """Добавляет один объект и возвращает его id."""
+        return int(self.add_many([position], [eulers], [color], selected, kind)[0])
+
+    def add_many(self, positions, eulers=None, colors=None,
+                 selected=False, kinds=KIND_CUBE, ids=None) -> np.ndarray:
+        """
+        Добавляет пачку объектов одной операцией.
+        eulers/colors/selected/kinds — массивы на каждую строку или одно
+        значение на всю пачку. ids — вернуть объектам прежние id (отмена
+        удаления); по умолчанию выдаются новые. Возвращает массив id.
+        """
+        positions = np.asarray(positions, dtype=np.float32).reshape(-1, 3)
+        added = len(positions)
+        start, stop = self.count, self.count + added
+
+        self._reserve(stop)
+        self._positions[start:stop] = positions
+        self._eulers[start:stop] = 0 if eulers is None else eulers
+        self._materials[start:stop] = self._intern(DEFAULT_COLOR if colors is None else colors, added)
+        self._selected[start:stop] = selected
+        self._kinds[start:stop] = kinds
+        self._models_dirty[start:stop] = True
+        self._any_models_dirty = True
+
+        if ids is None:
+            ids = np.arange(self._next_id, self._next_id + added, dtype=np.int64)
+            self._next_id += added
+        else:
+            ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+            if added:
+                self._next_id = max(self._next_id, int(ids.max()) + 1)
+        self._reserve_ids(self._next_id)
+        self._ids[start:stop] = ids
+        self._slots[ids] = np.arange(start, stop)
+        self._selection.update(ids[self._selected[start:stop]].tolist())
+        self._color_index = None
+
+        self.count = stop
+        if added:
+            self._notify("rows_inserted", start, stop)
+        return ids
+
+    def remove(self, voxel_id: int) -> bool:
+        """Удаляет объект по id. Возвращает False, если его нет."""
+        return self.remove_many([voxel_id]) == 1
+
+    def remove_many(self, ids) -> int:
+        """
+        Удаляет объекты по id (отсутствующие пропускаются).
+        Дыры в начале массивов заполняются выжившими строками из хвоста,
+        поэтому стоимость пропорциональна числу удалённых, а не размеру сцены.
+        Возвращает число удалённых объектов.
+        """
+        slots = self.slots_of(ids)
+        slots = np.unique(slots[slots >= 0])
+        removed = len(slots)
+        if removed == 0:
+            return 0
+
+        new_count = self.count - removed
+        self.palette.release(self._materials[slots])
+        self._selection.difference_update(self._ids[slots[self._selected[slots]]].tolist())
+        self._slots[self._ids[slots]] = -1
+
+        holes = slots[slots < new_count]
+        tail = np.ones(removed, dtype=bool)
+        tail[slots[slots >= new_count] - new_count] = False
+        movers = np.flatnonzero(tail) + new_count
+
+        for column in self._columns():
+            column[holes] = column[movers]
+        self._slots[self._ids[holes]] = holes
+
+        self.count = new_count
+        self._notify("rows_removed", new_count, new_count + removed)
+        if len(holes):
+            self._notify("rows_changed", holes)
+        return removed
+
+    def clear(self) -> None:
+        """Удаляет все объекты. Уже выданные id повторно не используются."""
+        self._slots[self._ids[:self.count]] = -1
+        self.palette.clear()
+        self._selection.clear()
+        self._color_index = None
+        self.count = 0
+        self._notify("rows_reset")
+
+    # ------------------------------------------------------------------
+    # Model matrices
+    # ------------------------------------------------------------------
+
+    def invalidate_models(self, slots=None) -> None:
+        """Помечает модельные матрицы строк slots (по умолчанию всех) устаревшими."""
+        if slots is None:
+            self.models_dirty[:] = True
+        else:
+            self._models_dirty[slots] = True
+        self._any_models_dirty = True
+        self.notify_changed(slots)
+
+    @property
+    def models_dirty(self) -> np.ndarray:
+        return self._models_dirty[:self.count]
+
+    def model_matrices(self) -> np.ndarray:
+        """
+        Модельные матрицы всех строк, (count, 4, 4) float32 в соглашении
+        pyrr — их можно сразу отдавать в instance-буфер. Устаревшие строки
+        пересчитываются пачкой (batch_model_transforms); если с прошлого
+        вызова ничего не двигалось, это просто срез кэша.
+        """
+        if self._any_models_dirty:
+            dirty = np.flatnonzero(self.models_dirty)
+            self._models[dirty] = batch_model_transforms(self._positions[dirty], self._eulers[dirty])
+            self._models_dirty[dirty] = False
+            self._any_models_dirty = False
+        return self._models[:self.count]
+
+    # ------------------------------------------------------------------
+    # Selection
+    # ------------------------------------------------------------------
+
+    @property
+    def selected_count(self) -> int:
+        return len(self._selection)
+
+    def selected_ids(self) -> np.ndarray:
+        """id выделенных объектов по возрастанию."""
+        ids = np.fromiter(self._selection, dtype=np.int64, count=len(self._selection))
+        ids.sort()
+        return ids
+
+    def set_selected(self, ids, selected: bool = True) -> int:
+        """
+        Выделяет объекты с данными id (или снимает с них выделение),
+        отсутствующие пропускаются. Возвращает число объектов,
+        чьё выделение изменилось.
+        """
+        slots = self.slots_of(ids)
+        return self._set_selected_slots(slots[slots >= 0], selected)
+
+    def _set_selected_slots(self, slots: np.ndarray, selected: bool) -> int:
+        slots = np.unique(slots[self._selected[slots] != selected])
+        self._selected[slots] = selected
+
+        changed = self._ids[slots].tolist()
+        if selected:
+            self._selection.update(changed)
+        else:
+            self._selection.difference_update(changed)
+        if changed:
+            self.selection_revision += 1
+            self._notify("rows_changed", slots)
+        return len(slots)
+
+    def select_all(self, selected: bool = True) -> None:
+        """Выделяет все объекты или снимает выделение (снятие — за O(числа выделенных))."""
+        self.selection_revision += 1
+        if selected:
+            self.selected[:] = True
+            self._selection = set(self.ids.tolist())
+        elif len(self._selection) * 8 > self.count:
+            self.selected[:] = False
+            self._selection.clear()
+        else:
+            self._selected[self.slots_of(self.selected_ids())] = False
+            self._selection.clear()
+        self._notify("rows_changed", None)
+
+    def invert_selection(self) -> None:
+        """Инвертирует выделение всех объектов."""
+        self.selection_revision += 1
+        np.logical_not(self.selected, out=self.selected)
+        self._selection = set(self.ids[self.selected].tolist())
+        self._notify("rows_changed", None)
+
+    # ------------------------------------------------------------------
+    # Colors
+    # ------------------------------------------------------------------
+
+    def _intern(self, colors, count: int) -> np.ndarray:
+        """Номера записей палитры для count строк: один цвет на всех или (count, 4)."""
+        colors = np.asarray(colors, dtype=np.float32)
+        if colors.ndim == 1:
+            return self.palette.intern(colors.reshape(1, 4), refs=count)
+        return self.palette.intern(np.broadcast_to(colors, (count, 4)))
+
+    def set_colors(self, ids, colors) -> None:
+        """
+        Назначает цвета RGBA (один на всех или (N, 4)) объектам с данными id:
+        переводит их на записи палитры этих цветов (новые цвета интернируются,
+        опустевшие записи освобождаются).
+        """
+        slots = self.slots_of(ids)
+        colors = np.asarray(colors, dtype=np.float32)
+        found = slots >= 0
+        if colors.ndim > 1:
+            colors = colors[found]
+        slots = slots[found]
+
+        materials = self._intern(colors, len(slots))
+        self.palette.release(self._materials[slots])
+        self._materials[slots] = materials
+        self._color_index = None
+        self._notify("rows_changed", slots)
+
+    def ids_with_color(self, color) -> np.ndarray:
+        """
+        id объектов, чей цвет в точности равен color, по возрастанию.
+        Цвет ищется в палитре, объекты — по отсортированному индексу номеров
+        записей за O(log N + ответ); индекс перестраивается (одна сортировка)
+        только после смены номеров или добавления объектов. Перекраска записи
+        палитры на месте номера не меняет, и индекс остаётся верным.
+        """
+        entry = self.palette.find(color)
+        if entry < 0:
+            return np.zeros(0, dtype=np.int64)
+
+        if self._color_index is None:
+            order = np.argsort(self.materials, kind="stable")
+            self._color_index = self.materials[order], self.ids[order]
+        materials, ids = self._color_index
+        candidates = ids[np.searchsorted(materials, entry, "left"):np.searchsorted(materials, entry, "right")]
+
+        # удалённые после построения индекса (их запись могла достаться новому цвету)
+        slots = self.slots_of(candidates)
+        found = slots >= 0
+        found[found] = self._materials[slots[found]] == entry
+        return np.sort(candidates[found])
+
+    # ------------------------------------------------------------------
+    # Listeners
+    # ------------------------------------------------------------------
+
+    def notify_changed(self, slots=None) -> None:
+        """
+        Сообщает наблюдателям, что содержимое строк slots (None — всех)
+        изменилось в обход методов хранилища (запись в колонки, перекраска
+        записи палитры).
+        """
+        if self.listeners:
+            self._notify("rows_changed", None if slots is None else np.asarray(slots).reshape(-1))
+
+    def _notify(self, event: str, *args) -> None:
+        for listener in self.listeners:
+            getattr(listener, event)(*args)
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def slot(self, voxel_id: int) -> int:
+        """Текущая строка объекта или -1."""
+        if 0 <= voxel_id < self._next_id:
+            return int(self._slots[voxel_id])
+        return -1
+
+    def slots_of(self, ids) -> np.ndarray:
+        """Векторизованный slot(): массив строк, -1 для отсутствующих id."""
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        slots = np.full(len(ids), -1, dtype=np.int64)
+        valid = (ids >= 0) & (ids < self._next_id)
+        slots[valid] = self._slots[ids[valid]]
+        return slots
+
+    def view(self, voxel_id: int) -> "VoxelView":
+        """Лёгкое представление объекта с данным id."""
+        return VoxelView(self, voxel_id)
+
+    # ------------------------------------------------------------------
+    # Sequence protocol
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self):
+        for voxel_id in self.ids.tolist():
+            yield VoxelView(self, voxel_id)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [VoxelView(self, voxel_id) for voxel_id in self.ids[index].tolist()]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("voxel index out of range")
+        return VoxelView(self, int(self._ids[index]))
+
+    def __contains__(self, item) -> bool:
+        return isinstance(item, VoxelView) and item.store is self and self.slot(item.id) >= 0
+
+
+def _resized(column: np.ndarray, capacity: int) -> np.ndarray:
+    """Копия колонки с новой длиной по первой оси."""
+    grown = np.zeros((capacity,) + column.shape[1:], dtype=column.dtype)
+    grown[:len(column)] = column
+    return grown
+
+
+# ======================================================================
+# Views
+# ======================================================================
+
+class VoxelView:
+    """
+    Лёгкое представление одной строки VoxelStore.
+    Хранит только ссылку на хранилище и id, данные читает из колонок,
+    поэтому остаётся валидным после swap-remove других объектов.
+    Запись позиции и поворота у хранилища сцены идёт через
+    Scene.set_positions / Scene.set_eulers (сетка, ревизия, журнал).
+    """
+
+    __slots__ = ("store", "id")
+
+    def __init__(self, store: VoxelStore, voxel_id: int):
+        self.store = store
+        self.id = voxel_id
+
+    @property
+    def slot(self) -> int:
+        slot = self.store.slot(self.id)
+        if slot < 0:
+            raise KeyError(f"voxel {self.id} was removed")
+        return slot
+
+    # ------------------------------------------------------------------
+
+    @property
+    def position(self) -> np.ndarray:
+        return self.store._positions[self.slot]
+
+    @position.setter
+    def position(self, value) -> None:
+        slot = self.slot
+        if self.store.scene is not None:
+            self.store.scene.set_positions([self.id], [value])
+            return
+        self.store._positions[slot] = value
+        self.store.invalidate_models(slot)
+
+    @property
+    def eulers(self) -> np.ndarray:
+        return self.store._eulers[self.slot]
+
+    @eulers.setter
+    def eulers(self, value) -> None:
+        slot = self.slot
+        if self.store.scene is not None:
+            self.store.scene.set_eulers([self.id], [value])
+            return
+        self.store._eulers[slot] = value
+        self.store.invalidate_models(slot)
+
+    @property
+    def is_selected(self) -> bool:
+        return bool(self.store._selected[self.slot])
+
+    @is_selected.setter
+    def is_selected(self, value: bool) -> None:
+        self.store._set_selected_slots(np.array([self.slot]), bool(value))
+
+    @property
+    def kind(self) -> int:
+        return int(self.store._kinds[self.slot])
+
+    @property
+    def material(self) -> "MaterialView":
+        return MaterialView(self)
+
+    # ------------------------------------------------------------------
+
+    def get_model_transform(self) -> np.ndarray:
+        """4×4 модельная матрица объекта из кэша хранилища (см. cube.model_transform)."""
+        return self.store.model_matrices()[self.slot]
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, VoxelView) and other.store is self.store and other.id == self.id
+
+    def __hash__(self) -> int:
+        return hash((id(self.store), self.id))
+
+    def __repr__(self) -> str:
+        return f"VoxelView(id={self.id})"
+
+
+class MaterialView:
+    """Материал объекта VoxelStore: цвет — запись палитры, на которую ссылается объект."""
+
+    __slots__ = ("_voxel",)
+
+    def __init__(self, voxel: VoxelView):
+        self._voxel = voxel
+
+    @property
+    def color(self) -> np.ndarray:
+        """Копия цвета RGBA (запись палитры общая для всех объектов этого цвета)."""
+        return self._voxel.store.colors_of(self._voxel.slot).copy()
+
+    @color.setter
+    def color(self, value) -> None:
+        # у хранилища сцены — через Scene.recolor: чанки, ревизия и журнал отмены
+        store = self._voxel.store
+        if store.scene is not None:
+            store.scene.recolor([self._voxel.id], value)
+            return
+        store.set_colors([self._voxel.id], value)
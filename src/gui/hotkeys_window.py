@@ -50,20 +50,56 @@ class HotkeysWindow(QWidget):
             "  • S — движение назад\n"
             "  • A — смещение влево\n"
             "  • D — смещение вправо\n"
-            "  • Перемещение мыши + Shift — поворот камеры\n\n"
+            "  • Перемещение мыши + Shift — поворот камеры\n"
+            "  • Колесо мыши — шаг вперёд / назад по направлению взгляда\n\n"
             "Работа с объектами:\n"
             "  • N + X/Y/Z — добавить воксель по выбранной оси\n"
-            "  • G + X/Y/Z — переместить выделенный воксель\n"
+            "  • G + X/Y/Z — переместить выделенные воксели\n"
+            "      (сдвиг от положения курсора при выборе оси;\n"
+            "      упёршись в другой воксель, выделение останавливается)\n"
+            "  • R в режиме G — повернуть выделение на 90° вокруг оси\n"
+            "      (Shift + R — в обратную сторону), F — отразить по оси\n"
             "  • Delete — удалить выделенный воксель\n"
-            "  • Левая кнопка мыши — выбор вокселя\n\n"
+            "  • Ctrl + Z — отменить действие\n"
+            "  • Ctrl + Y или Ctrl + Shift + Z — повторить отменённое\n"
+            "      (перемещение в режиме G/N отменяется целиком)\n"
+            "  • Левая кнопка мыши — выбор вокселя под курсором\n"
+            "      (клик в пустоту снимает выделение)\n"
+            "  • Ctrl + левая кнопка мыши — добавить воксель к выделению\n"
+            "  • Правая кнопка мыши — поставить воксель вплотную\n"
+            "      к грани под курсором\n"
+            "  • Правая кнопка мыши в режиме G — выход из перемещения\n\n"
+            "Выделение:\n"
+            "  • R — выделить сферу вокруг вокселя под курсором\n"
+            "  • K — выделить все воксели цвета вокселя под курсором\n"
+            "      (с Ctrl — добавить к текущему выделению)\n"
+            "  • B — выделить всё в габаритах текущего выделения\n"
+            "  • I — инвертировать выделение\n"
+            "  • = / - — расширить / сжать выделение на один слой\n\n"
             "Материалы:\n"
             "  • C — открыть окно редактирования цвета\n"
             "      (R, G, B, A — параметры цвета от 1 до 100)\n\n"
             "Сцена:\n"
             "  • O — открыть список объектов сцены\n"
-            "  • M — сохранить сцену в файл\n"
+            "      (поиск: #rrggbb — цвет, x=0..5 — координата, 1 2 3 — позиция)\n"
+            "  • M — сохранить сцену в файл (в фоне)\n"
+            "  • F5 — сохранить сцену сейчас в scenes/autosave.voxc\n"
+            "      (автосохранение туда же раз в 30 секунд, состояние —\n"
+            "      в заголовке окна)\n"
             "  • Ctrl + M — загрузить сохранённую сцену\n"
+            "      (расширение имени выбирает формат: .voxb — двоичный,\n"
+            "      .voxc — сжатый чанковый, любое другое — текстовый)\n"
+            "  • Ctrl + T — сгенерировать рельеф 512×512 под камерой\n"
+            "      (в фоне на всех ядрах; каждое нажатие — новое зерно)\n"
             "  • Escape — выход из приложения\n\n"
+            "Профилирование:\n"
+            "  • F3 — показать / скрыть оверлей с временем фаз кадра\n"
+            "      (p50 / p95 / p99 в мс за последние 600 кадров)\n"
+            "  • F12 — записать последние кадры в traces/frame_trace_*.json\n"
+            "      (открывается в chrome://tracing или ui.perfetto.dev)\n\n"
+            "Клавиши можно переназначить в keymap.json рядом с программой:\n"
+            "  {\"select.invert\": [\"I\"], \"edit.redo\": [\"Ctrl+Y\"]} —\n"
+            "  имена действий см. в core/input.py (DEFAULT_BINDINGS).\n\n"
             "Все сохраняемые проекты размещаются в папке 'Scene'.\n"
             "Рекомендуется регулярно сохранять изменения."
         )
@@ -1,6 +1,4 @@
-import numpy as np
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QHBoxLayout, QLineEdit
-from src.core.material import Material
 
 
 class MaterialEditorWindow(QWidget):
@@ -48,7 +46,7 @@ class MaterialEditorWindow(QWidget):
         Обрабатывает как целые, так и десятичные значения, безопасно.
         """
 
-        selected = self.app.scene.get_all_selected()
+        selected = len(self.app.scene.selected_ids())
         if not selected:
             print("[MaterialEditor] Нет выделенных объектов")
             return
@@ -69,14 +67,10 @@ class MaterialEditorWindow(QWidget):
             print("[MaterialEditor] Ошибка:", e)
             return
 
-        print(f"[MaterialEditor] Применяем RGBA = {r:.2f}, {g:.2f}, {b:.2f}, {a:.2f} к {len(selected)} объектам")
+        print(f"[MaterialEditor] Применяем RGBA = {r:.2f}, {g:.2f}, {b:.2f}, {a:.2f} к {selected} объектам")
 
-        # Обновляем материал каждого выделенного объекта
-        for obj in selected:
-            if hasattr(obj, "material") and isinstance(obj.material, Material):
-                obj.material.color = np.array([r, g, b, a], dtype=np.float32)
-            else:
-                obj.material = Material(r, g, b, a)
+        # Обновляем цвет всех выделенных объектов одной операцией
+        self.app.scene.recolor_selected((r, g, b, a))
 
         # Закрываем окно после применения
         self.close()
@@ -0,0 +1,214 @@
+import numpy as np
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt, QTimer
+from PySide6.QtGui import QColor
+
+
+# Допуск сравнения координат в фильтре
+COORDINATE_TOLERANCE = 1e-4
+
+SELECTED_BACKGROUND = QColor("yellow")
+
+
+def filter_mask(store, text: str) -> np.ndarray | None:
+    """
+    Маска строк store, подходящих под поисковый запрос, или None для пустого.
+    Условия через пробел или запятую, все должны выполняться:
+        #ff8800, #ff880080 — цвет (компоненты по 0..255, альфа — если указана);
+        x=3, z=-2..4       — координата или диапазон координат;
+        3 0 -2             — позиция целиком;
+        17                 — id объекта.
+    Неразобранный запрос — ValueError.
+    """
+    text = text.strip()
+    if not text:
+        return None
+
+    mask = np.ones(store.count, dtype=bool)
+    numbers = []
+    for token in text.replace(",", " ").split():
+        if token.startswith("#"):
+            mask &= _color_mask(store, token)
+        elif "=" in token:
+            axis, _, value = token.partition("=")
+            axis = axis.strip().lower()
+            if axis not in ("x", "y", "z"):
+                raise ValueError(f"unknown axis in {token!r}")
+            lo, _, hi = value.partition("..")
+            lo = float(lo)
+            hi = float(hi) if hi else lo
+            column = store.positions[:, "xyz".index(axis)]
+            mask &= (column >= lo - COORDINATE_TOLERANCE) & (column <= hi + COORDINATE_TOLERANCE)
+        else:
+            numbers.append(float(token))
+
+    if len(numbers) == 1:
+        mask &= store.ids == int(numbers[0])
+    elif len(numbers) == 3:
+        mask &= np.all(np.abs(store.positions - np.asarray(numbers, dtype=np.float32)) <= COORDINATE_TOLERANCE, axis=1)
+    elif numbers:
+        raise ValueError("expected an id or three coordinates")
+    return mask
+
+
+def _color_mask(store, token: str) -> np.ndarray:
+    """Строки цвета #rrggbb[aa]: сравниваются записи палитры, не строки хранилища."""
+    digits = token[1:]
+    if len(digits) not in (6, 8):
+        raise ValueError(f"bad color {token!r}")
+    target = np.array([int(digits[i:i + 2], 16) for i in range(0, len(digits), 2)])
+
+    colors = np.round(store.palette.colors[:, :len(target)] * 255)
+    entries = np.all(colors == target, axis=1)
+    return entries[store.materials]
+
+
+# ======================================================================
+# Model
+# ======================================================================
+
+class ObjectListModel(QAbstractListModel):
+    """
+    Модель списка объектов сцены поверх VoxelStore: строка модели — строка
+    хранилища (или, при фильтре, строка из отобранных). QListView
+    запрашивает data() только у видимых строк, поэтому открытие списка
+    не зависит от размера сцены.
+
+    Модель подписана на хранилище (методы VoxelStoreListener): добавления и
+    удаления приходят в представление диапазонами строк, изменения
+    выделения, цвета и позиций — dataChanged по диапазону задетых строк.
+    С фильтром отбор пересчитывается (векторно) один раз на цикл событий
+    Qt, сколько бы изменений ни пришло.
+    """
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+
+        # Строк в представлении без фильтра (хранилище меняется раньше уведомления)
+        self._count = store.count
+
+        # Строки хранилища, прошедшие фильтр, или None без фильтра
+        self.filter_text = ""
+        self._filtered: np.ndarray | None = None
+        self._refilter_scheduled = False
+
+        store.listeners.append(self)
+
+    def detach(self):
+        """Отписывает модель от хранилища."""
+        if self in self.store.listeners:
+            self.store.listeners.remove(self)
+
+    # ----------------------------------------------------------------------
+    # Qt model interface
+    # ----------------------------------------------------------------------
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return self._count if self._filtered is None else len(self._filtered)
+
+    def data(self, index, role=Qt.DisplayRole):
+        slot = self.slot(index)
+        if slot < 0:
+            return None
+
+        store = self.store
+        if role == Qt.DisplayRole:
+            x, y, z = store.positions[slot].tolist()
+            return f"voxel.{int(store.ids[slot])}   ({x:g}, {y:g}, {z:g})"
+        if role == Qt.DecorationRole:
+            return QColor.fromRgbF(*store.colors_of(slot).tolist())
+        if role == Qt.BackgroundRole and store.selected[slot]:
+            return SELECTED_BACKGROUND
+        return None
+
+    def slot(self, index) -> int:
+        """Строка хранилища для индекса модели или -1."""
+        if not index.isValid():
+            return -1
+        row = index.row()
+        if self._filtered is not None:
+            row = int(self._filtered[row]) if row < len(self._filtered) else -1
+        return row if 0 <= row < self.store.count else -1
+
+    def toggle_selection(self, index) -> None:
+        """Переключает выделение объекта строки index."""
+        slot = self.slot(index)
+        if slot >= 0:
+            store = self.store
+            store.set_selected([int(store.ids[slot])], not store.selected[slot])
+
+    # ----------------------------------------------------------------------
+    # Filter
+    # ----------------------------------------------------------------------
+
+    def set_filter(self, text: str) -> None:
+        """Фильтрует список запросом filter_mask; ValueError — запрос не разобран."""
+        mask = filter_mask(self.store, text)
+        self.beginResetModel()
+        self.filter_text = text
+        self._filtered = None if mask is None else np.flatnonzero(mask)
+        self._count = self.store.count
+        self.endResetModel()
+
+    def _schedule_refilter(self) -> None:
+        if not self._refilter_scheduled:
+            self._refilter_scheduled = True
+            QTimer.singleShot(0, self._refilter)
+
+    def _refilter(self) -> None:
+        """Пересчитывает отбор; если состав не изменился, только перерисовывает строки."""
+        self._refilter_scheduled = False
+        if self._filtered is None:
+            return
+        filtered = np.flatnonzero(filter_mask(self.store, self.filter_text))
+        if np.array_equal(filtered, self._filtered):
+            if len(filtered):
+                self.dataChanged.emit(self.index(0), self.index(len(filtered) - 1))
+            return
+        self.beginResetModel()
+        self._filtered = filtered
+        self._count = self.store.count
+        self.endResetModel()
+
+    # ----------------------------------------------------------------------
+    # VoxelStoreListener
+    # ----------------------------------------------------------------------
+
+    def rows_inserted(self, start: int, stop: int) -> None:
+        if self._filtered is not None:
+            self._count = self.store.count
+            self._schedule_refilter()
+            return
+        self.beginInsertRows(QModelIndex(), start, stop - 1)
+        self._count = stop
+        self.endInsertRows()
+
+    def rows_removed(self, start: int, stop: int) -> None:
+        if self._filtered is not None:
+            self._count = self.store.count
+            self._schedule_refilter()
+            return
+        self.beginRemoveRows(QModelIndex(), start, stop - 1)
+        self._count = start
+        self.endRemoveRows()
+
+    def rows_changed(self, slots) -> None:
+        if self._filtered is not None:
+            self._schedule_refilter()
+            return
+        if self._count == 0 or (slots is not None and len(slots) == 0):
+            return
+        if slots is None:
+            first, last = 0, self._count - 1
+        else:
+            first, last = int(slots.min()), min(int(slots.max()), self._count - 1)
+        self.dataChanged.emit(self.index(first), self.index(last))
+
+    def rows_reset(self) -> None:
+        self.beginResetModel()
+        self._count = 0
+        if self._filtered is not None:
+            self._filtered = np.zeros(0, dtype=np.int64)
+        self.endResetModel()
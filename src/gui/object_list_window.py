@@ -1,20 +1,24 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QScrollArea
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QLineEdit, QListView, QLabel, QAbstractItemView
 from PySide6.QtCore import Qt
 
+from .object_list_model import ObjectListModel
+
 
 class ObjectListWindow(QWidget):
     """
     Окно со списком объектов сцены.
-    Позволяет выделять объекты кликом по кнопкам и подсвечивает выделенные.
+    Клик по строке выделяет объект (или снимает выделение), выделенные
+    подсвечены. Строка поиска фильтрует список по цвету, координатам или id.
+    Список следит за сценой сам — перестраивать его после правок не нужно.
     """
 
     def __init__(self, scene):
         super().__init__()
         self.setWindowTitle("Object List")
-        self.resize(200, 400)
+        self.resize(260, 400)
 
         self.scene = scene
-        self.buttons: list[QPushButton] = []
+        self.model = ObjectListModel(scene.voxels, self)
 
         self._build_ui()
 
@@ -23,68 +27,54 @@ class ObjectListWindow(QWidget):
     # ----------------------------------------------------------------------
 
     def _build_ui(self):
-        """Создаёт ScrollArea с вертикальным layout для списка объектов."""
+        """Создаёт строку поиска, список (QListView над моделью) и счётчик строк."""
         self.main_layout = QVBoxLayout(self)
 
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.main_layout.addWidget(scroll)
-
-        content = QWidget()
-        self.scroll_layout = QVBoxLayout(content)
-        scroll.setWidget(content)
-
-        self.rebuild_list()
-
-    def clear_layout(self, layout):
-        """Полностью очищает переданный layout от виджетов."""
-        while layout.count():
-            item = layout.takeAt(0)
-            widget = item.widget()
-            if widget:
-                widget.setParent(None)
-                widget.deleteLater()
+        self.search = QLineEdit()
+        self.search.setPlaceholderText("#ff8800, x=0..5, 1 2 3, id")
+        self.search.setClearButtonEnabled(True)
+        self.search.setToolTip(
+            "#rrggbb[aa] — цвет, x=3 или z=-2..4 — координата,\n"
+            "три числа — позиция, одно число — id объекта"
+        )
+        self.search.textChanged.connect(self.apply_filter)
+        self.main_layout.addWidget(self.search)
+
+        # одинаковая высота строк: QListView не измеряет каждую строку;
+        # раскладка порциями — открытие окна не ждёт раскладки всего списка
+        self.view = QListView()
+        self.view.setUniformItemSizes(True)
+        self.view.setLayoutMode(QListView.Batched)
+        self.view.setModel(self.model)
+        self.view.setSelectionMode(QAbstractItemView.NoSelection)
+        self.view.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        self.view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.view.clicked.connect(self.model.toggle_selection)
+        self.main_layout.addWidget(self.view)
+
+        self.counter = QLabel()
+        self.main_layout.addWidget(self.counter)
+
+        self.model.rowsInserted.connect(self.update_counter)
+        self.model.rowsRemoved.connect(self.update_counter)
+        self.model.modelReset.connect(self.update_counter)
+        self.model.dataChanged.connect(self.update_counter)
+        self.update_counter()
 
     # ----------------------------------------------------------------------
-    # Object List Management
+    # Filter
     # ----------------------------------------------------------------------
 
-    def rebuild_list(self):
-        """Перестраивает список кнопок по текущим объектам сцены."""
-        self.clear_layout(self.scroll_layout)
-        self.buttons.clear()
-
-        for index, entity in enumerate(self.scene.entities):
-            name = f"voxel.{index}"
-
-            btn = QPushButton(name)
-            btn.setCheckable(True)
-            btn.entity_ref = entity  # ссылка на объект сцены
-            btn.index = index
-
-            # подсветка выделенных объектов
-            if getattr(entity, "is_selected", False):
-                btn.setStyleSheet("background-color: yellow;")
-                btn.setChecked(True)
-            else:
-                btn.setStyleSheet("background-color: lightgray;")
-                btn.setChecked(False)
-
-            btn.clicked.connect(lambda checked, b=btn: self.toggle_selection(b))
-
-            self.scroll_layout.addWidget(btn)
-            self.buttons.append(btn)
-
-        self.scroll_layout.addStretch()
-
-    def toggle_selection(self, btn):
-        """Меняет состояние выделения объекта и обновляет цвет кнопки."""
-        entity = btn.entity_ref
-        entity.is_selected = not entity.is_selected
-
-        if entity.is_selected:
-            btn.setStyleSheet("background-color: yellow;")
-        else:
-            btn.setStyleSheet("background-color: lightgray;")
+    def apply_filter(self, text: str):
+        """Фильтрует список; неразобранный запрос подсвечивает строку поиска."""
+        try:
+            self.model.set_filter(text)
+        except ValueError:
+            self.search.setStyleSheet("background-color: #ffd0d0;")
+            return
+        self.search.setStyleSheet("")
+
+    def update_counter(self, *args):
+        """Число строк списка (и всего объектов, если включён фильтр)."""
+        shown, total = self.model.rowCount(), len(self.scene.voxels)
+        self.counter.setText(f"{shown} objects" if shown == total else f"{shown} of {total} objects")
@@ -0,0 +1,48 @@
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel
+from PySide6.QtGui import QFont
+from PySide6.QtCore import Qt
+
+
+class ProfilerOverlay(QWidget):
+    """
+    Полупрозрачная панель поверх окна OpenGL: перцентили времени кадра
+    по фазам (FrameProfiler.phase_stats). Без рамки и фокуса — не мешает
+    управлению камерой; App ставит её в угол окна и обновляет раз в секунду.
+    """
+
+    def __init__(self):
+        super().__init__()
+
+        self.setWindowFlags(
+            Qt.Tool | Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.WindowDoesNotAcceptFocus
+        )
+        self.setAttribute(Qt.WA_ShowWithoutActivating)
+        self.setWindowOpacity(0.8)
+
+        self.setStyleSheet("""
+            QWidget {
+                background-color: #1e1e1e;
+                color: #d3d3d3;
+            }
+        """)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 6, 8, 6)
+
+        self.label = QLabel()
+        self.label.setFont(QFont("Monospace", 9))
+        self.label.setTextFormat(Qt.PlainText)
+        layout.addWidget(self.label)
+
+    # ----------------------------------------------------------------------
+
+    def update_stats(self, stats: dict[str, dict[str, float]]):
+        """Перерисовывает таблицу: фаза, p50 / p95 / p99 в миллисекундах."""
+        width = max([len(name) for name in stats] + [5])
+        lines = [f"{'phase':<{width}}  {'p50':>7} {'p95':>7} {'p99':>7}"]
+        for name, values in stats.items():
+            lines.append(
+                f"{name:<{width}}  {values['p50']:>7.2f} {values['p95']:>7.2f} {values['p99']:>7.2f}"
+            )
+        self.label.setText("\n".join(lines))
+        self.adjustSize()
@@ -1,8 +1,4 @@
 import sys
-import glfw
-from core.app import App
-from gui.hotkeys_window import HotkeysWindow
-from core.graphics_engine import initialize_glfw
 
 
 if __name__ == "__main__":
@@ -11,6 +7,13 @@ if __name__ == "__main__":
     Инициализирует GLFW, создает главное приложение и запускает цикл рендеринга.
     """
 
+    # Окно, OpenGL и Qt импортируются только здесь: процессы пула генерации
+    # (spawn) заново импортируют этот модуль, и им эти библиотеки не нужны
+    import glfw
+    from core.app import App
+    from gui.hotkeys_window import HotkeysWindow
+    from core.graphics_engine import initialize_glfw
+
     try:
         # Инициализация GLFW и создание окна OpenGL
         window = initialize_glfw()
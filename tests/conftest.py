@@ -0,0 +1,24 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# код лежит в src и импортируется как core.* (как при запуске main.py из src)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from core.voxel_store import KIND_CUBE  # noqa: E402
+
+
+@pytest.fixture
+def check_grid():
+    """Проверка, что сетка занятости сцены совпадает с колонками хранилища."""
+
+    def check(scene):
+        store = scene.voxels
+        cubes = store.kinds == KIND_CUBE
+        cells = scene.grid.cell_of(store.positions[cubes])
+        assert np.array_equal(scene.grid.get_many(cells), store.ids[cubes])
+        assert len(scene.grid) == int(np.count_nonzero(cubes))
+
+    return check
@@ -0,0 +1,82 @@
+import os
+import stat
+
+import numpy as np
+import pytest
+
+from core import scene_formats
+from core.autosave import Autosaver
+from core.scene import Scene
+from core.scene_formats import read_scene, write_scene_atomic
+
+
+def columns(count):
+    positions = np.stack([np.arange(count), np.zeros(count), np.zeros(count)], axis=1).astype(np.float32)
+    return (positions, np.zeros((count, 3), np.float32),
+            np.full((count, 4), 0.5, np.float32), np.zeros(count, np.uint8))
+
+
+def mode_of(path) -> int:
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+@pytest.mark.parametrize("name", ["scene.txt", "scene.voxb", "scene.voxc"])
+def test_atomic_write_replaces_file_without_leftovers(tmp_path, name):
+    path = str(tmp_path / name)
+    write_scene_atomic(path, *columns(3))
+    _, size = write_scene_atomic(path, *columns(5))
+
+    assert size == os.path.getsize(path)
+    assert len(read_scene(path)[3]) == 5
+    assert os.listdir(tmp_path) == [name]
+
+
+def test_new_file_gets_umask_mode(tmp_path):
+    path = str(tmp_path / "scene.voxb")
+    write_scene_atomic(path, *columns(2))
+    assert mode_of(path) == 0o666 & ~scene_formats._UMASK
+
+
+def test_existing_file_keeps_its_mode(tmp_path):
+    path = str(tmp_path / "scene.voxb")
+    write_scene_atomic(path, *columns(2))
+    os.chmod(path, 0o640)
+
+    write_scene_atomic(path, *columns(4))
+    assert mode_of(path) == 0o640
+
+
+def test_failed_write_keeps_previous_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "scene.voxb")
+    write_scene_atomic(path, *columns(3))
+    before = open(path, "rb").read()
+
+    def broken(filepath, *args, **kwargs):
+        with open(filepath, "wb") as f:
+            f.write(b"partial")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(scene_formats, "write_scene", broken)
+    with pytest.raises(OSError, match="disk full"):
+        write_scene_atomic(path, *columns(10))
+
+    assert open(path, "rb").read() == before
+    assert os.listdir(tmp_path) == ["scene.voxb"]
+
+
+def test_autosaver_writes_snapshot_taken_on_request(tmp_path):
+    scene = Scene()
+    saver = Autosaver(scene, str(tmp_path / "auto" / "scene.voxc"), interval=0)
+    assert not saver.tick()
+
+    scene.add_cubes(columns(4)[0])
+    assert saver.dirty
+
+    assert saver.tick()
+    # правки после снимка в этот файл уже не попадают
+    scene.remove_where(scene.voxels.ids[:2])
+    saver.close()
+
+    assert saver.last_error is None
+    assert len(read_scene(saver.filepath)[3]) == 4
+    assert saver.dirty
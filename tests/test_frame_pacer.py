@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from core.frame_pacer import FramePacer
+
+
+class FakeClock:
+    """Часы и «сон» для цикла, как в App.run: sleep только сдвигает время."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def run(pacer, clock, frame_cost, iterations=200, active=True, state=lambda i: 0):
+    """Главный цикл: решение о кадре, отрисовка (frame_cost(i) секунд), ожидание. Возвращает начала кадров."""
+    starts = []
+    for i in range(iterations):
+        now = clock.now
+        if pacer.should_render(state(i), active, now):
+            starts.append(now)
+            clock.now += frame_cost(len(starts) - 1)
+            pacer.frame_rendered(now)
+        timeout = pacer.timeout(clock.now)
+        if timeout > 0:
+            clock.sleep(timeout)
+    return np.array(starts)
+
+
+def test_capped_frames_start_on_interval_including_render_time():
+    pacer, clock = FramePacer(max_fps=60), FakeClock()
+    starts = run(pacer, clock, lambda frame: 0.004, iterations=120)
+
+    # время отрисовки входит в интервал: кадр стартует каждые 1/60 с, а не 1/60 + 4 мс
+    assert np.allclose(np.diff(starts), 1 / 60)
+    assert pacer.skipped == 0
+
+
+def test_slow_frame_does_not_delay_later_frames():
+    pacer, clock = FramePacer(max_fps=60), FakeClock()
+    slow = 10
+    starts = run(pacer, clock, lambda frame: 0.05 if frame == slow else 0.002, iterations=60)
+
+    gaps = np.diff(starts)
+    assert np.allclose(gaps[:slow], 1 / 60)
+    # после долгого кадра следующий начинается сразу, без ожидания
+    assert np.isclose(gaps[slow], 0.05)
+    # а дальше — снова ровно через интервал: отставание не копится и не догоняется пачкой кадров
+    assert np.allclose(gaps[slow + 1:], 1 / 60)
+
+
+def test_uncapped_pacer_never_sleeps_while_active():
+    pacer, clock = FramePacer(max_fps=0), FakeClock()
+    assert pacer.frame_interval == 0
+    starts = run(pacer, clock, lambda frame: 0.003, iterations=100)
+
+    assert len(starts) == 100
+    assert clock.sleeps == []
+    assert np.allclose(np.diff(starts), 0.003)
+
+
+def test_idle_pacer_waits_for_events_without_rendering():
+    pacer, clock = FramePacer(max_fps=60, idle_timeout=0.25), FakeClock()
+    starts = run(pacer, clock, lambda frame: 0.002, iterations=20, active=False)
+
+    # первый кадр рисуется всегда, дальше состояние не меняется
+    assert len(starts) == 1 and pacer.skipped == 19
+    assert clock.sleeps[1:] == [0.25] * 19
+
+
+@pytest.mark.parametrize("max_fps", [0, 60])
+def test_state_change_and_redraw_request_render_once(max_fps):
+    pacer, clock = FramePacer(max_fps=max_fps), FakeClock()
+    starts = run(pacer, clock, lambda frame: 0.001, iterations=30, active=False, state=lambda i: i // 10)
+    assert len(starts) == 3
+
+    pacer.request_redraw()
+    assert pacer.timeout(clock.now) == pytest.approx(max(0.0, starts[-1] + pacer.frame_interval - clock.now))
+    assert len(run(pacer, clock, lambda frame: 0.001, iterations=5, active=False, state=lambda i: 2)) == 1
@@ -0,0 +1,78 @@
+import numpy as np
+import pyrr
+import pytest
+
+from core.frustum import boxes_in_frustum, frustum_planes
+
+NEAR, FAR = 0.1, 100.0
+
+
+def camera_planes(eye=(0, 0, 0), target=(0, 0, -1)):
+    """Пирамида камеры, как её строит Graphics_Engine: 90° по вертикали, 4:3."""
+    projection = pyrr.matrix44.create_perspective_projection(90, 4 / 3, NEAR, FAR, dtype=np.float32)
+    view = pyrr.matrix44.create_look_at(np.float32(eye), np.float32(target), np.float32([0, 1, 0]), dtype=np.float32)
+    return frustum_planes(projection, view), projection, view
+
+
+def box(center, half=0.5):
+    center = np.asarray(center, dtype=np.float64)
+    return center - half, center + half
+
+
+def test_planes_are_normalised_and_face_inwards():
+    planes, _, _ = camera_planes()
+    assert planes.shape == (6, 4)
+    assert np.allclose(np.linalg.norm(planes[:, :3], axis=1), 1)
+    # точка на оси взгляда — внутри всех шести плоскостей
+    assert np.all(planes[:, :3] @ [0, 0, -10] + planes[:, 3] > 0)
+    # ближняя и дальняя плоскости — на расстоянии NEAR и FAR
+    assert np.isclose(planes[4, 3], -NEAR, atol=1e-4) and np.isclose(planes[5, 3], FAR, atol=1e-3)
+
+
+@pytest.mark.parametrize("center, half, visible", [
+    ((0, 0, -10), 0.5, True),       # прямо перед камерой
+    ((0, 0, 10), 0.5, False),       # за спиной
+    ((0, 0, -150), 0.5, False),     # дальше far
+    ((0, 0, -0.1), 0.05, True),     # пересекает near
+    ((0, 0, -100), 1.0, True),      # пересекает far
+    ((-40, 0, -10), 0.5, False),    # левее пирамиды
+    ((0, 30, -10), 0.5, False),     # выше пирамиды
+    ((-13.3, 0, -10), 0.5, True),   # пересекает левую плоскость (край на x = -13.33)
+    ((0, -10.2, -10), 0.5, True),   # пересекает нижнюю плоскость (край на y = -10)
+    ((0, 0, -10), 50.0, True),      # камера внутри бокса
+])
+def test_known_boxes(center, half, visible):
+    planes, _, _ = camera_planes()
+    mins, maxs = box(center, half)
+    assert boxes_in_frustum(planes, mins[None], maxs[None]).tolist() == [visible]
+
+
+def test_rotated_camera():
+    planes, _, _ = camera_planes(eye=(5, 2, 5), target=(10, 2, 5))
+    mins, maxs = np.array([box((20, 2, 5)), box((-5, 2, 5))]).transpose(1, 0, 2)
+    assert boxes_in_frustum(planes, mins, maxs).tolist() == [True, False]
+
+
+def test_batch_matches_per_box_and_clip_space():
+    rng = np.random.default_rng(10)
+    planes, projection, view = camera_planes(eye=(1, 2, 3), target=(4, 0, -20))
+    centers = rng.uniform(-80, 80, size=(3000, 3))
+    halves = rng.uniform(0.05, 4, size=(3000, 1))
+    mins, maxs = centers - halves, centers + halves
+
+    batch = boxes_in_frustum(planes, mins, maxs)
+    single = [bool(boxes_in_frustum(planes, mins[i:i + 1], maxs[i:i + 1])[0]) for i in range(len(mins))]
+    assert batch.tolist() == single
+
+    # все 8 вершин в clip-пространстве: внутри хоть одна — бокс виден;
+    # все за одной плоскостью — не виден
+    corners = np.stack([np.where([(i >> a) & 1 for a in range(3)], maxs, mins) for i in range(8)], axis=1)
+    clip = np.concatenate([corners, np.ones(corners.shape[:2] + (1,))], axis=2) @ (view @ projection)
+    x, y, z, w = np.moveaxis(clip, 2, 0)
+    tests = np.stack([w + x, w - x, w + y, w - y, w + z, w - z], axis=2)   # (N, 8, 6)
+    any_corner_inside = np.any(np.all(tests >= 0, axis=2), axis=1)
+    all_behind_one_plane = np.any(np.all(tests < 0, axis=1), axis=1)
+
+    assert np.all(batch[any_corner_inside])
+    assert not np.any(batch[all_behind_one_plane])
+    assert any_corner_inside.sum() > 50 and all_behind_one_plane.sum() > 50
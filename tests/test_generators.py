@@ -0,0 +1,112 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from core.generators import Box, ProceduralGenerator, Sphere, Terrain, TERRAIN_BANDS
+from core.scene import Scene
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+def generate_inline(shape):
+    """Все области фигуры по очереди в этом процессе: (клетки, номера цветов)."""
+    parts = [shape.generate(lo, hi) for lo, hi in shape.regions()]
+    return np.concatenate([cells for cells, _ in parts]), np.concatenate([materials for _, materials in parts])
+
+
+def small_terrain(**kwargs):
+    options = dict(size=(40, 36), height=24, seed=3, scale=16.0)
+    options.update(kwargs)
+    return Terrain(**options)
+
+
+def test_terrain_output_shapes_and_dtypes():
+    terrain = small_terrain()
+    cells, materials = terrain.generate(*terrain.regions()[0])
+
+    assert cells.ndim == 2 and cells.shape[1] == 3 and cells.dtype == np.int32
+    assert materials.shape == (len(cells),) and materials.dtype == np.uint8
+    assert materials.max() < len(TERRAIN_BANDS) == len(terrain.palette)
+    lo, hi = terrain.bounds()
+    assert np.all(cells >= lo) and np.all(cells < hi)
+
+
+@pytest.mark.parametrize("fill", ["surface", "solid"])
+def test_terrain_same_seed_is_identical(fill):
+    first = generate_inline(small_terrain(fill=fill))
+    second = generate_inline(small_terrain(fill=fill))
+    assert np.array_equal(first[0], second[0]) and np.array_equal(first[1], second[1])
+
+
+def test_terrain_different_seeds_differ():
+    first, _ = generate_inline(small_terrain(seed=1))
+    second, _ = generate_inline(small_terrain(seed=2))
+    assert first.shape != second.shape or not np.array_equal(first, second)
+
+
+@pytest.mark.parametrize("shape", [
+    small_terrain(),
+    small_terrain(fill="solid", origin=(-5, 2, 7)),
+    Sphere((3, -2, 40), 9.5, hollow=True),
+    Box((-35, 0, 0), (1, 3, 2)),
+])
+def test_no_duplicate_cells_across_regions(shape):
+    cells, _ = generate_inline(shape)
+    assert len(cells) > 0
+    assert len(np.unique(cells, axis=0)) == len(cells)
+
+
+def test_solid_terrain_fills_columns_to_surface():
+    terrain = small_terrain(fill="solid")
+    cells, _ = generate_inline(terrain)
+    x, z = np.meshgrid(np.arange(40), np.arange(36), indexing="ij")
+    assert len(cells) == int(terrain.heights(x, z).sum())
+
+
+def test_sphere_matches_brute_force():
+    sphere = Sphere((1.5, 0, -2), 4.2)
+    cells, _ = generate_inline(sphere)
+    grid = np.stack(np.meshgrid(*[np.arange(-10, 11)] * 3, indexing="ij"), axis=-1).reshape(-1, 3)
+    inside = grid[np.linalg.norm(grid - sphere.center, axis=1) <= sphere.radius]
+    assert sorted(map(tuple, cells.tolist())) == sorted(map(tuple, inside.tolist()))
+
+
+def test_pool_matches_inline_and_is_one_undo_entry():
+    terrain = small_terrain()
+    cells, materials = generate_inline(terrain)
+
+    scene = Scene()
+    generator = ProceduralGenerator(workers=2)
+    try:
+        job = generator.generate(scene, terrain)
+        while generator.busy:
+            generator.tick(budget=0.05)
+    finally:
+        generator.close()
+
+    store = scene.voxels
+    assert job.added == len(cells)
+    assert np.array_equal(store.positions, cells.astype(np.float32))
+    assert np.array_equal(store.colors, terrain.palette[materials])
+
+    assert len(scene.history._undo) == 1
+    assert scene.history.undo(scene)
+    assert len(store) == 0
+
+
+def test_spawned_modules_stay_light():
+    # процессы пула (spawn) импортируют main.py заново как __mp_main__
+    # и core.generators — окно, OpenGL и Qt им грузить нельзя
+    script = (
+        "import runpy, sys\n"
+        "runpy.run_path('main.py', run_name='__mp_main__')\n"
+        "import core.generators\n"
+        "heavy = [name for name in ('glfw', 'OpenGL', 'PySide6', 'core.app') if name in sys.modules]\n"
+        "print(','.join(heavy))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=SRC, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
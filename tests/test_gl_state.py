@@ -0,0 +1,133 @@
+import collections
+
+import numpy as np
+import pytest
+
+from core import gl_state
+from core.gl_state import GLState, RenderQueue
+
+
+@pytest.fixture
+def gl(monkeypatch):
+    """Заглушки вызовов OpenGL в gl_state: контекст не нужен, вызовы считаются."""
+    calls = collections.Counter()
+    uniforms = {"model": 0, "color": 1, "sampler": 2}
+
+    def stub(name, result=None):
+        def call(*args):
+            calls[name] += 1
+            return result(*args) if result else None
+        monkeypatch.setattr(gl_state, name, call)
+
+    stub("glUseProgram")
+    stub("glBindVertexArray")
+    stub("glGetUniformLocation", lambda program, name: uniforms.get(name, -1))
+    stub("glUniformMatrix4fv")
+    stub("glUniform4fv")
+    stub("glUniform1i")
+    stub("glDrawArrays")
+    stub("glDrawArraysInstanced")
+    stub("glDrawElements")
+    return calls
+
+
+def test_repeated_bindings_are_skipped(gl):
+    state = GLState()
+    for program in (3, 3, 4, 4, 3):
+        state.use_program(program)
+    for vertex_array in (7, 7, 7):
+        state.bind_vertex_array(vertex_array)
+
+    assert gl["glUseProgram"] == 3 and gl["glBindVertexArray"] == 1
+    assert state.frame_stats["skipped"] == 4
+
+    state.invalidate_bindings()
+    state.use_program(3)
+    state.bind_vertex_array(7)
+    assert gl["glUseProgram"] == 4 and gl["glBindVertexArray"] == 2
+
+
+def test_uniform_locations_are_cached_per_program(gl):
+    state = GLState()
+    for program in (1, 2, 1, 2):
+        state.use_program(program)
+        state.uniform1i("sampler", program)
+        state.uniform4("missing", np.zeros(4))
+
+    assert gl["glGetUniformLocation"] == 4       # (2 программы) × (2 имени)
+    assert gl["glUniform1i"] == 2                 # значение в каждой программе своё и не менялось
+    assert state.location(1, "missing") == -1
+
+
+def test_same_uniform_value_is_not_uploaded_again(gl):
+    state = GLState()
+    state.use_program(1)
+    identity = np.eye(4)
+    state.uniform_matrix4("model", identity)
+    state.uniform_matrix4("model", identity.astype(np.float32))
+    state.uniform_matrix4("model", identity * 2)
+    state.uniform4("color", [1, 0, 0, 1])
+    state.uniform4("color", np.float32([1, 0, 0, 1]))
+
+    assert gl["glUniformMatrix4fv"] == 2 and gl["glUniform4fv"] == 1
+    assert state.frame_stats["uniform_uploads"] == 3 and state.frame_stats["skipped"] == 2
+
+
+def test_frame_stats_roll_over(gl):
+    state = GLState()
+    state.use_program(1)
+    state.bind_vertex_array(2)
+    state.uniform1i("sampler", 0)
+    state.draw_arrays(0, 0, 36)
+    state.draw_arrays_instanced(0, 0, 36, 10)
+    state.draw_elements(0, 600, 0)
+    state.begin_frame()
+
+    stats = state.last_frame_stats
+    assert stats["draw_calls"] == 3 and stats["vertices"] == 36 + 360 + 600
+    assert state.state_changes == 3
+    assert state.frame_stats["draw_calls"] == 0
+
+
+def test_render_queue_sorts_by_program_material_mesh():
+    queue = RenderQueue()
+    queue.submit(2, [5, 1, 5], [0, 9, 3], [10, 11, 12])
+    queue.submit(1, 7, [4, 2], [20, 21])
+    queue.submit(2, 1, 9, [30])
+    assert len(queue) == 6
+
+    programs, materials, meshes, items = queue.sorted()
+    assert programs.tolist() == [1, 1, 2, 2, 2, 2]
+    assert materials.tolist() == [7, 7, 1, 1, 5, 5]
+    assert meshes.tolist() == [2, 4, 9, 9, 0, 3]
+    # равные ключи — в порядке отправки
+    assert items.tolist() == [21, 20, 11, 30, 10, 12]
+
+    queue.clear()
+    assert len(queue) == 0 and all(len(column) == 0 for column in queue.sorted())
+
+
+def test_sorted_queue_minimises_state_changes(gl):
+    rng = np.random.default_rng(11)
+    queue = RenderQueue()
+    for program in (1, 2, 1, 2):
+        count = 50
+        queue.submit(program, rng.integers(0, 4, count), rng.integers(0, 3, count), np.arange(count))
+
+    def draw(programs, materials, meshes):
+        gl.clear()
+        state = GLState()
+        for program, material, mesh in zip(programs.tolist(), materials.tolist(), meshes.tolist()):
+            state.use_program(program)
+            state.bind_vertex_array(mesh)
+            state.uniform4("color", np.full(4, material, dtype=np.float32))
+            state.draw_arrays(0, 0, 36)
+        return gl["glUseProgram"] + gl["glBindVertexArray"] + gl["glUniform4fv"]
+
+    programs, materials, meshes, _ = queue.sorted()
+    unsorted = [np.concatenate(column) for column in (queue._programs, queue._materials, queue._meshes)]
+    sorted_changes = draw(programs, materials, meshes)
+
+    # программы 2 + материалы ≤ 2×4 + меши ≤ 2×4×3
+    assert sorted_changes <= 2 + 8 + 24
+    assert sorted_changes < draw(*unsorted)
@@ -0,0 +1,187 @@
+import numpy as np
+
+from core.history import EditGroup, History, MoveEdit
+from core.scene import Scene
+
+
+def snapshot(scene, selection=True):
+    """
+    Состояние сцены по id: позиции, углы, цвета и выделение. Смена
+    выделения в журнал не пишется, поэтому после произвольных правок
+    сравнивается состояние без него (selection=False).
+    """
+    store = scene.voxels
+    order = np.argsort(store.ids)
+    state = (store.ids[order].copy(), store.positions[order].copy(), store.eulers[order].copy(),
+             store.colors[order])
+    return state + (store.selected[order].copy(),) if selection else state
+
+
+def assert_same_state(a, b):
+    for left, right in zip(a, b):
+        assert np.array_equal(left, right)
+
+
+def line(count, y=0):
+    return np.stack([np.arange(count), np.full(count, y), np.zeros(count)], axis=1).astype(np.float32)
+
+
+def test_undo_redo_insert_keeps_ids(check_grid):
+    scene = Scene()
+    ids = scene.add_cubes(line(3), colors=(1, 0, 0, 1))
+
+    assert scene.history.undo(scene)
+    assert len(scene.voxels) == 0 and len(scene.grid) == 0
+    assert scene.history.redo(scene)
+    assert sorted(scene.voxels.ids.tolist()) == ids.tolist()
+    assert scene.voxels.colors.tolist() == [[1, 0, 0, 1]] * 3
+    check_grid(scene)
+
+
+def test_undo_remove_restores_columns(check_grid):
+    scene = Scene()
+    scene.add_cubes(line(4), colors=[(1, 0, 0, 1), (0, 1, 0, 1), (0, 0, 1, 1), (1, 1, 1, 1)], selected=True)
+    before = snapshot(scene)
+
+    scene.remove_where(scene.voxels.ids[1:3])
+    assert scene.history.undo(scene)
+    assert_same_state(before, snapshot(scene))
+    assert sorted(scene.selected_ids().tolist()) == [0, 1, 2, 3]
+    check_grid(scene)
+
+
+def test_new_edit_drops_redo():
+    scene = Scene()
+    scene.add_cubes(line(2))
+    scene.history.undo(scene)
+    assert scene.history.can_redo
+
+    scene.add_cubes(line(1, y=5))
+    assert not scene.history.can_redo
+    assert not scene.history.redo(scene)
+
+
+def test_group_is_one_entry_with_merged_moves(check_grid):
+    scene = Scene()
+    ids = scene.add_cubes(line(3))
+    start = snapshot(scene)
+
+    scene.history.begin_group()
+    for _ in range(5):
+        scene.translate(ids, [0, 1, 0])
+    scene.recolor(ids[:1], (1, 0, 0, 1))
+    scene.history.end_group()
+
+    group = scene.history._undo[-1]
+    assert isinstance(group, EditGroup)
+    # пять сдвигов склеились в один MoveEdit
+    assert [type(edit).__name__ for edit in group.edits] == ["MoveEdit", "RecolorEdit"]
+
+    assert scene.history.undo(scene)
+    assert_same_state(start, snapshot(scene))
+    check_grid(scene)
+    assert scene.history.redo(scene)
+    assert scene.voxels.positions[:, 1].tolist() == [5, 5, 5]
+    check_grid(scene)
+
+
+def test_move_merge_keeps_earliest_before_and_latest_after():
+    first = MoveEdit(np.array([1, 2]), np.float32([[0, 0, 0], [1, 0, 0]]), np.float32([[0, 1, 0], [1, 1, 0]]))
+    second = MoveEdit(np.array([2, 3]), np.float32([[1, 1, 0], [2, 0, 0]]), np.float32([[1, 2, 0], [2, 2, 0]]))
+    assert first.merge(second)
+
+    assert first.ids.tolist() == [1, 2, 3]
+    assert first.before.tolist() == [[0, 0, 0], [1, 0, 0], [2, 0, 0]]
+    assert first.after.tolist() == [[0, 1, 0], [1, 2, 0], [2, 2, 0]]
+
+
+def test_collect_keeps_background_edits_out_of_the_journal():
+    scene = Scene()
+    group = EditGroup()
+
+    with scene.history.collect(group):
+        scene.add_cubes(line(3))
+    scene.add_cubes(line(2, y=4))
+    with scene.history.collect(group):
+        scene.add_cubes(line(3, y=8))
+
+    assert len(scene.history._undo) == 1
+    scene.history.record(group)
+    assert len(scene.voxels) == 8
+
+    assert scene.history.undo(scene)
+    assert sorted(scene.voxels.positions[:, 1].tolist()) == [4, 4]
+    assert scene.history.undo(scene)
+    assert len(scene.voxels) == 0
+
+
+def test_byte_budget_drops_oldest_entries():
+    scene = Scene()
+    scene.history = History(max_bytes=4000)
+    for y in range(20):
+        scene.add_cubes(line(10, y=y))
+
+    history = scene.history
+    assert 0 < len(history._undo) < 20
+    assert history.nbytes <= history.max_bytes
+    assert history.nbytes == sum(edit.nbytes() for edit in history._undo)
+
+    while history.undo(scene):
+        pass
+    # самые старые вставки уже не отменить
+    assert len(scene.voxels) == 10 * (20 - len(history._redo))
+    assert history.nbytes == sum(edit.nbytes() for edit in history._redo)
+
+
+def test_recolor_undo_on_both_palette_paths():
+    scene = Scene()
+    ids = scene.add_cubes(line(4), colors=(1, 0, 0, 1))
+    start = snapshot(scene)
+
+    # все объекты записи палитры — перекрашивается сама запись
+    scene.recolor(ids, (0, 1, 0, 1))
+    # часть объектов — переводятся на новую запись
+    scene.recolor(ids[:2], (0, 0, 1, 1))
+
+    assert scene.history.undo(scene)
+    assert scene.voxels.colors[:, :3].tolist() == [[0, 1, 0]] * 4
+    assert scene.history.undo(scene)
+    assert_same_state(start, snapshot(scene))
+
+
+def test_random_edits_undo_and_redo_exactly(check_grid):
+    rng = np.random.default_rng(6)
+    scene = Scene()
+    scene.add_cubes(rng.integers(-10, 10, size=(150, 3)).astype(np.float32), selected=True)
+    scene.history.clear()
+    start = snapshot(scene, selection=False)
+
+    for step in range(60):
+        ids = scene.voxels.ids
+        picked = rng.choice(ids, size=min(len(ids), 12), replace=False)
+        action = step % 7
+        if action == 0:
+            scene.translate(picked, rng.integers(-2, 3, size=3))
+        elif action == 1:
+            scene.rotate90(picked, axis=int(rng.integers(3)))
+        elif action == 2:
+            scene.recolor(picked, rng.random(4).astype(np.float32))
+        elif action == 3:
+            scene.remove_ids(picked[:4])
+        elif action == 4:
+            scene.add_cubes(rng.integers(-10, 10, size=(8, 3)).astype(np.float32))
+        elif action == 5:
+            scene.set_eulers(picked, rng.uniform(0, 360, size=(len(picked), 3)))
+        else:
+            scene.duplicate(picked, [0, 0, 1])
+    end = snapshot(scene, selection=False)
+
+    while scene.history.undo(scene):
+        pass
+    assert_same_state(start, snapshot(scene, selection=False))
+    check_grid(scene)
+
+    while scene.history.redo(scene):
+        pass
+    assert_same_state(end, snapshot(scene, selection=False))
+    check_grid(scene)
@@ -0,0 +1,156 @@
+import glfw.GLFW as G
+import pytest
+
+from core import input as input_module
+from core.input import (
+    DEFAULT_BINDINGS, DEVICE_KEY, DEVICE_MOUSE, DEVICE_SCROLL, PRESS, RELEASE, REPEAT,
+    InputQueue, Keymap, parse_chord,
+)
+
+CTRL, SHIFT, ALT = G.GLFW_MOD_CONTROL, G.GLFW_MOD_SHIFT, G.GLFW_MOD_ALT
+
+
+@pytest.mark.parametrize("text, chord", [
+    ("Z", (DEVICE_KEY, G.GLFW_KEY_Z, 0)),
+    ("Ctrl+Shift+Z", (DEVICE_KEY, G.GLFW_KEY_Z, CTRL | SHIFT)),
+    ("shift + ctrl + z", (DEVICE_KEY, G.GLFW_KEY_Z, CTRL | SHIFT)),
+    ("Alt+F12", (DEVICE_KEY, G.GLFW_KEY_F12, ALT)),
+    ("LeftShift", (DEVICE_KEY, G.GLFW_KEY_LEFT_SHIFT, 0)),
+    ("PageUp", (DEVICE_KEY, G.GLFW_KEY_PAGE_UP, 0)),
+    ("=", (DEVICE_KEY, G.GLFW_KEY_EQUAL, 0)),
+    ("Esc", (DEVICE_KEY, G.GLFW_KEY_ESCAPE, 0)),
+    ("Ctrl+MouseLeft", (DEVICE_MOUSE, G.GLFW_MOUSE_BUTTON_LEFT, CTRL)),
+    ("mouseright", (DEVICE_MOUSE, G.GLFW_MOUSE_BUTTON_RIGHT, 0)),
+    ("Shift+Scroll", (DEVICE_SCROLL, 0, SHIFT)),
+])
+def test_parse_chord(text, chord):
+    assert parse_chord(text) == chord
+
+
+@pytest.mark.parametrize("text, message", [
+    ("Hyper+Z", "unknown modifier"),
+    ("Ctrl+NoSuchKey", "unknown key"),
+    ("Ctrl+", "unknown key"),
+    ("", "unknown key"),
+])
+def test_parse_chord_rejects_invalid(text, message):
+    with pytest.raises(ValueError, match=message):
+        parse_chord(text)
+
+
+def test_default_bindings_parse():
+    keymap = Keymap()
+    assert keymap.bindings == DEFAULT_BINDINGS
+    assert "select.pick_add" in keymap.actions(DEVICE_MOUSE, G.GLFW_MOUSE_BUTTON_LEFT, CTRL)
+
+
+def test_modifiers_match_exactly():
+    keymap = Keymap({"undo": ["Ctrl+Z"], "redo": ["Ctrl+Shift+Z"]})
+    assert keymap.actions(DEVICE_KEY, G.GLFW_KEY_Z, CTRL) == ("undo",)
+    assert keymap.actions(DEVICE_KEY, G.GLFW_KEY_Z, CTRL | SHIFT) == ("redo",)
+    assert keymap.actions(DEVICE_KEY, G.GLFW_KEY_Z, 0) == ()
+    # Caps Lock / Num Lock не мешают сочетанию
+    assert keymap.actions(DEVICE_KEY, G.GLFW_KEY_Z, CTRL | G.GLFW_MOD_CAPS_LOCK) == ("undo",)
+
+
+def test_rebinding_shared_and_moved_chords():
+    keymap = Keymap({"select.sphere": ["R"], "edit.rotate": ["R"]})
+    r = (DEVICE_KEY, G.GLFW_KEY_R, 0)
+    assert keymap.actions(*r) == ("select.sphere", "edit.rotate")
+
+    keymap.bind("select.sphere", "Ctrl+R", "F")
+    assert keymap.actions(*r) == ("edit.rotate",)
+    assert keymap.actions(DEVICE_KEY, G.GLFW_KEY_R, CTRL) == ("select.sphere",)
+    assert keymap.inputs("select.sphere") == {(DEVICE_KEY, G.GLFW_KEY_R), (DEVICE_KEY, G.GLFW_KEY_F)}
+
+    keymap.unbind("edit.rotate")
+    assert keymap.actions(*r) == ()
+    assert keymap.inputs("edit.rotate") == set()
+
+
+def test_bad_chord_leaves_binding_untouched():
+    keymap = Keymap({"undo": ["Ctrl+Z"]})
+    with pytest.raises(ValueError):
+        keymap.bind("undo", "Ctrl+Nope")
+    assert keymap.actions(DEVICE_KEY, G.GLFW_KEY_Z, CTRL) == ("undo",)
+
+
+def test_save_load_round_trip(tmp_path):
+    path = str(tmp_path / "keymap.json")
+    keymap = Keymap.load(path)
+    assert keymap.bindings == DEFAULT_BINDINGS
+
+    keymap.bind("edit.undo", "Alt+Backspace")
+    keymap.bind("camera.forward", "Up", "W")
+    keymap.save(path)
+
+    loaded = Keymap.load(path)
+    assert loaded.bindings == keymap.bindings
+    assert loaded.actions(DEVICE_KEY, G.GLFW_KEY_BACKSPACE, ALT) == ("edit.undo",)
+    assert loaded.actions(DEVICE_KEY, G.GLFW_KEY_Z, CTRL) == keymap.actions(DEVICE_KEY, G.GLFW_KEY_Z, CTRL)
+
+
+def test_load_accepts_single_chord_string(tmp_path):
+    path = tmp_path / "keymap.json"
+    path.write_text('{"edit.undo": "Ctrl+U"}', encoding="utf-8")
+    keymap = Keymap.load(str(path))
+    assert keymap.bindings["edit.undo"] == ["Ctrl+U"]
+    assert "edit.undo" not in keymap.actions(DEVICE_KEY, G.GLFW_KEY_Z, CTRL)
+
+
+# ----------------------------------------------------------------------
+# Очередь ввода (обратные вызовы GLFW зовутся напрямую, окна нет)
+# ----------------------------------------------------------------------
+
+@pytest.fixture
+def queue(monkeypatch):
+    for name in ("set_key_callback", "set_mouse_button_callback", "set_scroll_callback",
+                 "set_window_focus_callback"):
+        monkeypatch.setattr(input_module.glfw, name, lambda *args: None)
+    monkeypatch.setattr(input_module.glfw, "get_cursor_pos", lambda window: (10.0, 20.0))
+    keymap = Keymap({"camera.forward": ["W"], "edit.place": ["MouseRight"],
+                     "select.pick_add": ["Ctrl+MouseLeft"], "camera.zoom": ["Scroll"]})
+    return InputQueue(object(), keymap)
+
+
+def test_queue_keeps_event_order(queue):
+    queue._on_key(None, G.GLFW_KEY_W, 0, PRESS, 0)
+    queue._on_mouse_button(None, G.GLFW_MOUSE_BUTTON_RIGHT, PRESS, 0)
+    queue._on_key(None, G.GLFW_KEY_W, 0, REPEAT, 0)
+    queue._on_mouse_button(None, G.GLFW_MOUSE_BUTTON_RIGHT, RELEASE, 0)
+    queue._on_key(None, G.GLFW_KEY_W, 0, RELEASE, 0)
+    queue._on_key(None, G.GLFW_KEY_Q, 0, PRESS, 0)     # не назначена
+
+    events = queue.take_events()
+    assert [(e.actions, e.type) for e in events] == [
+        (("camera.forward",), PRESS), (("edit.place",), PRESS), (("camera.forward",), REPEAT),
+        (("edit.place",), RELEASE), (("camera.forward",), RELEASE),
+    ]
+    assert (events[0].x, events[0].y) == (10.0, 20.0)
+    assert queue.take_events() == []
+
+
+def test_queue_held_and_focus_loss(queue):
+    queue._on_key(None, G.GLFW_KEY_W, 0, PRESS, 0)
+    assert queue.held("camera.forward") and queue.any_held
+    queue._on_key(None, G.GLFW_KEY_W, 0, RELEASE, 0)
+    assert not queue.held("camera.forward")
+
+    queue._on_key(None, G.GLFW_KEY_W, 0, PRESS, SHIFT)
+    # удержание не зависит от модификаторов
+    assert queue.held("camera.forward")
+    queue._on_focus(None, False)
+    assert not queue.any_held
+
+
+def test_queue_modifiers_for_mouse_and_scroll(queue):
+    queue._on_key(None, G.GLFW_KEY_LEFT_CONTROL, 0, PRESS, CTRL)
+    queue._on_mouse_button(None, G.GLFW_MOUSE_BUTTON_LEFT, PRESS, CTRL | G.GLFW_MOD_NUM_LOCK)
+    queue._on_scroll(None, 0.0, 1.5)
+    queue._on_key(None, G.GLFW_KEY_LEFT_CONTROL, 0, RELEASE, 0)
+    queue._on_scroll(None, 0.0, -1.0)
+
+    events = queue.take_events()
+    assert [e.actions for e in events] == [("select.pick_add",), ("camera.zoom",)]
+    assert events[0].mods == CTRL
+    assert events[1].amount == -1.0 and events[1].mods == 0
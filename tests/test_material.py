@@ -0,0 +1,65 @@
+import numpy as np
+
+from core.material import MaterialPalette
+from core.scene import Scene
+
+RED, GREEN, BLUE = (1, 0, 0, 1), (0, 1, 0, 1), (0, 0, 1, 1)
+
+
+def test_intern_deduplicates_and_counts_refs():
+    palette = MaterialPalette(capacity=1)
+    indices = palette.intern([RED, GREEN, RED, BLUE, RED])
+
+    assert len(palette) == 3
+    assert palette.colors[indices].tolist() == [list(c) for c in (RED, GREEN, RED, BLUE, RED)]
+    assert palette.counts[indices[0]] == 3
+    assert palette.intern([GREEN]).tolist() == [indices[1]]
+    assert palette.counts[indices[1]] == 2
+
+
+def test_released_entries_are_reused():
+    palette = MaterialPalette()
+    red, green = palette.intern([RED, GREEN]).tolist()
+
+    palette.release([red])
+    assert palette.find(RED) == -1 and len(palette) == 1
+    assert palette.intern([BLUE]).tolist() == [red]
+    assert palette.size == 2
+    assert palette.find(GREEN) == green
+
+
+def test_bitwise_distinct_colors_stay_apart():
+    palette = MaterialPalette()
+    indices = palette.intern(np.float32([[0.0, 0, 0, 1], [-0.0, 0, 0, 1]]))
+    assert indices[0] != indices[1]
+
+
+def test_set_color_recolors_entry_in_place():
+    palette = MaterialPalette()
+    red, green = palette.intern([RED, GREEN]).tolist()
+    revision = palette.revision
+
+    assert palette.set_color(red, BLUE)
+    assert palette.find(BLUE) == red and palette.find(RED) == -1
+    assert palette.revision == revision + 1
+    # такой цвет уже есть в другой записи
+    assert not palette.set_color(red, GREEN)
+    assert palette.colors[red].tolist() == list(BLUE)
+
+
+def test_store_refcounts_match_rows():
+    rng = np.random.default_rng(7)
+    scene = Scene()
+    colors = np.float32([RED, GREEN, BLUE])
+
+    for _ in range(20):
+        positions = rng.integers(-10, 10, size=(30, 3)).astype(np.float32)
+        scene.add_cubes(positions, colors[rng.integers(0, 3, 30)])
+        ids = scene.voxels.ids
+        scene.remove_ids(rng.choice(ids, size=len(ids) // 3, replace=False))
+        scene.recolor(rng.choice(scene.voxels.ids, size=5, replace=False), colors[rng.integers(0, 3)])
+
+        store = scene.voxels
+        palette = store.palette
+        assert np.array_equal(palette.counts, np.bincount(store.materials, minlength=palette.size))
+        assert len(palette) == len(np.unique(store.materials))
@@ -0,0 +1,84 @@
+import numpy as np
+
+from core.mesher import greedy_mesh, mesh_scene_chunk, FLOATS_PER_VERTEX
+from core.scene import Scene
+from core.voxel_grid import CHUNK_SIZE
+
+SIZE = 4
+
+
+def chunk(filled):
+    """labels и occupied чанка SIZE³ без соседей; filled — {клетка: материал}."""
+    labels = np.full((SIZE,) * 3, -1, dtype=np.int64)
+    for cell, material in filled.items():
+        labels[cell] = material
+    occupied = np.zeros((SIZE + 2,) * 3, dtype=bool)
+    occupied[1:-1, 1:-1, 1:-1] = labels >= 0
+    return labels, occupied
+
+
+def quad_areas(vertices):
+    corners = vertices[:, :3].reshape(-1, 4, 3)
+    return np.linalg.norm(np.cross(corners[:, 1] - corners[:, 0], corners[:, 3] - corners[:, 0]), axis=1)
+
+
+def test_empty_chunk():
+    vertices, indices, stats = greedy_mesh(*chunk({}))
+    assert vertices.shape == (0, FLOATS_PER_VERTEX)
+    assert len(indices) == 0 and stats["quads"] == 0
+
+
+def test_single_cube_is_six_unit_quads():
+    vertices, indices, stats = greedy_mesh(*chunk({(0, 0, 0): 3}), origin=(2, 0, 0))
+    assert stats["quads"] == 6 and stats["visible_faces"] == 6
+    assert len(indices) == 36 and indices.max() == 23
+
+    positions = vertices[:, :3]
+    assert positions.min(axis=0).tolist() == [1.5, -0.5, -0.5]
+    assert positions.max(axis=0).tolist() == [2.5, 0.5, 0.5]
+    assert np.all(vertices[:, 6] == 3)
+
+
+def test_quads_wind_counter_clockwise_from_outside():
+    vertices, _, _ = greedy_mesh(*chunk({(1, 1, 1): 0, (2, 1, 1): 0, (1, 2, 1): 1}))
+    corners = vertices[:, :3].reshape(-1, 4, 3)
+    normals = vertices[::4, 3:6]
+    facing = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    assert np.all(np.einsum("ij,ij->i", facing, normals) > 0)
+
+
+def test_solid_block_merges_to_six_quads():
+    filled = {(x, y, z): 0 for x in range(SIZE) for y in range(SIZE) for z in range(SIZE)}
+    vertices, _, stats = greedy_mesh(*chunk(filled))
+    assert stats["quads"] == 6
+    assert stats["visible_faces"] == 6 * SIZE * SIZE
+    assert np.allclose(quad_areas(vertices), SIZE * SIZE)
+
+
+def test_materials_are_not_merged():
+    filled = {(x, 0, 0): x % 2 for x in range(SIZE)}
+    vertices, _, stats = greedy_mesh(*chunk(filled))
+    # внутренние грани между кубами скрыты, остальные не склеиваются через материал
+    assert stats["visible_faces"] == 4 * SIZE + 2
+    assert sorted(np.unique(vertices[:, 6]).tolist()) == [0, 1]
+    assert np.isclose(quad_areas(vertices).sum(), stats["visible_faces"])
+
+
+def test_random_chunk_covers_every_visible_face():
+    rng = np.random.default_rng(3)
+    labels = np.where(rng.random((SIZE,) * 3) < 0.5, rng.integers(0, 3, (SIZE,) * 3), -1)
+    occupied = rng.random((SIZE + 2,) * 3) < 0.5
+    occupied[1:-1, 1:-1, 1:-1] = labels >= 0
+
+    vertices, _, stats = greedy_mesh(labels, occupied)
+    assert stats["quads"] <= stats["visible_faces"]
+    assert np.isclose(quad_areas(vertices).sum(), stats["visible_faces"])
+
+
+def test_neighbour_chunk_hides_border_faces():
+    scene = Scene()
+    scene.add_cubes([[CHUNK_SIZE - 1, 0, 0], [CHUNK_SIZE, 0, 0]])
+
+    _, _, left = mesh_scene_chunk(scene, (0, 0, 0))
+    _, _, right = mesh_scene_chunk(scene, (1, 0, 0))
+    assert left["visible_faces"] == 5 and right["visible_faces"] == 5
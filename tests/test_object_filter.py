@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from core.scene import Scene
+from gui.object_list_model import filter_mask
+
+
+@pytest.fixture
+def store():
+    scene = Scene()
+    scene.add_cubes(
+        [[0, 0, 0], [3, 0, -2], [3, 1, 4], [-1.5, 2, 0], [5, 5, 5]],
+        colors=[(1, 0.5333333, 0, 1), (1, 0.5333333, 0, 0.5019608), (0, 0, 1, 1), (1, 0.5333333, 0, 1), (0, 0, 0, 1)],
+    )
+    return scene.voxels
+
+
+def matching_ids(store, text):
+    return store.ids[filter_mask(store, text)].tolist()
+
+
+def test_empty_query_is_no_filter(store):
+    assert filter_mask(store, "") is None
+    assert filter_mask(store, "   ") is None
+
+
+def test_color_with_and_without_alpha(store):
+    assert matching_ids(store, "#ff8800") == [0, 1, 3]
+    assert matching_ids(store, "#FF8800ff") == [0, 3]
+    assert matching_ids(store, "#ff880080") == [1]
+    assert matching_ids(store, "#123456") == []
+
+
+def test_axis_value_and_range(store):
+    assert matching_ids(store, "x=3") == [1, 2]
+    assert matching_ids(store, "y=0..1") == [0, 1, 2]
+    assert matching_ids(store, "X=-2..0") == [0, 3]
+    assert matching_ids(store, "z=-2.00001") == [1]
+    assert matching_ids(store, "x=-1.5") == [3]
+
+
+def test_full_position_and_id(store):
+    assert matching_ids(store, "3 1 4") == [2]
+    assert matching_ids(store, "3, 0, -2") == [1]
+    assert matching_ids(store, "-1.5 2 0") == [3]
+    assert matching_ids(store, "4") == [4]
+    assert matching_ids(store, "99") == []
+
+
+def test_terms_are_combined(store):
+    assert matching_ids(store, "#ff8800 x=0..5") == [0, 1]
+    assert matching_ids(store, "#ff8800, y=0, z=-2") == [1]
+    assert matching_ids(store, "x=3 3 1 4") == [2]
+    assert matching_ids(store, "x=3 0") == []
+
+
+@pytest.mark.parametrize("text", [
+    "3 0",              # две координаты
+    "1 2 3 4",          # четыре
+    "w=3",              # неизвестная ось
+    "x=a..2",
+    "x=..2",
+    "#ff88",            # короткий цвет
+    "#gg8800",
+    "cube",
+])
+def test_bad_queries_raise(store, text):
+    with pytest.raises(ValueError):
+        filter_mask(store, text)
+
+
+def test_filter_follows_recolor_through_palette(store):
+    store.scene.recolor([2], (1, 0.5333333, 0, 1))
+    assert matching_ids(store, "#ff8800ff") == [0, 2, 3]
+    assert np.array_equal(filter_mask(store, "#0000ff"), np.zeros(len(store), dtype=bool))
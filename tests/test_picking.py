@@ -0,0 +1,83 @@
+import numpy as np
+
+from core.picking import raycast, screen_ray
+from core.voxel_grid import SparseVoxelGrid
+
+
+def grid_with(cells, cell_size=1.0):
+    grid = SparseVoxelGrid(cell_size=cell_size)
+    grid.set_many(cells, np.arange(len(cells)))
+    return grid
+
+
+def slab_entry(grid, cells, origin, direction):
+    """Расстояние до входа луча в каждую клетку (перебором, inf — мимо)."""
+    half = grid.cell_size / 2
+    lo = np.asarray(cells) * grid.cell_size - half
+    hi = lo + grid.cell_size
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t1 = (lo - origin) / direction
+        t2 = (hi - origin) / direction
+    near = np.where(direction == 0, np.where((origin >= lo) & (origin < hi), -np.inf, np.inf), np.minimum(t1, t2))
+    far = np.where(direction == 0, np.inf, np.maximum(t1, t2))
+    enter, leave = near.max(axis=1), far.min(axis=1)
+    return np.where((enter <= leave) & (leave >= 0), np.maximum(enter, 0), np.inf)
+
+
+def test_hit_along_axis():
+    grid = grid_with([[5, 0, 0], [8, 0, 0]])
+    hit = raycast(grid, [0, 0, 0], [1, 0, 0])
+
+    assert hit.cell == (5, 0, 0) and hit.voxel_id == 0
+    assert hit.normal == (-1, 0, 0)
+    assert hit.adjacent_cell == (4, 0, 0)
+    assert np.isclose(hit.distance, 4.5)
+
+
+def test_negative_direction_and_cell_size():
+    grid = grid_with([[-4, 1, 0]], cell_size=0.5)
+    hit = raycast(grid, [0, 0.5, 0], [-1, 0, 0])
+
+    assert hit.cell == (-4, 1, 0) and hit.normal == (1, 0, 0)
+    assert np.isclose(hit.distance, 1.75)
+
+
+def test_miss_and_max_distance():
+    grid = grid_with([[0, 10, 0]])
+    assert raycast(grid, [0, 0, 0], [1, 0, 0]) is None
+    assert raycast(grid, [0, 0, 0], [0, 1, 0], max_distance=5) is None
+    assert raycast(grid, [0, 0, 0], [0, 1, 0], max_distance=20).voxel_id == 0
+
+
+def test_origin_inside_occupied_cell():
+    hit = raycast(grid_with([[0, 0, 0]]), [0.2, -0.1, 0.3], [0, 0, 1])
+    assert hit.cell == (0, 0, 0) and hit.normal == (0, 0, 0) and hit.distance == 0
+
+
+def test_matches_brute_force():
+    rng = np.random.default_rng(4)
+    cells = np.unique(rng.integers(-8, 8, size=(120, 3)), axis=0)
+    grid = grid_with(cells)
+
+    hits = 0
+    for _ in range(200):
+        origin = rng.uniform(-12, 12, size=3)
+        direction = rng.uniform(-8, 8, size=3) - origin
+        direction /= np.linalg.norm(direction)
+
+        entry = slab_entry(grid, cells, origin, direction)
+        hit = raycast(grid, origin, direction, max_distance=40)
+        if not np.isfinite(entry.min()) or entry.min() > 40:
+            assert hit is None
+            continue
+        hits += 1
+        assert hit is not None
+        assert np.isclose(hit.distance, entry.min(), atol=1e-6)
+        assert np.isclose(entry[hit.voxel_id], entry.min(), atol=1e-6)
+    assert hits > 100
+
+
+def test_screen_ray_through_centre():
+    origin, direction = screen_ray(50, 50, 100, 100, np.eye(4), np.eye(4))
+    assert np.allclose(origin, [0, 0, -1])
+    assert np.allclose(direction, [0, 0, 1])
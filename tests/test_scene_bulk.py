@@ -0,0 +1,187 @@
+import numpy as np
+import pytest
+
+from core.scene import Scene
+from core.voxel_store import KIND_CUBE, KIND_ENTITY
+
+
+def test_add_cubes_is_one_revision_and_one_undo_entry(check_grid):
+    scene = Scene()
+    positions = np.float32([[0, 0, 0], [1, 0, 0], [0, 0, 0], [2, 0, 0]])
+    ids = scene.add_cubes(positions, colors=[(1, 0, 0, 1)] * 4, eulers=(0, 45, 0))
+
+    assert ids.tolist() == [0, 1, 2]
+    assert scene.voxels.positions[scene.voxels.slots_of(ids)].tolist() == [[0, 0, 0], [1, 0, 0], [2, 0, 0]]
+    assert scene.voxels.eulers[:, 1].tolist() == [45, 45, 45]
+    assert scene.revision == 1
+    assert len(scene.history._undo) == 1
+    check_grid(scene)
+
+
+def test_add_cubes_empty_batch_records_nothing():
+    scene = Scene()
+    assert len(scene.add_cubes(np.zeros((0, 3), np.float32))) == 0
+    assert not scene.history.can_undo
+
+
+def test_remove_where_is_one_undo_entry(check_grid):
+    scene = Scene()
+    scene.add_cubes(np.stack([np.arange(10), np.zeros(10), np.zeros(10)], axis=1))
+    assert scene.remove_where(scene.voxels.positions[:, 0] % 2 == 0) == 5
+    assert sorted(scene.voxels.positions[:, 0].tolist()) == [1, 3, 5, 7, 9]
+
+    assert scene.history.undo(scene)
+    assert len(scene.voxels) == 10
+    check_grid(scene)
+
+
+def test_remove_where_rejects_wrong_mask_shape():
+    scene = Scene()
+    scene.add_cubes([[0, 0, 0], [1, 0, 0]])
+    with pytest.raises(ValueError, match="mask must have shape"):
+        scene.remove_where(np.ones(3, dtype=bool))
+
+
+def test_set_positions_rejected_cube_keeps_its_cell(check_grid):
+    scene = Scene()
+    a, b, c = scene.add_cubes([[0, 0, 0], [1, 0, 0], [5, 0, 0]]).tolist()
+
+    # a упирается в c и остаётся на месте, поэтому и b в клетку a не переходит
+    accepted = scene.set_positions([a, b], [[5, 0, 0], [0, 0, 0]])
+    assert accepted.tolist() == [False, False]
+    assert scene.voxels.positions.tolist() == [[0, 0, 0], [1, 0, 0], [5, 0, 0]]
+    assert scene.grid.get_many([[0, 0, 0], [1, 0, 0], [5, 0, 0]]).tolist() == [a, b, c]
+    check_grid(scene)
+
+
+def test_set_positions_chain_and_swap(check_grid):
+    scene = Scene()
+    a, b, c, d = scene.add_cubes([[0, 0, 0], [1, 0, 0], [2, 0, 0], [9, 0, 0]]).tolist()
+
+    # цепочка: c уходит в свободную клетку, b — на место c, a — на место b
+    assert scene.set_positions([a, b, c], [[1, 0, 0], [2, 0, 0], [3, 0, 0]]).all()
+    check_grid(scene)
+    # обмен клетками внутри пачки
+    assert scene.set_positions([a, d], [[9, 0, 0], [1, 0, 0]]).all()
+    assert scene.voxel_at([9, 0, 0]).id == a and scene.voxel_at([1, 0, 0]).id == d
+    check_grid(scene)
+    # отказ в конце цепочки откатывает всю цепочку
+    accepted = scene.set_positions([b, c], [[3, 0, 0], [9, 0, 0]])
+    assert accepted.tolist() == [False, False]
+    check_grid(scene)
+
+    for _ in range(2):
+        assert scene.history.undo(scene)
+        check_grid(scene)
+    store = scene.voxels
+    assert store.positions[store.slots_of([a, b, c, d])].tolist() == [[0, 0, 0], [1, 0, 0], [2, 0, 0], [9, 0, 0]]
+
+
+def test_set_positions_random_batches_keep_grid(check_grid):
+    rng = np.random.default_rng(8)
+    scene = Scene()
+    scene.add_cubes(rng.integers(0, 6, size=(120, 3)).astype(np.float32))
+
+    for _ in range(100):
+        ids = rng.choice(scene.voxels.ids, size=20, replace=False)
+        scene.set_positions(ids, rng.integers(0, 6, size=(20, 3)))
+        check_grid(scene)
+    while scene.history.undo(scene):
+        check_grid(scene)
+
+
+# ----------------------------------------------------------------------
+# Выделение
+# ----------------------------------------------------------------------
+
+def selection_scene(seed=9):
+    """Небольшая сцена: кубы со смещениями внутри клеток, два цвета и ENTITY."""
+    rng = np.random.default_rng(seed)
+    cells = np.unique(rng.integers(0, 8, size=(200, 3)), axis=0)
+    positions = (cells + rng.uniform(-0.3, 0.3, size=cells.shape)).astype(np.float32)
+    colors = np.float32([[1, 0, 0, 1], [0, 0, 1, 1]])[rng.integers(0, 2, len(cells))]
+    scene = Scene()
+    scene.add_cubes(positions, colors)
+    scene._insert([[3, 3, 3]], 0, (1, 0, 0, 1), KIND_ENTITY)
+    return scene
+
+
+def selected(scene):
+    return set(scene.selected_ids().tolist())
+
+
+def cube_items(scene):
+    store = scene.voxels
+    return [(i, p) for i, p, k in zip(store.ids.tolist(), store.positions, store.kinds) if k == KIND_CUBE]
+
+
+def test_select_box_matches_brute_force():
+    scene = selection_scene()
+    lo, hi = np.float32([1.2, 0.5, 2.0]), np.float32([5.1, 4.3, 6.6])
+
+    assert scene.select_box(hi, lo) == len(selected(scene))
+    expected = {i for i, p in cube_items(scene) if np.all((p >= lo) & (p <= hi))}
+    assert selected(scene) == expected and expected
+
+
+def test_select_box_and_sphere_include_boundary():
+    scene = Scene()
+    ids = scene.add_cubes([[0, 0, 0], [2, 0, 0], [3, 0, 0], [0, 2, 0]]).tolist()
+
+    scene.select_box([0, 0, 0], [2, 0, 0])
+    assert selected(scene) == {ids[0], ids[1]}
+    scene.select_sphere([0, 0, 0], 2.0)
+    assert selected(scene) == {ids[0], ids[1], ids[3]}
+
+
+def test_select_sphere_matches_brute_force():
+    scene = selection_scene()
+    center, radius = np.float32([4, 3.5, 4]), 2.7
+
+    scene.select_sphere(center, radius)
+    expected = {i for i, p in cube_items(scene) if np.sum((p - center) ** 2) <= radius * radius}
+    assert selected(scene) == expected and expected
+
+
+def test_select_color_and_add():
+    scene = selection_scene()
+    store = scene.voxels
+    red = {i for i, c in zip(store.ids.tolist(), store.colors.tolist()) if c == [1, 0, 0, 1]}
+
+    assert scene.select_color((1, 0, 0, 1)) == len(red)
+    assert selected(scene) == red
+    scene.select_color((0, 0, 1, 1), add=True)
+    assert selected(scene) == set(store.ids.tolist())
+
+
+def test_invert_twice_restores_selection():
+    scene = selection_scene()
+    scene.select_sphere([4, 4, 4], 3)
+    before = selected(scene)
+
+    scene.invert_selection()
+    assert selected(scene) == set(scene.voxels.ids.tolist()) - before
+    assert scene.invert_selection() == len(before)
+    assert selected(scene) == before
+
+
+def neighbours_of(position):
+    cell = np.floor(np.asarray(position) + 0.5).astype(int)
+    return [tuple(cell + offset) for offset in
+            ([1, 0, 0], [-1, 0, 0], [0, 1, 0], [0, -1, 0], [0, 0, 1], [0, 0, -1])]
+
+
+def test_grow_and_shrink_match_brute_force():
+    scene = selection_scene()
+    cells = {tuple(np.floor(p + 0.5).astype(int)): i for i, p in cube_items(scene)}
+    positions = dict(cube_items(scene))
+
+    scene.select_sphere([4, 4, 4], 2)
+    start = selected(scene)
+    grown = start | {cells[c] for i in start for c in neighbours_of(positions[i]) if c in cells}
+    scene.grow_selection()
+    assert selected(scene) == grown
+
+    shrunk = {i for i in grown if all(cells.get(c) in grown for c in neighbours_of(positions[i]))}
+    scene.shrink_selection()
+    assert selected(scene) == shrunk
@@ -0,0 +1,216 @@
+import numpy as np
+import pytest
+
+from core import scene_formats
+from core.scene import Scene
+from core.scene_formats import (
+    SceneFormatError, read_binary, read_chunked, read_scene, read_text,
+    write_binary, write_chunked, write_scene, write_text,
+)
+from core.voxel_store import KIND_CUBE, KIND_ENTITY
+
+
+def sample_columns(count=500, seed=5):
+    """Кубы в центрах клеток, несколько смещённых и повёрнутых кубов и ENTITY."""
+    rng = np.random.default_rng(seed)
+    positions = np.unique(rng.integers(-40, 40, size=(count, 3)), axis=0).astype(np.float32)
+    count = len(positions)
+    eulers = np.zeros((count, 3), dtype=np.float32)
+    palette = rng.random((6, 4)).astype(np.float32)
+    colors = palette[rng.integers(0, len(palette), count)]
+    kinds = np.full(count, KIND_CUBE, dtype=np.uint8)
+
+    odd = rng.choice(count, size=20, replace=False)
+    positions[odd[:10]] += rng.uniform(-0.4, 0.4, size=(10, 3)).astype(np.float32)
+    eulers[odd[10:]] = rng.uniform(0, 360, size=(10, 3)).astype(np.float32)
+    kinds[odd[::4]] = KIND_ENTITY
+    return positions, eulers, colors, kinds
+
+
+def assert_same_columns(expected, actual, ordered=True):
+    expected = [np.asarray(column) for column in expected]
+    actual = [np.asarray(column) for column in actual]
+    if not ordered:
+        # чанковый формат может переставить объекты
+        def canonical(columns):
+            table = np.hstack([columns[0], columns[1], columns[2], columns[3][:, None].astype(np.float32)])
+            return table[np.lexsort(table.T[::-1])]
+        assert np.array_equal(canonical(expected), canonical(actual))
+        return
+    for want, got in zip(expected, actual):
+        assert got.shape == want.shape
+        assert np.array_equal(got, want)
+
+
+# ----------------------------------------------------------------------
+# Текстовый v1
+# ----------------------------------------------------------------------
+
+def test_text_round_trip(tmp_path):
+    columns = sample_columns()
+    path = str(tmp_path / "scene.txt")
+    write_text(path, *columns)
+    assert_same_columns(columns, read_text(path))
+    assert_same_columns(columns, read_scene(path))
+
+
+def test_text_round_trip_across_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(scene_formats, "TEXT_BLOCK_LINES", 7)
+    columns = sample_columns(count=50)
+    path = str(tmp_path / "scene.txt")
+    write_text(path, *columns)
+    assert_same_columns(columns, read_text(path))
+
+
+def test_text_skips_comments_blank_lines_and_trailing_fields(tmp_path):
+    path = tmp_path / "scene.txt"
+    path.write_text(
+        "# Scene file v1\n"
+        "\n"
+        "CUBE 1 2 3  0 0 0  1 0 0 1  extra 42\n"
+        "   # отдельный комментарий\n"
+        "ENTITY 0 0 0  0 90 0  0 1 0 1 # комментарий\n"
+        "CUBE 4 5 6  0 0 0  0 0 1 1\n"
+    )
+    positions, eulers, colors, kinds = read_text(str(path))
+    assert positions.tolist() == [[1, 2, 3], [0, 0, 0], [4, 5, 6]]
+    assert eulers[1].tolist() == [0, 90, 0]
+    assert colors[:, :3].tolist() == [[1, 0, 0], [0, 1, 0], [0, 0, 1]]
+    assert kinds.tolist() == [KIND_CUBE, KIND_ENTITY, KIND_CUBE]
+
+
+@pytest.mark.parametrize("line, reason", [
+    ("SPHERE 0 0 0  0 0 0  1 1 1 1", "unknown object type"),
+    ("CUBE 0 0 0  0 0 0  1 1 1", "expected 11 fields"),
+    ("CUBE 0 x 0  0 0 0  1 1 1 1", "not a number"),
+    ("CUBE 0 nan 0  0 0 0  1 1 1 1", "not a finite number"),
+])
+def test_text_errors_name_file_and_line(tmp_path, monkeypatch, line, reason):
+    monkeypatch.setattr(scene_formats, "TEXT_BLOCK_LINES", 4)
+    path = tmp_path / "bad.txt"
+    good = "CUBE 0 0 0  0 0 0  1 1 1 1\n"
+    path.write_text("# Scene file v1\n" + good * 5 + line + "\n" + good)
+
+    with pytest.raises(SceneFormatError, match=f"bad.txt:7: {reason}"):
+        read_text(str(path))
+
+
+def test_text_empty_file(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_text("# Scene file v1\n")
+    positions, eulers, colors, kinds = read_text(str(path))
+    assert positions.shape == (0, 3) and colors.shape == (0, 4) and kinds.shape == (0,)
+
+
+# ----------------------------------------------------------------------
+# .voxb
+# ----------------------------------------------------------------------
+
+def test_binary_round_trip(tmp_path):
+    columns = sample_columns()
+    path = str(tmp_path / "scene.voxb")
+    write_binary(path, *columns)
+    assert_same_columns(columns, read_binary(path))
+    assert_same_columns(columns, read_scene(path))
+
+
+def test_binary_empty_scene(tmp_path):
+    path = str(tmp_path / "empty.voxb")
+    write_binary(path, *(column[:0] for column in sample_columns()))
+    positions, _, _, kinds = read_binary(path)
+    assert positions.shape == (0, 3) and kinds.shape == (0,)
+
+
+def test_binary_rejects_truncated_and_foreign_files(tmp_path):
+    path = tmp_path / "scene.voxb"
+    write_binary(str(path), *sample_columns())
+    data = path.read_bytes()
+
+    path.write_bytes(data[:-10])
+    with pytest.raises(SceneFormatError, match="truncated"):
+        read_binary(str(path))
+
+    path.write_bytes(b"NOPE" + data[4:])
+    with pytest.raises(SceneFormatError, match="not a binary scene"):
+        read_binary(str(path))
+
+
+# ----------------------------------------------------------------------
+# .voxc
+# ----------------------------------------------------------------------
+
+@pytest.mark.parametrize("codec", ["zlib", "lzma"])
+def test_chunked_round_trip(tmp_path, codec):
+    columns = sample_columns()
+    path = str(tmp_path / "scene.voxc")
+    stats = write_chunked(path, *columns, codec=codec, workers=2)
+
+    assert stats["voxels"] == len(columns[3])
+    # смещённые, повёрнутые кубы и ENTITY лежат отдельными колонками
+    assert stats["extras"] == 20
+    assert_same_columns(columns, read_chunked(path, workers=2), ordered=False)
+    assert_same_columns(columns, read_scene(path), ordered=False)
+
+
+def test_chunked_round_trip_with_cell_size(tmp_path):
+    positions, eulers, colors, kinds = sample_columns()
+    columns = (positions * 0.5, eulers, colors, kinds)
+    path = str(tmp_path / "scene.voxc")
+    stats = write_scene(path, *columns, cell_size=0.5)
+
+    assert stats["extras"] == 20
+    assert_same_columns(columns, read_scene(path), ordered=False)
+
+
+def test_chunked_compresses_uniform_regions(tmp_path):
+    cells = np.stack(np.meshgrid(*[np.arange(32)] * 3, indexing="ij"), axis=-1).reshape(-1, 3)
+    count = len(cells)
+    columns = (cells.astype(np.float32), np.zeros((count, 3), np.float32),
+               np.tile(np.float32([0.2, 0.6, 0.2, 1]), (count, 1)), np.zeros(count, np.uint8))
+    path = str(tmp_path / "solid.voxc")
+    stats = write_chunked(path, *columns)
+
+    assert stats["chunks"] == 8 and stats["palette"] == 1 and stats["extras"] == 0
+    assert stats["ratio"] > 100
+    assert_same_columns(columns, read_chunked(path), ordered=False)
+
+
+def test_chunked_empty_scene(tmp_path):
+    path = str(tmp_path / "empty.voxc")
+    write_chunked(path, *(column[:0] for column in sample_columns()))
+    positions, _, colors, kinds = read_chunked(path)
+    assert positions.shape == (0, 3) and colors.shape == (0, 4) and kinds.shape == (0,)
+
+
+def test_chunked_detects_corruption(tmp_path):
+    path = tmp_path / "scene.voxc"
+    write_chunked(str(path), *sample_columns())
+    data = bytearray(path.read_bytes())
+    data[len(data) // 2] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+    with pytest.raises(SceneFormatError, match="checksum"):
+        read_chunked(str(path))
+
+
+# ----------------------------------------------------------------------
+# Сцена
+# ----------------------------------------------------------------------
+
+@pytest.mark.parametrize("extension", [".txt", ".voxb", ".voxc"])
+def test_scene_export_import_round_trip(tmp_path, check_grid, extension):
+    scene = Scene()
+    positions, eulers, colors, kinds = sample_columns()
+    scene._insert(positions, eulers, colors, kinds)
+
+    path = str(tmp_path / "scenes" / f"scene{extension}")
+    assert scene.export_scene(path)
+    loaded = Scene()
+    assert loaded.import_scene(path)
+
+    store = loaded.voxels
+    assert_same_columns((positions, eulers, colors, kinds),
+                        (store.positions, store.eulers, store.colors, store.kinds),
+                        ordered=extension != ".voxc")
+    assert not loaded.history.can_undo
+    check_grid(loaded)
@@ -0,0 +1,171 @@
+import numpy as np
+
+from core.scene import Scene
+from core.voxel_grid import SparseVoxelGrid, CHUNK_SIZE, EMPTY
+
+
+def test_cell_of_rounds_to_nearest_cell():
+    grid = SparseVoxelGrid(cell_size=0.5)
+    cells = grid.cell_of([[0.2, -0.2, 0.26], [-0.26, 1.0, 0.74]])
+    assert cells.tolist() == [[0, 0, 1], [-1, 2, 1]]
+
+
+def test_set_get_clear_across_negative_chunks():
+    grid = SparseVoxelGrid()
+    cells = [(-1, 0, 0), (0, 0, 0), (CHUNK_SIZE, -CHUNK_SIZE - 1, 3)]
+    for voxel_id, cell in enumerate(cells):
+        assert grid.set(cell, voxel_id) == EMPTY
+
+    assert [grid.get(cell) for cell in cells] == [0, 1, 2]
+    assert len(grid) == 3 and len(grid.chunks) == 3
+    assert grid.clear((-1, 0, 0)) == 0
+    assert (-1, 0, 0) not in grid
+    assert len(grid) == 2 and len(grid.chunks) == 2
+
+
+def test_batch_operations_match_single_cell():
+    rng = np.random.default_rng(1)
+    cells = np.unique(rng.integers(-40, 40, size=(500, 3)), axis=0)
+    ids = np.arange(len(cells))
+
+    grid = SparseVoxelGrid()
+    grid.set_many(cells, ids)
+    assert grid.get_many(cells).tolist() == ids.tolist()
+    assert len(grid) == len(cells)
+
+    # clear_many с expected_ids не трогает клетки с другим id
+    expected = ids.copy()
+    expected[::2] = -5
+    grid.clear_many(cells, expected)
+    assert grid.get_many(cells[::2]).tolist() == ids[::2].tolist()
+    assert np.all(grid.get_many(cells[1::2]) == EMPTY)
+    assert len(grid) == len(cells[::2])
+
+
+def test_move_many_shifts_overlapping_run():
+    grid = SparseVoxelGrid()
+    old = np.array([[x, 0, 0] for x in range(CHUNK_SIZE - 2, CHUNK_SIZE + 2)])
+    grid.set_many(old, [10, 11, 12, 13])
+    new = old + [1, 0, 0]
+
+    assert grid.move_many(old, new, [10, 11, 12, 13])
+    assert grid.get(old[0]) == EMPTY
+    assert grid.get_many(new).tolist() == [10, 11, 12, 13]
+    assert len(grid) == 4
+
+
+def test_move_many_swap_within_batch():
+    grid = SparseVoxelGrid()
+    a, b = [0, 0, 0], [1, 0, 0]
+    grid.set_many([a, b], [1, 2])
+
+    assert grid.move_many([a, b], [b, a], [1, 2])
+    assert grid.get_many([a, b]).tolist() == [2, 1]
+
+
+def test_move_many_collision_leaves_grid_untouched():
+    grid = SparseVoxelGrid()
+    grid.set_many([[0, 0, 0], [1, 0, 0], [40, 0, 0]], [1, 2, 3])
+    grid.take_dirty_chunks()
+
+    assert not grid.move_many([[0, 0, 0], [1, 0, 0]], [[5, 0, 0], [40, 0, 0]], [1, 2])
+    assert grid.get_many([[0, 0, 0], [1, 0, 0], [40, 0, 0], [5, 0, 0]]).tolist() == [1, 2, 3, EMPTY]
+    assert not grid.dirty_chunks
+
+
+def test_edit_on_chunk_border_marks_neighbour_dirty():
+    grid = SparseVoxelGrid()
+    grid.set((CHUNK_SIZE - 1, 5, 5), 0)
+    assert grid.take_dirty_chunks() == {(0, 0, 0), (1, 0, 0)}
+
+    grid.mark_dirty([(CHUNK_SIZE - 1, 5, 5)])
+    assert grid.take_dirty_chunks() == {(0, 0, 0)}
+
+
+def test_query_box_and_bounds():
+    grid = SparseVoxelGrid()
+    cells = np.array([[-20, 0, 3], [0, 0, 0], [5, 5, 5], [33, -2, 1]])
+    grid.set_many(cells, [0, 1, 2, 3])
+
+    found, ids = grid.query_box([-1, -1, -1], [5, 5, 5])
+    assert sorted(ids.tolist()) == [1, 2]
+    assert sorted(map(tuple, found.tolist())) == [(0, 0, 0), (5, 5, 5)]
+
+    lo, hi = grid.bounds()
+    assert lo.tolist() == [-20, -2, 0] and hi.tolist() == [33, 5, 5]
+
+
+def test_padded_block_borrows_neighbour_faces():
+    grid = SparseVoxelGrid()
+    grid.set((CHUNK_SIZE, 3, 4), 7)
+    grid.set((0, 3, 4), 8)
+
+    padded = grid.padded_block((0, 0, 0))
+    assert padded[CHUNK_SIZE + 1, 4, 5] == 7
+    assert padded[1, 4, 5] == 8
+
+
+# ----------------------------------------------------------------------
+# Сетка сцены после правок
+# ----------------------------------------------------------------------
+
+def random_scene(count=300, seed=2):
+    rng = np.random.default_rng(seed)
+    scene = Scene()
+    scene.add_cubes(rng.integers(-20, 20, size=(count, 3)).astype(np.float32))
+    return scene, rng
+
+
+def test_add_cubes_skips_occupied_and_repeated_cells(check_grid):
+    scene = Scene()
+    first = scene.add_cubes([[0, 0, 0], [1, 0, 0]])
+    second = scene.add_cubes([[1, 0, 0], [2, 0, 0], [2.2, 0, 0]])
+
+    assert len(first) == 2 and len(second) == 1
+    assert len(scene.voxels) == 3
+    check_grid(scene)
+
+
+def test_grid_matches_store_after_edits(check_grid):
+    scene, rng = random_scene()
+    check_grid(scene)
+
+    for step in range(40):
+        ids = scene.voxels.ids
+        picked = rng.choice(ids, size=min(len(ids), 25), replace=False)
+        action = step % 6
+        if action == 0:
+            scene.translate(picked, rng.integers(-3, 4, size=3))
+        elif action == 1:
+            scene.rotate90(picked, axis=int(rng.integers(3)), turns=int(rng.integers(1, 4)))
+        elif action == 2:
+            scene.mirror(picked, axis=int(rng.integers(3)))
+        elif action == 3:
+            scene.set_positions(picked, rng.integers(-20, 20, size=(len(picked), 3)))
+        elif action == 4:
+            scene.remove_where(scene.voxels.positions[:, 0] > 15)
+            scene.add_cubes(rng.integers(-20, 20, size=(30, 3)).astype(np.float32))
+        else:
+            scene.duplicate(picked, [0, 1, 0])
+        check_grid(scene)
+
+
+def test_rejected_transform_changes_nothing(check_grid):
+    scene = Scene()
+    ids = scene.add_cubes([[0, 0, 0], [1, 0, 0], [3, 0, 0]])
+    before = scene.voxels.positions.copy()
+
+    assert not scene.translate(ids[:2], [2, 0, 0])
+    assert np.array_equal(scene.voxels.positions, before)
+    check_grid(scene)
+
+
+def test_remove_where_mask_and_ids(check_grid):
+    scene, _ = random_scene()
+    removed = scene.remove_where(scene.voxels.positions[:, 1] < 0)
+    assert removed > 0
+    assert np.all(scene.voxels.positions[:, 1] >= 0)
+    check_grid(scene)
+
+    assert scene.remove_where(scene.voxels.ids[:10]) == 10
+    check_grid(scene)
@@ -0,0 +1,160 @@
+import numpy as np
+
+from core.history import RecolorEdit
+from core.scene import Scene
+from core.voxel_store import VoxelStore, KIND_ENTITY
+
+
+def grid_positions(count):
+    return np.stack([np.arange(count), np.zeros(count), np.zeros(count)], axis=1).astype(np.float32)
+
+
+def test_add_many_issues_sequential_ids():
+    store = VoxelStore(capacity=2)
+    ids = store.add_many(grid_positions(5))
+    assert ids.tolist() == [0, 1, 2, 3, 4]
+    assert store.ids.tolist() == [0, 1, 2, 3, 4]
+    assert store.slots_of(ids).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_remove_moves_tail_row_into_hole():
+    store = VoxelStore()
+    store.add_many(grid_positions(5))
+
+    assert store.remove_many([1]) == 1
+    # последняя строка (id 4) заняла освободившийся slot 1
+    assert store.ids.tolist() == [0, 4, 2, 3]
+    assert store.positions[1].tolist() == [4, 0, 0]
+    assert store.slot(4) == 1
+    assert store.slot(1) == -1
+
+
+def test_ids_stay_stable_and_are_not_reused():
+    store = VoxelStore()
+    store.add_many(grid_positions(6))
+    store.remove_many([0, 5, 2, 99])
+
+    for voxel_id in (1, 3, 4):
+        assert store.positions[store.slot(voxel_id)].tolist() == [voxel_id, 0, 0]
+    assert store.add([10, 0, 0]) == 6
+
+
+def test_remove_many_matches_reference_model():
+    rng = np.random.default_rng(0)
+    store = VoxelStore(capacity=4)
+    model = {}
+
+    for _ in range(50):
+        count = int(rng.integers(0, 20))
+        positions = rng.integers(-50, 50, size=(count, 3)).astype(np.float32)
+        for voxel_id, position in zip(store.add_many(positions).tolist(), positions.tolist()):
+            model[voxel_id] = position
+
+        alive = np.array(sorted(model), dtype=np.int64)
+        doomed = rng.choice(alive, size=min(len(alive), int(rng.integers(0, 15))), replace=False)
+        assert store.remove_many(np.concatenate([doomed, doomed])) == len(doomed)
+        for voxel_id in doomed.tolist():
+            del model[voxel_id]
+
+        assert len(store) == len(model)
+        assert sorted(store.ids.tolist()) == sorted(model)
+        for voxel_id, position in model.items():
+            assert store.positions[store.slot(voxel_id)].tolist() == position
+
+
+def test_add_many_restores_previous_ids():
+    store = VoxelStore()
+    store.add_many(grid_positions(4))
+    store.remove_many([1, 2])
+
+    ids = store.add_many(grid_positions(2) + [1, 0, 0], ids=[2, 1])
+    assert ids.tolist() == [2, 1]
+    assert store.positions[store.slot(1)].tolist() == [2, 0, 0]
+    assert store.add([9, 9, 9]) == 4
+
+
+def test_selection_index_follows_removal():
+    store = VoxelStore()
+    ids = store.add_many(grid_positions(4), selected=True)
+    store.set_selected([ids[0]], False)
+    store.remove_many([ids[1]])
+
+    assert sorted(store.selected_ids().tolist()) == [2, 3]
+    assert store.selected_count == 2
+    assert store.selected.tolist() == [False, True, True]
+
+
+def test_palette_refcounts_are_released():
+    store = VoxelStore()
+    red, blue = (1, 0, 0, 1), (0, 0, 1, 1)
+    ids = store.add_many(grid_positions(3), colors=[red, red, blue])
+    store.remove_many(ids[:2])
+
+    assert store.colors.tolist() == [list(blue)]
+    assert int(store.palette.counts.sum()) == 1
+
+
+def test_view_position_setter_keeps_grid_and_history(check_grid):
+    scene = Scene()
+    ids = scene.add_cubes(grid_positions(2))
+
+    scene.voxels.view(int(ids[0])).position = [5, 0, 0]
+    check_grid(scene)
+    assert scene.voxel_at([5, 0, 0]).id == ids[0]
+
+    assert scene.history.undo(scene)
+    check_grid(scene)
+    assert scene.voxels.view(int(ids[0])).position.tolist() == [0, 0, 0]
+
+
+def test_view_eulers_setter_is_undoable():
+    scene = Scene()
+    voxel = scene.voxels.view(int(scene.add_cubes([[0, 0, 0]])[0]))
+
+    voxel.eulers = [0, 90, 0]
+    assert voxel.eulers.tolist() == [0, 90, 0]
+    assert scene.history.undo(scene)
+    assert voxel.eulers.tolist() == [0, 0, 0]
+
+
+def test_material_view_color_setter_records_recolor():
+    scene = Scene()
+    voxel = scene.voxels.view(int(scene.add_cubes([[0, 0, 0]])[0]))
+
+    voxel.material.color = (1, 0, 0, 1)
+    assert isinstance(scene.history._undo[-1], RecolorEdit)
+    assert scene.history.undo(scene)
+    assert voxel.material.color.tolist() == [0.5, 0.5, 0.5, 0.5]
+
+
+def test_view_setters_on_bare_store():
+    store = VoxelStore()
+    voxel = store.view(store.add([0, 0, 0], kind=KIND_ENTITY))
+    voxel.position = [1, 2, 3]
+    voxel.material.color = (0, 1, 0, 1)
+
+    assert voxel.position.tolist() == [1, 2, 3]
+    assert voxel.material.color.tolist() == [0, 1, 0, 1]
+
+
+def test_selection_revision_and_index():
+    store = VoxelStore()
+    ids = store.add_many(grid_positions(6))
+    revision = store.selection_revision
+
+    assert store.set_selected(ids[:3]) == 3
+    assert store.selection_revision == revision + 1
+    # повторное выделение ничего не меняет и ревизию не трогает
+    assert store.set_selected(ids[:3]) == 0
+    assert store.selection_revision == revision + 1
+
+    store.view(int(ids[4])).is_selected = True
+    assert store.selection_revision == revision + 2
+    store.invert_selection()
+    assert store.selection_revision == revision + 3
+    assert sorted(store.selected_ids().tolist()) == [3, 5]
+    assert store.selected.tolist() == [False, False, False, True, False, True]
+
+    store.select_all(False)
+    assert store.selection_revision == revision + 4
+    assert store.selected_count == 0 and not store.selected.any()